@@ -0,0 +1,198 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+import math
+import os
+import threading
+import time
+
+# Endpoints whose requests are large or long-running; everything else is interactive.
+BULK_ENDPOINTS = frozenset(
+    {
+        ("POST", "/api/upload-grid"),
+        ("POST", "/api/jobs"),
+        ("PATCH", "/api/feeders"),
+        ("GET", "/api/export/fleet"),
+        ("POST", "/api/export/scenarios"),
+    }
+)
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _parse_api_keys(raw: str, default_rate: float) -> Dict[str, float]:
+    """``"key1,key2=50"`` -> {key: requests per second}; keys without a rate get the default."""
+    keys: Dict[str, float] = {}
+    for item in raw.split(","):
+        key, _, rate = item.strip().partition("=")
+        if key:
+            keys[key] = float(rate) if rate else default_rate
+    return keys
+
+
+@dataclass
+class AdmissionConfig:
+    # Per client; 0 (the default) disables rate limiting. Clients are told apart by address,
+    # which behind a proxy is the proxy's, so only turn this on where addresses are real.
+    rate_per_s: float = 0.0
+    burst: float = 40.0
+    max_body_bytes: int = 1 << 20
+    max_upload_bytes: int = 16 << 20
+    max_interactive: int = 64
+    max_bulk: int = 2
+    # Bulk requests are turned away while this many interactive requests are in flight.
+    bulk_yield_at: int = 32
+    # Queued jobs pause between steps while this many interactive requests are in flight.
+    job_yield_at: int = 8
+    api_keys: Dict[str, float] = field(default_factory=dict)
+    max_clients: int = 10000
+
+    @classmethod
+    def from_env(cls) -> "AdmissionConfig":
+        rate = _env_number("GRID_GENT_RATE_LIMIT", 0.0)
+        max_interactive = int(_env_number("GRID_GENT_MAX_INTERACTIVE", 64))
+        return cls(
+            rate_per_s=rate,
+            burst=_env_number("GRID_GENT_RATE_BURST", 2 * rate),
+            max_body_bytes=int(_env_number("GRID_GENT_MAX_BODY", 1 << 20)),
+            max_upload_bytes=int(_env_number("GRID_GENT_MAX_UPLOAD", 16 << 20)),
+            max_interactive=max_interactive,
+            max_bulk=int(_env_number("GRID_GENT_MAX_BULK", 2)),
+            bulk_yield_at=int(_env_number("GRID_GENT_BULK_YIELD_AT", max(1, max_interactive // 2))),
+            job_yield_at=int(_env_number("GRID_GENT_JOB_YIELD_AT", max(1, max_interactive // 8))),
+            api_keys=_parse_api_keys(os.environ.get("GRID_GENT_API_KEYS", ""), rate),
+        )
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = now
+
+    def take(self, now: float) -> float:
+        """Spend one token; returns 0 when allowed, else seconds until a token is available."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return 0.0
+        return (1.0 - self.tokens) / self.rate
+
+
+@dataclass
+class Decision:
+    """Outcome of ``AdmissionController.admit``; call ``release()`` once an admitted request ends."""
+
+    status: int = 0  # 0 when admitted, else the HTTP status to answer with
+    error: str = ""
+    retry_after: Optional[int] = None
+    lane: str = "interactive"
+    _controller: Optional["AdmissionController"] = None
+
+    @property
+    def admitted(self) -> bool:
+        return self.status == 0
+
+    def release(self) -> None:
+        if self._controller is not None:
+            self._controller._release(self.lane)
+            self._controller = None
+
+
+class AdmissionController:
+    """Per-client token buckets, body size caps and per-lane concurrency limits.
+
+    Requests go to one of two lanes: ``bulk`` (uploads, job submission, delta updates,
+    exports) and ``interactive`` (everything else). Bulk has a small concurrency cap and is also
+    refused while the interactive lane is busy, so questions keep flowing during uploads.
+    """
+
+    def __init__(self, config: Optional[AdmissionConfig] = None) -> None:
+        self.config = config or AdmissionConfig.from_env()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._in_flight = {"interactive": 0, "bulk": 0}
+        self._lock = threading.Lock()
+        self.rejected = {"rate_limited": 0, "too_large": 0, "busy": 0}
+
+    @staticmethod
+    def lane_for(method: str, path: str) -> str:
+        return "bulk" if (method, path) in BULK_ENDPOINTS else "interactive"
+
+    def client_key(self, api_key: Optional[str], address: str) -> Tuple[str, float]:
+        """Bucket key and rate: configured API keys get their own bucket, others share by address."""
+        if api_key and api_key in self.config.api_keys:
+            return f"key:{api_key}", self.config.api_keys[api_key]
+        return f"addr:{address}", self.config.rate_per_s
+
+    def _rate_limit(self, client: str, rate: float, now: float) -> float:
+        bucket = self._buckets.get(client)
+        if bucket is None:
+            burst = self.config.burst * rate / self.config.rate_per_s if self.config.rate_per_s else rate
+            bucket = TokenBucket(rate, burst, now)
+            self._buckets[client] = bucket
+            while len(self._buckets) > self.config.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(client)
+        return bucket.take(now)
+
+    def admit(
+        self, method: str, path: str, address: str, api_key: Optional[str] = None, content_length: int = 0
+    ) -> Decision:
+        lane = self.lane_for(method, path)
+        limit = self.config.max_upload_bytes if path == "/api/upload-grid" else self.config.max_body_bytes
+        with self._lock:
+            if content_length > limit:
+                self.rejected["too_large"] += 1
+                return Decision(413, f"Request body exceeds {limit} bytes.", lane=lane)
+
+            client, rate = self.client_key(api_key, address)
+            if rate > 0:
+                wait = self._rate_limit(client, rate, time.monotonic())
+                if wait > 0:
+                    self.rejected["rate_limited"] += 1
+                    return Decision(429, "Rate limit exceeded; slow down.", max(1, math.ceil(wait)), lane)
+
+            if lane == "bulk":
+                busy = (
+                    self._in_flight["bulk"] >= self.config.max_bulk
+                    or self._in_flight["interactive"] >= self.config.bulk_yield_at
+                )
+            else:
+                busy = self._in_flight["interactive"] >= self.config.max_interactive
+            if busy:
+                self.rejected["busy"] += 1
+                return Decision(503, f"Server busy ({lane} requests); retry shortly.", 1, lane)
+
+            self._in_flight[lane] += 1
+            return Decision(lane=lane, _controller=self)
+
+    def _release(self, lane: str) -> None:
+        with self._lock:
+            self._in_flight[lane] -= 1
+
+    def interactive_busy(self) -> bool:
+        """True while at least ``job_yield_at`` interactive requests are in flight; background work should yield."""
+        with self._lock:
+            return self._in_flight["interactive"] >= max(1, self.config.job_yield_at)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "in_flight": dict(self._in_flight),
+                "rejected": dict(self.rejected),
+                "clients": len(self._buckets),
+                "rate_per_s": self.config.rate_per_s,
+                "max_interactive": self.config.max_interactive,
+                "max_bulk": self.config.max_bulk,
+            }
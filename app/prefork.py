@@ -0,0 +1,159 @@
+from __future__ import annotations
+import os
+import signal
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from typing import Dict, Optional
+
+from gridgent.tools.grid_stub import reload_feeder_config, reload_if_changed_on_disk
+
+# Set in forked workers so request handlers can ask the master to fan out a reload.
+_MASTER_PID: Optional[int] = None
+
+# A worker that exits with an error within CRASH_WINDOW_S of being forked has crashed.
+# Each crash in a row doubles the delay before its replacement, from RESTART_BACKOFF_S up
+# to RESTART_BACKOFF_MAX_S; after MAX_CRASHES in a row the worker is not replaced.
+CRASH_WINDOW_S = 10.0
+RESTART_BACKOFF_S = 0.5
+RESTART_BACKOFF_MAX_S = 30.0
+MAX_CRASHES = 5
+
+
+class GridGentHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that can share its socket across forked workers and retire itself.
+
+    ``max_requests`` > 0 makes the server stop accepting after that many requests (worker
+    recycling); in-flight requests are allowed to finish before the process exits.
+    ``reuse_port`` sets SO_REUSEPORT; it is only for pre-fork mode, so a second single-process
+    server on a busy port still fails with "address in use" instead of splitting traffic.
+    """
+
+    def __init__(self, *args, max_requests: int = 0, reuse_port: bool = False, **kwargs) -> None:
+        # Read by server_bind(), which runs inside the base constructor.
+        self.allow_reuse_port = reuse_port
+        super().__init__(*args, **kwargs)
+        self.max_requests = max_requests
+        self.requests_handled = 0
+        self._retiring = False
+        self._count_lock = threading.Lock()
+
+    def process_request(self, request, client_address):
+        super().process_request(request, client_address)
+        if self.max_requests <= 0:
+            return
+        with self._count_lock:
+            self.requests_handled += 1
+            retire = self.requests_handled >= self.max_requests and not self._retiring
+            if retire:
+                self._retiring = True
+        if retire:
+            self.retire()
+
+    def retire(self) -> None:
+        # shutdown() blocks until serve_forever() exits, so it must run off the serving thread.
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+
+def notify_config_changed() -> None:
+    """Ask the pre-fork master to reload the feeder config in every worker (no-op otherwise)."""
+    if _MASTER_PID is not None:
+        try:
+            os.kill(_MASTER_PID, signal.SIGUSR1)
+        except OSError:
+            pass
+
+
+def _worker_main(httpd: GridGentHTTPServer) -> None:
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: httpd.retire())
+    # The worker that made the change already has it in memory (delta uploads patch caches
+    # incrementally), so only reload when the files differ from what this worker last saw.
+    signal.signal(signal.SIGHUP, lambda signum, frame: reload_if_changed_on_disk())
+    signal.signal(signal.SIGUSR1, signal.SIG_DFL)
+    # Let in-flight requests finish when the worker retires.
+    httpd.daemon_threads = False
+    httpd.requests_handled = 0
+    try:
+        httpd.serve_forever()
+    finally:
+        httpd.server_close()
+
+
+def serve_prefork(httpd: GridGentHTTPServer, workers: int) -> None:
+    """Fork ``workers`` processes that accept on ``httpd``'s already-bound socket.
+
+    Anything loaded before this call (feeder config, index, hosting table) is shared with
+    the workers copy-on-write. Workers that exit (e.g. after ``max_requests``) are
+    replaced; workers that keep crashing right after start are replaced with exponential
+    backoff and eventually given up on, and the master exits once none are left. SIGUSR1
+    from a worker is fanned out as SIGHUP so every worker reloads its config after an upload.
+    """
+    global _MASTER_PID
+    master_pid = os.getpid()
+    # Non-blocking accept: workers racing for one connection must not block in accept().
+    httpd.socket.setblocking(False)
+    children: Dict[int, float] = {}  # pid -> time forked
+
+    def spawn() -> None:
+        global _MASTER_PID
+        pid = os.fork()
+        if pid == 0:
+            _MASTER_PID = master_pid
+            code = 0
+            try:
+                _worker_main(httpd)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = time.monotonic()
+
+    def broadcast_reload(signum, frame) -> None:
+        reload_feeder_config()
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGHUP)
+            except OSError:
+                pass
+
+    def stop(signum, frame) -> None:
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGUSR1, broadcast_reload)
+    signal.signal(signal.SIGTERM, stop)
+    _MASTER_PID = None
+
+    for _ in range(workers):
+        spawn()
+    crashes = 0
+    try:
+        while children:
+            pid, status = os.wait()
+            forked_at = children.pop(pid, None)
+            if forked_at is None:
+                continue
+            if os.waitstatus_to_exitcode(status) != 0 and time.monotonic() - forked_at < CRASH_WINDOW_S:
+                crashes += 1
+                if crashes >= MAX_CRASHES:
+                    print(f"Worker {pid} crashed {crashes} times in a row; not replacing it.", file=sys.stderr)
+                    continue
+                time.sleep(min(RESTART_BACKOFF_MAX_S, RESTART_BACKOFF_S * 2 ** (crashes - 1)))
+            else:
+                crashes = 0
+            spawn()
+        raise SystemExit("Every worker crashed right after starting; giving up.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        for pid in list(children):
+            try:
+                os.waitpid(pid, 0)
+            except OSError:
+                pass
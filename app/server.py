@@ -1,15 +1,158 @@
 from __future__ import annotations
+import hmac
 import json
 import os
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
-from urllib.parse import urlparse
-from typing import Tuple
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from typing import Any, Dict, Optional, Tuple
 
-from gridgent.core.orchestrator import GridGentOrchestrator
-from gridgent.tools.grid_stub import parse_uploaded_grid, save_uploaded_grid, get_all_feeders
+from gridgent.core.deadline import DeadlineExceeded
+from gridgent.core.profiling import collapsed_stacks, profile_call, profiling_stats, requested_mode
+from gridgent.core.types import TRACE_LEVELS
+from gridgent.tools.grid_stub import (
+    apply_feeder_delta,
+    parse_uploaded_grid,
+    save_uploaded_grid,
+    get_all_feeders,
+    get_config_version,
+)
+from gridgent.tools.feeder_index import get_feeder_index, parse_predicates, query_feeders
+from app.admission import AdmissionController
+from app.prefork import GridGentHTTPServer, notify_config_changed, serve_prefork
 
+# The orchestrator (agents, tools) and job manager are imported and built on first use or
+# during warm_up(), so importing this module stays cheap.
+_ORCHESTRATOR: Any = None
+_JOBS: Any = None
+_PIPELINE_LOCK = threading.Lock()
+STARTUP_REPORT: Dict[str, float] = {}
+# Rate limits, body caps and lane concurrency; configured from the environment.
+ADMISSION = AdmissionController()
+# Rejected bodies up to this size are drained; larger ones are cut off by closing the connection.
+_DRAIN_LIMIT = 4 << 20
+# Questions run here so the handler can stop waiting at the deadline even when a stage
+# does not check it; a stage that overruns keeps its worker until it finishes.
+_ASK_POOL = ThreadPoolExecutor(max_workers=ADMISSION.config.max_interactive, thread_name_prefix="gridgent-ask")
+# Time past the deadline allowed for narrating a partial answer before answering 504.
+_DEADLINE_GRACE_S = 0.25
 
-ORCHESTRATOR = GridGentOrchestrator()
+
+def _request_budget_ms(requested: Any) -> Optional[float]:
+    """The request's time budget: its own ``timeout_ms``, capped by ``GRID_GENT_REQUEST_TIMEOUT_MS``."""
+    try:
+        server_max = float(os.environ.get("GRID_GENT_REQUEST_TIMEOUT_MS", "30000"))
+    except ValueError:
+        server_max = 30000.0
+    if requested is None:
+        return server_max if server_max > 0 else None
+    try:
+        budget = float(requested)
+    except (TypeError, ValueError):
+        budget = 0.0
+    if not budget > 0 or isinstance(requested, bool):
+        raise ValueError("'timeout_ms' must be a positive number of milliseconds")
+    return min(budget, server_max) if server_max > 0 else budget
+
+
+def get_orchestrator() -> Any:
+    global _ORCHESTRATOR
+    if _ORCHESTRATOR is None:
+        with _PIPELINE_LOCK:
+            if _ORCHESTRATOR is None:
+                from gridgent.core.orchestrator import GridGentOrchestrator
+
+                history = None
+                if os.environ.get("GRID_GENT_HISTORY", "1") != "0":
+                    from gridgent.core.history import HistoryStore
+
+                    history = HistoryStore()
+                from gridgent.core.sessions import SessionStore
+
+                sessions = SessionStore(
+                    max_sessions=_env_int("GRID_GENT_MAX_SESSIONS", 10000),
+                    ttl_s=float(_env_int("GRID_GENT_SESSION_TTL", 1800)),
+                )
+                from gridgent.core.cache import get_cache
+
+                _ORCHESTRATOR = GridGentOrchestrator(history=history, sessions=sessions, cache=get_cache())
+    return _ORCHESTRATOR
+
+
+def get_jobs() -> Any:
+    global _JOBS
+    if _JOBS is None:
+        orchestrator = get_orchestrator()
+        with _PIPELINE_LOCK:
+            if _JOBS is None:
+                from gridgent.core.jobs import JobManager
+
+                # Job workers pause between steps while interactive requests are in flight.
+                _JOBS = JobManager(
+                    orchestrator,
+                    workers=int(os.environ.get("GRID_GENT_JOB_WORKERS", "2")),
+                    yield_to=ADMISSION.interactive_busy,
+                )
+    return _JOBS
+
+
+def __getattr__(name: str) -> Any:
+    # Backwards compatibility for code that used the old module-level singletons.
+    if name == "ORCHESTRATOR":
+        return get_orchestrator()
+    if name == "JOBS":
+        return get_jobs()
+    raise AttributeError(name)
+
+
+def warm_up() -> Dict[str, float]:
+    """Import the pipeline and prime caches before serving; returns per-phase timings in ms."""
+    timings: Dict[str, float] = {}
+
+    def _phase(name: str, fn) -> None:
+        t0 = time.perf_counter()
+        fn()
+        timings[name] = round((time.perf_counter() - t0) * 1000.0, 2)
+
+    _phase("import_pipeline", get_orchestrator)
+    _phase("load_config", get_config_version)
+
+    def _solver() -> None:
+        from gridgent.tools.solvers import check_solver_config
+
+        check_solver_config()
+
+    _phase("solver", _solver)
+    _phase("feeder_index", get_feeder_index)
+
+    def _hosting_table() -> None:
+        from gridgent.tools.hosting_map import refresh_hosting_table
+
+        refresh_hosting_table()
+
+    _phase("hosting_table", _hosting_table)
+
+    def _rollups() -> None:
+        from gridgent.tools.rollups import get_rollups
+
+        get_rollups()
+
+    _phase("rollups", _rollups)
+
+    def _sensitivity_table() -> None:
+        from gridgent.tools.sensitivity import fast_path_enabled, refresh_sensitivity_table
+
+        if fast_path_enabled():
+            refresh_sensitivity_table()
+
+    _phase("sensitivity_table", _sensitivity_table)
+    # Exercise the classifier and every stage once so lazy per-module state is initialized.
+    _phase("first_query", lambda: get_orchestrator().run("Simulate adding 1 MW of load on feeder F1", trace="none", record=False))
+    _phase("job_manager", get_jobs)
+    return timings
 
 
 def _read_file(path: str) -> str:
@@ -24,8 +167,8 @@ class GridGentHandler(BaseHTTPRequestHandler):
         self.send_response(status)
         self.send_header("Content-Type", content_type)
         self.send_header("Access-Control-Allow-Origin", "*")
-        self.send_header("Access-Control-Allow-Headers", "Content-Type")
-        self.send_header("Access-Control-Allow-Methods", "POST, GET, OPTIONS")
+        self.send_header("Access-Control-Allow-Headers", "Content-Type, X-API-Key, X-Profile, X-Admin-Token, X-Timeout-Ms")
+        self.send_header("Access-Control-Allow-Methods", "POST, GET, PATCH, OPTIONS")
         self.end_headers()
 
     def log_message(self, format, *args):
@@ -34,7 +177,60 @@ class GridGentHandler(BaseHTTPRequestHandler):
     def do_OPTIONS(self):
         self._set_common_headers(200)
 
+    def _admitted(self, handler) -> None:
+        """Run ``handler`` if admission control lets the request in, else answer 413/429/503."""
+        try:
+            length = int(self.headers.get("Content-Length") or "0")
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body's extent is unknown, so the connection cannot be reused either.
+            self._set_common_headers(400, "application/json; charset=utf-8")
+            self.wfile.write(json.dumps({"error": "Invalid Content-Length"}).encode("utf-8"))
+            self.close_connection = True
+            return
+        # Handlers read exactly this many bytes; the header is not parsed again.
+        self._content_length = length
+        decision = ADMISSION.admit(
+            self.command,
+            urlparse(self.path).path,
+            self.client_address[0],
+            api_key=self.headers.get("X-API-Key"),
+            content_length=length,
+        )
+        if not decision.admitted:
+            if length <= _DRAIN_LIMIT:
+                # Read the unwanted body so the client sees the response instead of a reset.
+                while length > 0:
+                    chunk = self.rfile.read(min(length, 65536))
+                    if not chunk:
+                        break
+                    length -= len(chunk)
+            self.send_response(decision.status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Access-Control-Allow-Origin", "*")
+            if decision.retry_after is not None:
+                self.send_header("Retry-After", str(decision.retry_after))
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(json.dumps({"error": decision.error}).encode("utf-8"))
+            self.close_connection = True
+            return
+        try:
+            handler()
+        finally:
+            decision.release()
+
     def do_GET(self):
+        self._admitted(self._handle_get)
+
+    def do_POST(self):
+        self._admitted(self._handle_post)
+
+    def do_PATCH(self):
+        self._admitted(self._handle_patch)
+
+    def _handle_get(self):
         parsed = urlparse(self.path)
         if parsed.path in ("/", "/index.html"):
             try:
@@ -48,20 +244,149 @@ class GridGentHandler(BaseHTTPRequestHandler):
             data = get_all_feeders()
             self._set_common_headers(200, "application/json; charset=utf-8")
             self.wfile.write(json.dumps({"feeders": data}).encode("utf-8"))
+        elif parsed.path == "/api/feeders/query":
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            try:
+                predicates = parse_predicates(params)
+                limit = int(params["limit"]) if "limit" in params else None
+                if limit is not None and limit < 1:
+                    raise ValueError("'limit' must be at least 1.")
+            except ValueError as exc:
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8"))
+                return
+            matches = query_feeders(predicates, limit=limit)
+            self._set_common_headers(200, "application/json; charset=utf-8")
+            self.wfile.write(json.dumps({"count": len(matches), "feeders": matches}).encode("utf-8"))
+        elif parsed.path == "/api/rollups":
+            from gridgent.tools.rollups import lookup_rollup
+
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            level = params.get("level", "substation")
+            key = params.get("id") or None
+            try:
+                data = lookup_rollup(level, key, members=params.get("members") == "1")
+            except ValueError as exc:
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8"))
+                return
+            if key is not None and data["rollup"] is None:
+                self._set_common_headers(404, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": f"No {level} '{key}' in the current model."}).encode("utf-8"))
+                return
+            self._set_common_headers(200, "application/json; charset=utf-8")
+            self.wfile.write(json.dumps(data).encode("utf-8"))
+        elif parsed.path == "/api/stats":
+            from gridgent.tools.sensitivity import sensitivity_stats
+            from gridgent.tools.solvers import solver_stats
+
+            orchestrator = get_orchestrator()
+            stats = {
+                "coalescing": orchestrator.coalescer.stats(),
+                "solvers": solver_stats(),
+                "sensitivity": sensitivity_stats(),
+                "history": orchestrator.history.stats() if orchestrator.history else None,
+                "sessions": orchestrator.sessions.stats(),
+                "cache": orchestrator.cache.stats() if orchestrator.cache else None,
+                "profiling": profiling_stats(),
+                "admission": ADMISSION.stats(),
+                "startup": STARTUP_REPORT,
+                "pid": os.getpid(),
+            }
+            self._set_common_headers(200, "application/json; charset=utf-8")
+            self.wfile.write(json.dumps(stats).encode("utf-8"))
+        elif parsed.path == "/api/history":
+            history = get_orchestrator().history
+            if history is None:
+                self._set_common_headers(404, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": "History store is disabled"}).encode("utf-8"))
+                return
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            try:
+                rows = history.history(
+                    feeder=params.get("feeder"),
+                    since=float(params["since"]) if "since" in params else None,
+                    until=float(params["until"]) if "until" in params else None,
+                    intent=params.get("intent"),
+                    limit=int(params.get("limit", 50)),
+                )
+            except ValueError as exc:
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8"))
+                return
+            self._set_common_headers(200, "application/json; charset=utf-8")
+            self.wfile.write(json.dumps({"count": len(rows), "results": rows}).encode("utf-8"))
+        elif parsed.path == "/api/export/fleet":
+            from gridgent.tools.export import fleet_rows
+
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            try:
+                batches = fleet_rows(
+                    added_pv_mw=float(params.get("added_pv_mw", 0.0)),
+                    added_load_mw=float(params.get("added_load_mw", 0.0)),
+                )
+            except ValueError as exc:
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8"))
+                return
+            self._stream_export(batches, params.get("format", "csv"), "fleet")
+        elif parsed.path == "/api/admin/profile":
+            if not self._admin_allowed():
+                self._set_common_headers(403, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": "Admin endpoints need X-Admin-Token"}).encode("utf-8"))
+                return
+            params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+            body = collapsed_stacks(reset=params.get("reset") == "1")
+            self._set_common_headers(200, "text/plain; charset=utf-8")
+            self.wfile.write(body.encode("utf-8"))
+        elif parsed.path.startswith("/api/jobs/"):
+            job = get_jobs().get(parsed.path[len("/api/jobs/"):])
+            if job is None:
+                self._set_common_headers(404, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": "Unknown job id"}).encode("utf-8"))
+                return
+            self._set_common_headers(200, "application/json; charset=utf-8")
+            self.wfile.write(json.dumps(job).encode("utf-8"))
         else:
             self._set_common_headers(404, "text/plain; charset=utf-8")
             self.wfile.write(b"Not Found")
 
+    def _stream_export(self, batches, fmt: str, name: str) -> None:
+        """Stream row batches as the body (no Content-Length; the connection closes at the end)."""
+        from gridgent.tools.export import CONTENT_TYPES, available_formats, write_rows
+
+        if fmt not in available_formats():
+            self._set_common_headers(400, "application/json; charset=utf-8")
+            self.wfile.write(
+                json.dumps({"error": f"Unsupported format '{fmt}'; available: {', '.join(available_formats())}"}).encode("utf-8")
+            )
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[fmt])
+        self.send_header("Content-Disposition", f'attachment; filename="{name}.{fmt}"')
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        write_rows(batches, self.wfile, fmt)
+
+    def _admin_allowed(self) -> bool:
+        """With ``GRID_GENT_ADMIN_TOKEN`` set the token is required; otherwise loopback only."""
+        token = os.environ.get("GRID_GENT_ADMIN_TOKEN")
+        if token:
+            return hmac.compare_digest(self.headers.get("X-Admin-Token") or "", token)
+        return self.client_address[0] in ("127.0.0.1", "::1")
+
     def _read_json(self) -> Tuple[bool, dict]:
-        length = int(self.headers.get("Content-Length") or "0")
+        length = getattr(self, "_content_length", 0)
         try:
-            body = self.rfile.read(length).decode("utf-8")
+            body = self.rfile.read(length).decode("utf-8") if length > 0 else ""
             data = json.loads(body)
             return True, data
         except Exception as exc:
             return False, {"error": f"Invalid JSON body: {exc}"}
 
-    def do_POST(self):
+    def _handle_post(self):
         parsed = urlparse(self.path)
         if parsed.path == "/api/ask":
             ok, data = self._read_json()
@@ -76,10 +401,99 @@ class GridGentHandler(BaseHTTPRequestHandler):
                 self.wfile.write(json.dumps({"error": "Missing 'query' in request body"}).encode("utf-8"))
                 return
 
-            result = ORCHESTRATOR.run(query)
+            trace = str(data.get("steps") or "full")
+            if trace not in TRACE_LEVELS:
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(
+                    json.dumps({"error": f"'steps' must be one of {', '.join(TRACE_LEVELS)}"}).encode("utf-8")
+                )
+                return
+
+            # "session": true opens a session; its id is sent back for follow-up questions.
+            session_id = data.get("session_id")
+            if session_id is not None and (not isinstance(session_id, str) or not 0 < len(session_id) <= 128):
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": "'session_id' must be a non-empty string"}).encode("utf-8"))
+                return
+            if session_id is None and data.get("session") is True:
+                session_id = uuid.uuid4().hex
+
+            try:
+                budget_ms = _request_budget_ms(data.get("timeout_ms", self.headers.get("X-Timeout-Ms")))
+            except ValueError as exc:
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8"))
+                return
+
+            mode = requested_mode(self.headers.get("X-Profile"), parse_qs(parsed.query).get("profile", [None])[0])
+            future = _ASK_POOL.submit(
+                profile_call,
+                lambda: get_orchestrator().run(query, trace=trace, session_id=session_id, deadline_ms=budget_ms),
+                mode,
+            )
+            try:
+                result, profile = future.result(None if budget_ms is None else budget_ms / 1000.0 + _DEADLINE_GRACE_S)
+            except (TimeoutError, DeadlineExceeded) as exc:
+                future.cancel()
+                error = str(exc) if isinstance(exc, DeadlineExceeded) else f"Deadline of {budget_ms:g} ms exceeded."
+                self._set_common_headers(504, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": error}).encode("utf-8"))
+                return
             resp = result.to_dict()
+            if profile is not None:
+                resp["profile"] = profile
+            if session_id is not None:
+                resp["session_id"] = session_id
             self._set_common_headers(200, "application/json; charset=utf-8")
             self.wfile.write(json.dumps(resp).encode("utf-8"))
+        elif parsed.path == "/api/jobs":
+            ok, data = self._read_json()
+            if not ok or not isinstance(data, dict):
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps(data if not ok else {"error": "Expected a JSON object"}).encode("utf-8"))
+                return
+            kind = str(data.pop("kind", "ask"))
+            priority = data.pop("priority", 5)
+            from gridgent.core.jobs import JobQueueFull
+
+            try:
+                job = get_jobs().submit(kind, data, priority=int(priority))
+            except JobQueueFull as exc:
+                self._set_common_headers(503, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8"))
+                return
+            except (TypeError, ValueError) as exc:
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8"))
+                return
+            self._set_common_headers(202, "application/json; charset=utf-8")
+            self.wfile.write(json.dumps({"job_id": job.job_id, "status": job.status}).encode("utf-8"))
+        elif parsed.path == "/api/export/scenarios":
+            from gridgent.tools.export import scenario_rows, sweep_scenarios
+
+            ok, data = self._read_json()
+            if not ok or not isinstance(data, dict):
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps(data if not ok else {"error": "Expected a JSON object"}).encode("utf-8"))
+                return
+            try:
+                if "scenarios" in data:
+                    specs = [
+                        (str(sc.get("feeder") or "F1").upper(), float(sc.get("added_pv_mw", 0.0)), float(sc.get("added_load_mw", 0.0)))
+                        for sc in data["scenarios"]
+                    ]
+                else:
+                    feeders = data.get("feeders") or [data.get("feeder") or "F1"]
+                    specs = sweep_scenarios(
+                        feeders,
+                        [float(v) for v in data.get("added_pv_mw", [0.0])],
+                        [float(v) for v in data.get("added_load_mw", [0.0])],
+                    )
+            except (AttributeError, TypeError, ValueError) as exc:
+                self._set_common_headers(400, "application/json; charset=utf-8")
+                self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8"))
+                return
+            self._stream_export(scenario_rows(specs), str(data.get("format") or "csv"), "scenarios")
         elif parsed.path == "/api/upload-grid":
             ok, data = self._read_json()
             if not ok:
@@ -95,6 +509,8 @@ class GridGentHandler(BaseHTTPRequestHandler):
             try:
                 cfg = parse_uploaded_grid(str(raw), str(fmt))
                 save_uploaded_grid(cfg)
+                get_feeder_index()
+                notify_config_changed()
                 feeders = list(cfg.get("feeders", {}).keys())
                 self._set_common_headers(200, "application/json; charset=utf-8")
                 self.wfile.write(json.dumps({"status": "ok", "feeders_loaded": feeders}).encode("utf-8"))
@@ -105,23 +521,83 @@ class GridGentHandler(BaseHTTPRequestHandler):
             self._set_common_headers(404, "application/json; charset=utf-8")
             self.wfile.write(json.dumps({"error": "Not Found"}).encode("utf-8"))
 
+    def _handle_patch(self):
+        parsed = urlparse(self.path)
+        if parsed.path != "/api/feeders":
+            self._set_common_headers(404, "application/json; charset=utf-8")
+            self.wfile.write(json.dumps({"error": "Not Found"}).encode("utf-8"))
+            return
+
+        ok, data = self._read_json()
+        if not ok or not isinstance(data, dict):
+            self._set_common_headers(400, "application/json; charset=utf-8")
+            self.wfile.write(json.dumps(data if not ok else {"error": "Expected a JSON object"}).encode("utf-8"))
+            return
+        try:
+            delta = apply_feeder_delta(data.get("upsert"), data.get("remove") or [])
+        except ValueError as exc:
+            self._set_common_headers(400, "application/json; charset=utf-8")
+            self.wfile.write(json.dumps({"error": str(exc)}).encode("utf-8"))
+            return
+        if delta["changed"] or delta["removed"]:
+            notify_config_changed()
+        self._set_common_headers(200, "application/json; charset=utf-8")
+        self.wfile.write(json.dumps({"status": "ok", **delta}).encode("utf-8"))
+
 
-def run_server(host: str = "0.0.0.0", port: int = 8000):
+def run_server(
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    warm: bool = True,
+    started_at: Optional[float] = None,
+    workers: int = 1,
+    max_requests: int = 0,
+):
+    """Serve the demo; with ``warm`` the pipeline and caches are primed before binding.
+
+    ``started_at`` is a ``time.perf_counter()`` taken at process start so the report can
+    include interpreter and import time. With ``workers`` > 1 (POSIX only) the socket is
+    bound once and shared by that many forked worker processes, each recycled after
+    ``max_requests`` requests when that is positive.
+    """
+    t0 = time.perf_counter()
+    STARTUP_REPORT.clear()
+    if started_at is not None:
+        STARTUP_REPORT["imports_ms"] = round((t0 - started_at) * 1000.0, 2)
+    if warm:
+        for phase, ms in warm_up().items():
+            STARTUP_REPORT[f"{phase}_ms"] = ms
+
+    prefork = workers > 1 and hasattr(os, "fork")
     server_address = (host, port)
-    httpd = ThreadingHTTPServer(server_address, GridGentHandler)
-    print(f"Grid-Gent demo server running at http://{host}:{port}")
+    httpd = GridGentHTTPServer(
+        server_address, GridGentHandler, max_requests=max_requests if prefork else 0, reuse_port=prefork
+    )
+    STARTUP_REPORT["time_to_ready_ms"] = round((time.perf_counter() - (started_at or t0)) * 1000.0, 2)
+    print(f"Grid-Gent demo server running at http://{host}:{port}" + (f" with {workers} workers" if prefork else ""))
+    print("Startup: " + ", ".join(f"{k}={v}" for k, v in STARTUP_REPORT.items()))
     try:
-        httpd.serve_forever()
+        if prefork:
+            serve_prefork(httpd, workers)
+        else:
+            httpd.serve_forever()
     except KeyboardInterrupt:
         print("\nShutting down server...")
     finally:
         httpd.server_close()
 
 
-if __name__ == "__main__":
-    port_str = os.environ.get("GRID_GENT_PORT", "8000")
+def _env_int(name: str, default: int) -> int:
     try:
-        port = int(port_str)
+        return int(os.environ.get(name, str(default)))
     except ValueError:
-        port = 8000
-    run_server(port=port)
+        return default
+
+
+if __name__ == "__main__":
+    run_server(
+        port=_env_int("GRID_GENT_PORT", 8000),
+        warm=os.environ.get("GRID_GENT_LAZY_START", "0") != "1",
+        workers=_env_int("GRID_GENT_WORKERS", 1),
+        max_requests=_env_int("GRID_GENT_MAX_REQUESTS", 0),
+    )
@@ -1 +1,6 @@
 # package
+from gridgent.agents.intent import IntentAgent
+from gridgent.agents.planning import PlanningAgent
+from gridgent.agents.narrator import NarratorAgent
+
+__all__ = ["IntentAgent", "PlanningAgent", "NarratorAgent"]
@@ -1,6 +1,90 @@
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
+import math
 import re
+import time
+
+_LOWER_BOUND_OPS = {"above", "over", "more than", "greater than", "at least", "exceeding"}
+_FILTER_RE = re.compile(
+    r"(above|over|more than|greater than|at least|exceeding|below|under|less than|at most)\s+"
+    r"(\d+(?:\.\d+)?)\s*(%|percent|mw|customers)?\s*(?:of\s+)?"
+    r"(loading|loaded|load|pv|solar|peak|demand|customers)?"
+)
+
+_NUM = r"\d+(?:\.\d+)?"
+_STEP = (
+    r"(?P<subject>\s+of\s+(?:new\s+|additional\s+|extra\s+|rooftop\s+)?(?:pv|solar|load|demand))?"
+    rf"(?:,?\s*(?:in|with|at|using)?\s*(?P<step>{_NUM})\s*mw\s*(?:steps?|increments?)"
+    rf"|,?\s*(?:in|with|using)?\s*(?:steps?|increments?)\s+of\s+(?P<step_of>{_NUM})\s*(?:mw)?)?"
+)
+# One MW mention: a range ("1 to 10 MW in 1 MW steps", "between 2 and 6 MW"), a list
+# ("2, 4 and 6 MW") or a single value ("5 MW").
+_MW_GROUP_RE = re.compile(
+    rf"(?:between\s+(?P<lo>{_NUM})\s*(?:mw\s*)?and\s*(?P<hi>{_NUM})\s*mw"
+    rf"|(?P<lo2>{_NUM})\s*(?:mw\s*)?(?:to|-|through)\s*(?P<hi2>{_NUM})\s*mw)"
+    + _STEP
+    + rf"|(?P<list>(?:{_NUM}\s*(?:mw)?\s*(?:,\s*(?:and|or)?|and|or)\s*)+{_NUM})\s*mw"
+    rf"|(?P<single>{_NUM})\s*mw"
+)
+# What an MW amount refers to; also used to resolve session follow-ups.
+PV_WORDS_RE = re.compile(r"pv|solar|rooftop|\bder\b")
+LOAD_WORDS_RE = re.compile(r"load|demand|\bevs?\b|electrification|data cent")
+# Whole words only, so "frankly" or "the ranking" do not read as a request to rank feeders.
+_FLEET_SCREENING_RE = re.compile(r"\b(?:which|all|worst) feeders\b|\bclosest to\b|\brank\b|\bscreen\b|\bfleet\b")
+_VOLTAGE_CONTROL_WORDS = (
+    "volt-var",
+    "volt var",
+    "voltvar",
+    "smart inverter",
+    "inverter setting",
+    "power factor",
+    "regulator",
+    "over-voltage",
+    "overvoltage",
+    "mitigat",
+    "remediat",
+)
+_FORECAST_WORDS = (
+    "annual",
+    "per year",
+    "a year",
+    "each year",
+    "yearly",
+    "/yr",
+    "forecast",
+    "projection",
+    "horizon",
+    "when will",
+    " years",
+)
+_PCT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:%|percent)")
+_HORIZON_RE = re.compile(r"(?:over|next|within|for|in)\s+(?:the\s+next\s+)?(\d+)\s*(?:-|\s)?years?|(\d+)[- ]year")
+_BY_YEAR_RE = re.compile(r"\bby\s+(20\d\d)\b")
+_EV_MW_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*mw\s+(?:of\s+)?(?:new\s+)?(?:ev|electric vehicle)s?(?:\s+load)?\s+(?:per|a|each)\s+year"
+)
+# EV adoption mentioned without a number: linear growth as a share of today's peak.
+DEFAULT_EV_PCT_PER_YEAR = 1.0
+_FEEDER_RE = re.compile(r"\bfeeder\s+f?(\d+)\b|\bf(\d+)\b")
+# "substation S4", "region 2", "north region", or "per substation" / "by region". An id
+# after the keyword needs a digit so "the substation overloaded" is not read as one.
+_ROLLUP_ID_RES = (
+    re.compile(r"\b(?P<level>substation|region)\s+(?:id\s+)?(?P<id>[a-z-]*\d[\w.'-]*)"),
+    re.compile(r"\b(?P<id>[a-z0-9][\w.-]*)\s+(?P<level>substation|region)\b"),
+)
+_ROLLUP_ALL_RE = re.compile(r"\b(?:per|by|each|every|all|across|which)\s+(?:the\s+)?(substation|region)s?\b|\b(substation|region)s\b")
+# Words around "substation"/"region" that are not the group's id.
+_ROLLUP_STOPWORDS = {
+    "a", "all", "an", "and", "any", "at", "by", "distribution", "each", "every", "existing", "for", "grid", "has",
+    "have", "headroom", "in", "is", "its", "level", "local", "main", "my", "nearest", "new", "of", "on", "one",
+    "our", "per", "primary", "rollup", "same", "that", "the", "their", "this", "to", "total", "totals",
+    "transmission", "which", "with", "your",
+}
+
+# Upper bound on feeders x PV x load combinations evaluated for one question.
+MAX_SCENARIOS = 200
+MAX_RANGE_POINTS = 100
+MAX_FORECAST_YEARS = 50
 
 
 class IntentAgent:
@@ -65,7 +149,20 @@ class IntentAgent:
                 "has_grid_keywords": False,
             }
 
-        if any(k in text for k in ["host", "hosting capacity", "add pv", "rooftop pv", "solar"]):
+        filters = self._extract_filters(text)
+
+        if filters and "feeders" in text:
+            intent = "feeder_query"
+        elif any(k in text for k in _FORECAST_WORDS) and (_PCT_RE.search(text) or "ev" in text.split()):
+            intent = "load_forecast"
+        elif not _FEEDER_RE.search(text) and self._extract_rollup(text) is not None:
+            intent = "rollup"
+        elif _FLEET_SCREENING_RE.search(text) and not (has_mw and len(self._extract_feeders(text)) == 1):
+            # One feeder and an MW amount is a scenario on that feeder, whatever else is said.
+            intent = "fleet_screening"
+        elif any(k in text for k in _VOLTAGE_CONTROL_WORDS) or re.search(r"\btaps?\b", text):
+            intent = "voltage_control"
+        elif any(k in text for k in ["host", "hosting capacity", "add pv", "rooftop pv", "solar"]):
             intent = "hosting_capacity"
         elif any(k in text for k in ["explain", "how does"]):
             intent = "explanation"
@@ -74,23 +171,24 @@ class IntentAgent:
         else:
             intent = "simulation"
 
-        feeder = None
-        if "feeder f2" in text or "feeder 2" in text or "f2" in text:
-            feeder = "F2"
-        elif "feeder f3" in text or "feeder 3" in text or "f3" in text:
-            feeder = "F3"
-        elif "feeder f1" in text or "feeder 1" in text or "f1" in text:
-            feeder = "F1"
-
-        added_pv = 0.0
-        added_load = 0.0
-        mw_matches = re.findall(r"(\d+(?:\.\d+)?)\s*mw", text)
-        if mw_matches:
-            value = float(mw_matches[0])
-            if "pv" in text or "solar" in text or "rooftop" in text:
-                added_pv = value
-            else:
-                added_load = value
+        feeders = self._extract_feeders(text)
+        feeder = feeders[0] if feeders else None
+
+        pv_values, load_values = self._extract_mw_values(text)
+        added_pv = pv_values[0] if pv_values else 0.0
+        added_load = load_values[0] if load_values else 0.0
+
+        scenarios: List[Dict[str, Any]] = []
+        for f in feeders or [None]:
+            for pv in pv_values or [0.0]:
+                for load in load_values or [0.0]:
+                    scenarios.append({"feeder": f, "added_pv_mw": pv, "added_load_mw": load})
+        truncated = len(scenarios) > MAX_SCENARIOS
+
+        top_k = 5
+        top_match = re.search(r"(?:top|worst)\s+(\d+)", text)
+        if top_match:
+            top_k = max(1, int(top_match.group(1)))
 
         return {
             "intent": intent,
@@ -100,4 +198,140 @@ class IntentAgent:
             "has_mw": has_mw,
             "has_feeder": feeder is not None,
             "has_grid_keywords": grid_keywords,
+            "top_k": top_k,
+            "filters": filters,
+            "feeders": feeders,
+            "scenarios": scenarios[:MAX_SCENARIOS],
+            "scenarios_truncated": truncated,
+            "forecast": self._extract_growth(text) if intent == "load_forecast" else None,
+            "rollup": self._extract_rollup(text) if intent == "rollup" else None,
+        }
+
+    def _extract_rollup(self, text: str) -> Optional[Dict[str, Any]]:
+        """``{"level", "id"}`` for a named substation/region, id None for all of them."""
+        for pattern in _ROLLUP_ID_RES:
+            for match in pattern.finditer(text):
+                key = re.sub(r"'s$", "", match.group("id").rstrip(".?!,"))
+                if key and key not in _ROLLUP_STOPWORDS and not key.startswith(("substation", "region")):
+                    return {"level": match.group("level"), "id": key.upper()}
+        match = _ROLLUP_ALL_RE.search(text)
+        if match:
+            return {"level": match.group(1) or match.group(2), "id": None}
+        return None
+
+    def _extract_growth(self, text: str) -> Dict[str, Any]:
+        """Growth assumptions such as '3% annual growth', '5% solar growth', 'EV adoption', 'over 15 years'."""
+        growth: Dict[str, Any] = {
+            "load_growth_pct": 0.0,
+            "pv_growth_pct": 0.0,
+            "ev_pct_per_year": 0.0,
+            "ev_mw_per_year": 0.0,
         }
+        for match in _PCT_RE.finditer(text):
+            context = text[max(0, match.start() - 25):match.end() + 25]
+            key = "pv_growth_pct" if PV_WORDS_RE.search(context) else "load_growth_pct"
+            if not growth[key]:
+                growth[key] = float(match.group(1))
+
+        ev_match = _EV_MW_RE.search(text)
+        if ev_match:
+            growth["ev_mw_per_year"] = float(ev_match.group(1))
+        elif re.search(r"\bevs?\b|electric vehicle", text):
+            growth["ev_pct_per_year"] = DEFAULT_EV_PCT_PER_YEAR
+
+        horizon = None
+        horizon_match = _HORIZON_RE.search(text)
+        by_match = _BY_YEAR_RE.search(text)
+        if horizon_match:
+            horizon = int(horizon_match.group(1) or horizon_match.group(2))
+        elif by_match:
+            horizon = int(by_match.group(1)) - time.localtime().tm_year
+        if horizon is not None:
+            growth["horizon_years"] = max(1, min(horizon, MAX_FORECAST_YEARS))
+        return growth
+
+    def _extract_feeders(self, text: str) -> List[str]:
+        """Feeder ids in order of first mention ("F2", "feeder 3", "f1 and f3")."""
+        feeders: List[str] = []
+        for match in _FEEDER_RE.finditer(text):
+            fid = f"F{match.group(1) or match.group(2)}"
+            if fid not in feeders:
+                feeders.append(fid)
+        return feeders
+
+    def _extract_mw_values(self, text: str) -> Tuple[List[float], List[float]]:
+        """Split every MW mention into PV and load values, expanding lists and ranges.
+
+        Each mention is attributed by the nearest subject word after it ("6 MW of PV"),
+        then before it ("load grows by 2 MW"); otherwise any PV wording in the question
+        makes it PV, as the single-value parser always did.
+        """
+        pv_values: List[float] = []
+        load_values: List[float] = []
+        prev_end = 0
+        for match in _MW_GROUP_RE.finditer(text):
+            values = self._expand_mw_group(match)
+            # Ranges may swallow their subject ("1 to 10 MW of PV in 1 MW steps").
+            following = text[match.end():match.end() + 40]
+            after = (match.group("subject") or "") + re.split(r"\d", following, maxsplit=1)[0]
+            before = text[prev_end:match.start()]
+            prev_end = match.end()
+
+            pv_after, load_after = PV_WORDS_RE.search(after), LOAD_WORDS_RE.search(after)
+            if pv_after or load_after:
+                is_pv = bool(pv_after) and (not load_after or pv_after.start() < load_after.start())
+            else:
+                pv_before = [m.end() for m in PV_WORDS_RE.finditer(before)]
+                load_before = [m.end() for m in LOAD_WORDS_RE.finditer(before)]
+                if pv_before or load_before:
+                    is_pv = max(pv_before, default=-1) > max(load_before, default=-1)
+                else:
+                    is_pv = bool(PV_WORDS_RE.search(text))
+
+            target = pv_values if is_pv else load_values
+            for value in values:
+                if value not in target:
+                    target.append(value)
+        return pv_values, load_values
+
+    def _expand_mw_group(self, match: "re.Match[str]") -> List[float]:
+        groups = match.groupdict()
+        if groups["single"] is not None:
+            return [float(groups["single"])]
+        if groups["list"] is not None:
+            return [float(v) for v in re.findall(_NUM, groups["list"])]
+
+        lo = float(groups["lo"] if groups["lo"] is not None else groups["lo2"])
+        hi = float(groups["hi"] if groups["hi"] is not None else groups["hi2"])
+        lo, hi = min(lo, hi), max(lo, hi)
+        step = float(groups["step"] or groups["step_of"] or 1.0)
+        if step <= 0:
+            step = 1.0
+        # Coarsen the step rather than flood the solver with near-identical points.
+        step *= max(1, math.ceil((hi - lo) / step / (MAX_RANGE_POINTS - 1)))
+        count = int((hi - lo) / step + 1e-9) + 1
+        values = [round(lo + i * step, 6) for i in range(count)]
+        if values[-1] < hi - 1e-9:
+            values.append(hi)
+        return values
+
+    def _extract_filters(self, text: str) -> Dict[str, List[Optional[float]]]:
+        """Pull attribute predicates like 'above 80% loading' or 'more than 3 MW of PV'."""
+        filters: Dict[str, List[Optional[float]]] = {}
+        for match in _FILTER_RE.finditer(text):
+            op, raw_value, unit, subject = match.groups()
+            unit = (unit or "").strip()
+            subject = subject or ""
+            if unit in {"%", "percent"} or (subject.startswith("load") and not unit):
+                field = "loading_pct"
+            elif unit == "customers" or subject == "customers":
+                field = "num_customers"
+            elif subject in {"pv", "solar"}:
+                field = "pv_mw"
+            elif unit == "mw":
+                field = "peak_mw"
+            else:
+                continue
+            side = 0 if op in _LOWER_BOUND_OPS else 1
+            filters.setdefault(field, [None, None])[side] = float(raw_value)
+        return filters
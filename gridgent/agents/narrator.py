@@ -4,6 +4,16 @@ from typing import Dict, Any, List
 
 class NarratorAgent:
     def narrate(self, query: str, technical: Dict[str, Any]) -> str:
+        text = self._narrate(query, technical)
+        partial = technical.get("partial")
+        if partial:
+            text += (
+                f"\n\nNote: the time budget for this question ran out, so these results are partial "
+                f"({', '.join(partial)} stopped early). Ask again with a longer timeout for the full analysis."
+            )
+        return text
+
+    def _narrate(self, query: str, technical: Dict[str, Any]) -> str:
         intent = technical.get("intent", "simulation")
 
         if intent == "unknown":
@@ -23,6 +33,9 @@ class NarratorAgent:
             lines.append("- What is the impact on voltages if load grows by 2 MW on feeder F3?")
             return "\n".join(lines)
 
+        if "comparison" in technical:
+            return self._narrate_comparison(query, technical)
+
         if intent == "explanation" and "power_flow" not in technical:
             topic = technical.get("topic_hint", "").lower()
             lines = []
@@ -46,6 +59,15 @@ class NarratorAgent:
             lines.append("- Simulate adding 3 MW of load on feeder F1.")
             return "\n".join(lines)
 
+        if intent == "fleet_screening":
+            return self._narrate_screening(query, technical)
+        if intent == "feeder_query":
+            return self._narrate_feeder_query(query, technical)
+        if intent == "load_forecast":
+            return self._narrate_forecast(query, technical)
+        if intent == "rollup":
+            return self._narrate_rollup(query, technical)
+
         pf = technical["power_flow"]
         meta = technical["feeder_meta"]
         loading_margin = float(technical.get("loading_margin_pct", 0.0))
@@ -67,6 +89,13 @@ class NarratorAgent:
         lines.append(f"- Loading margin to 100% (approx): {loading_margin:.1f}% points.")
         lines.append(f"- Minimum voltage: {pf['min_voltage_pu']:.3f} pu")
         lines.append(f"- Maximum voltage: {pf['max_voltage_pu']:.3f} pu")
+        approximation = pf.get("approximation") or {}
+        if approximation.get("method") == "sensitivity":
+            bound = approximation["error_bound"]
+            lines.append(
+                f"- Estimated from precomputed sensitivities: within ±{bound['peak_loading_pct']:.2f}% loading "
+                f"and ±{max(bound['min_voltage_pu'], bound['max_voltage_pu']):.4f} pu of a full solve."
+            )
 
         if pf["overload_elements"]:
             lines.append("")
@@ -78,6 +107,16 @@ class NarratorAgent:
             lines.append("No major issues were flagged in this simplified view.")
 
         if intent == "hosting_capacity":
+            hosting = technical.get("hosting")
+            if hosting:
+                lines.append("")
+                lines.append(
+                    f"- Estimated PV hosting capacity (demo model): about {hosting['pv_hosting_capacity_mw']:.1f} MW "
+                    f"of additional PV, limited by {hosting['pv_limiting_factor']}."
+                )
+                lines.append(
+                    f"- Remaining headroom after this scenario: {hosting['remaining_pv_headroom_mw']:.1f} MW."
+                )
             lines.append("")
             lines.append(
                 "Hosting capacity interpretation (demo-only): In this toy model, we look at loading and "
@@ -88,6 +127,27 @@ class NarratorAgent:
                 "system engineers."
             )
 
+        control = technical.get("voltage_control")
+        if control:
+            lines.append("")
+            lines.append("Voltage-control options (demo model):")
+            if control["gain_mw"] > 0:
+                lines.append(
+                    f"- Best setting found: {control['best_setting']['label']}, raising PV hosting capacity from "
+                    f"about {control['baseline_pv_capacity_mw']:.1f} MW to {control['optimized_pv_capacity_mw']:.1f} MW "
+                    f"(+{control['gain_mw']:.1f} MW)."
+                )
+                scenario = control["scenario"]
+                outcome = "within limits" if scenario["resolved"] else "still outside limits"
+                lines.append(
+                    f"- With that setting this scenario's maximum voltage moves from {scenario['max_voltage_pu_before']:.3f} "
+                    f"to {scenario['max_voltage_pu_after']:.3f} pu ({outcome})."
+                )
+                for alt in control["alternatives"]:
+                    lines.append(f"  • Alternative: {alt['label']} ({alt['pv_capacity_mw']:.1f} MW)")
+            else:
+                lines.append("- None of the searched tap or inverter settings increased PV hosting capacity here.")
+
         lines.append("")
         lines.append(pf["notes"])
 
@@ -100,3 +160,216 @@ class NarratorAgent:
         )
 
         return "\n".join(lines)
+
+    def _narrate_screening(self, query: str, technical: Dict[str, Any]) -> str:
+        screening = technical["screening"]
+
+        lines: List[str] = []
+        lines.append(f"You asked: {query.strip()}")
+        lines.append("")
+        screened = (
+            f"{screening['num_screened']} of {screening['num_feeders']}"
+            if screening.get("partial")
+            else f"{screening['num_feeders']}"
+        )
+        lines.append(
+            f"Grid-Gent screened {screened} feeders assuming "
+            f"+{technical['added_load_mw']:.1f} MW of extra load and +{technical['added_pv_mw']:.1f} MW of "
+            f"additional PV on each."
+        )
+        lines.append("")
+        lines.append("Closest to the loading limit (demo model):")
+        for rank, entry in enumerate(screening["worst_loading"], start=1):
+            lines.append(
+                f"  {rank}. {entry['name']} ({entry['feeder']}): {entry['peak_loading_pct']:.1f}% loading, "
+                f"margin {entry['loading_margin_pct']:.1f}% points"
+            )
+        lines.append("")
+        lines.append("Closest to the voltage limits (0.95-1.05 pu):")
+        for rank, entry in enumerate(screening["worst_voltage"], start=1):
+            lines.append(
+                f"  {rank}. {entry['name']} ({entry['feeder']}): {entry['min_voltage_pu']:.3f}-"
+                f"{entry['max_voltage_pu']:.3f} pu, margin {entry['voltage_margin_pu']:.3f} pu"
+            )
+
+        lines.append("")
+        lines.append(
+            "Important: This ranking uses the same simplified demonstration model for every feeder. "
+            "Treat it as a triage list for detailed engineering studies, not as a study result."
+        )
+        return "\n".join(lines)
+
+    def _narrate_comparison(self, query: str, technical: Dict[str, Any]) -> str:
+        comparison = technical["comparison"]
+        rows = comparison["scenarios"]
+
+        lines: List[str] = []
+        lines.append(f"You asked: {query.strip()}")
+        lines.append("")
+        lines.append(f"Grid-Gent compared {len(rows)} scenarios with the simplified model (demo):")
+        if comparison.get("truncated"):
+            lines.append("(The question expanded to more combinations than allowed; only the first ones were run.)")
+        lines.append("")
+        lines.append("| Feeder | +PV MW | +Load MW | Loading % | Vmin pu | Vmax pu | Issues |")
+        lines.append("|---|---:|---:|---:|---:|---:|---:|")
+        for row in rows[:50]:
+            lines.append(
+                f"| {row['feeder']} | {row['added_pv_mw']:.1f} | {row['added_load_mw']:.1f} | "
+                f"{row['peak_loading_pct']:.1f} | {row['min_voltage_pu']:.3f} | {row['max_voltage_pu']:.3f} | "
+                f"{len(row['overload_elements'])} |"
+            )
+        if len(rows) > 50:
+            lines.append(f"... and {len(rows) - 50} more scenarios (see the trace for the full set).")
+
+        clean = [row for row in rows if not row["overload_elements"]]
+        worst = max(rows, key=lambda row: row["peak_loading_pct"])
+        lines.append("")
+        lines.append(f"- {len(clean)} of {len(rows)} scenarios raised no flags in this simplified view.")
+        lines.append(
+            f"- Highest loading: {worst['peak_loading_pct']:.1f}% on {worst['feeder']} with "
+            f"+{worst['added_pv_mw']:.1f} MW PV and +{worst['added_load_mw']:.1f} MW load."
+        )
+
+        lines.append("")
+        lines.append(
+            "Important: This is a deliberately simplified demonstration model. Use the comparison to pick "
+            "scenarios for detailed engineering studies, not for operational or investment decisions."
+        )
+        return "\n".join(lines)
+
+    def _narrate_forecast(self, query: str, technical: Dict[str, Any]) -> str:
+        result = technical["forecast"]
+        a = result["assumptions"]
+        end_year = result["start_year"] + a["horizon_years"]
+
+        growth = [f"{a['load_growth_pct']:g}% compound annual load growth"]
+        if a["ev_mw_per_year"]:
+            growth.append(f"{a['ev_mw_per_year']:g} MW of new EV load per year")
+        elif a["ev_pct_per_year"]:
+            growth.append(f"EV load adding {a['ev_pct_per_year']:g}% of today's peak each year")
+        if a["pv_growth_pct"]:
+            growth.append(f"{a['pv_growth_pct']:g}% annual PV growth")
+
+        lines: List[str] = []
+        lines.append(f"You asked: {query.strip()}")
+        lines.append("")
+        lines.append(f"Grid-Gent projected {result['start_year']}-{end_year} assuming {', '.join(growth)}.")
+        lines.append("")
+        for entry in result["feeders"]:
+            first = entry["first_year"]
+            if first["overload"] is not None:
+                headline = f"first exceeds its rating in {first['overload']}"
+            else:
+                headline = f"stays within its rating through {end_year}"
+            lines.append(f"- {entry['name']} ({entry['feeder']}) {headline}.")
+            for name in ("thermal_warning", "low_voltage", "over_voltage"):
+                if first[name] is not None:
+                    lines.append(f"  • {result['thresholds'][name]} from {first[name]}")
+            final = entry["final"]
+            lines.append(
+                f"  • {final['year']}: {final['peak_loading_pct']:.1f}% loading, "
+                f"{final['min_voltage_pu']:.3f}-{final['max_voltage_pu']:.3f} pu"
+            )
+        if len(result["feeders"]) < result["num_feeders"]:
+            lines.append(
+                f"(Showing the {len(result['feeders'])} soonest of {result['num_feeders']} feeders; "
+                f"{result['num_overloading']} overload within the horizon.)"
+            )
+
+        lines.append("")
+        lines.append(
+            "Important: These projections compound simple growth rates on the simplified demonstration model. "
+            "Use them to prioritize detailed load forecasts and planning studies, not as a forecast of record."
+        )
+        return "\n".join(lines)
+
+    def _narrate_feeder_query(self, query: str, technical: Dict[str, Any]) -> str:
+        labels = {
+            "peak_mw": ("peak demand", "MW"),
+            "pv_mw": ("installed PV", "MW"),
+            "num_customers": ("customers", ""),
+            "loading_pct": ("base loading", "%"),
+        }
+        criteria: List[str] = []
+        for field, (lo, hi) in technical["filters"].items():
+            label, unit = labels.get(field, (field, ""))
+            if lo is not None:
+                criteria.append(f"{label} >= {lo:g}{unit and ' ' + unit}")
+            if hi is not None:
+                criteria.append(f"{label} <= {hi:g}{unit and ' ' + unit}")
+
+        matches = technical["matches"]
+        lines: List[str] = []
+        lines.append(f"You asked: {query.strip()}")
+        lines.append("")
+        lines.append(f"Filters applied: {', '.join(criteria)}.")
+        if not matches:
+            lines.append("No feeders in the current model match these filters.")
+            return "\n".join(lines)
+
+        lines.append(f"{len(matches)} feeder(s) match:")
+        for row in matches[:25]:
+            lines.append(
+                f"- {row.get('name', row['feeder'])} ({row['feeder']}): peak {row.get('peak_mw')} MW, "
+                f"PV {row.get('pv_mw')} MW, {row.get('num_customers')} customers, "
+                f"~{row['loading_pct']:.1f}% base loading"
+            )
+        if len(matches) > 25:
+            lines.append(f"... and {len(matches) - 25} more (use /api/feeders/query for the full list).")
+        return "\n".join(lines)
+
+    def _narrate_rollup(self, query: str, technical: Dict[str, Any]) -> str:
+        level = technical["level"]
+        lines: List[str] = []
+        lines.append(f"You asked: {query.strip()}")
+        lines.append("")
+
+        if "rollup" in technical:
+            row = technical["rollup"]
+            if row is None:
+                available = technical.get("available") or []
+                lines.append(f"The current feeder model has no {level} with that id.")
+                if available:
+                    lines.append(f"Known {level}s include: {', '.join(available)}.")
+                else:
+                    lines.append(
+                        f"No feeder has a '{level}' attribute yet; upload feeders with a '{level}' field or "
+                        "column to enable these totals."
+                    )
+                return "\n".join(lines)
+            lines.append(
+                f"{level.capitalize()} {row['id']} ({row['feeders']} feeder(s), {row['num_customers']:,} customers):"
+            )
+            lines.append(f"- Combined peak demand: {row['peak_mw']:.1f} MW; installed PV: {row['pv_mw']:.1f} MW.")
+            lines.append(f"- Additional PV hosting headroom: {row['pv_headroom_mw']:.1f} MW in total.")
+            lines.append(f"- Additional load headroom: {row['load_headroom_mw']:.1f} MW in total.")
+            if row.get("feeder_ids"):
+                shown = row["feeder_ids"][:25]
+                more = len(row["feeder_ids"]) - len(shown)
+                lines.append(f"- Feeders: {', '.join(shown)}" + (f" and {more} more." if more > 0 else "."))
+        else:
+            groups = technical["groups"]
+            if not groups:
+                lines.append(
+                    f"No feeder has a '{level}' attribute yet; upload feeders with a '{level}' field or column "
+                    "to enable these totals."
+                )
+                return "\n".join(lines)
+            ranked = sorted(groups, key=lambda g: -g["pv_headroom_mw"])
+            lines.append(f"Totals for {len(groups)} {level}(s), most PV headroom first:")
+            for row in ranked[:25]:
+                lines.append(
+                    f"- {row['id']}: {row['feeders']} feeder(s), peak {row['peak_mw']:.1f} MW, "
+                    f"PV {row['pv_mw']:.1f} MW, {row['num_customers']:,} customers, "
+                    f"PV headroom {row['pv_headroom_mw']:.1f} MW, load headroom {row['load_headroom_mw']:.1f} MW"
+                )
+            if len(groups) > 25:
+                lines.append(f"... and {len(groups) - 25} more (use /api/rollups for the full list).")
+            if technical.get("unassigned_feeders"):
+                lines.append(f"{technical['unassigned_feeders']} feeder(s) have no {level} and are not counted.")
+        lines.append("")
+        lines.append(
+            "Headroom figures add up per-feeder hosting capacities from the simplified model; they do not "
+            "account for shared upstream limits such as substation transformer ratings."
+        )
+        return "\n".join(lines)
@@ -1,49 +1,76 @@
 from __future__ import annotations
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
-from gridgent.core.types import Step
-from gridgent.tools.grid_stub import run_power_flow_scenario, get_feeder_summary
+from gridgent.core.deadline import expired, mark_partial
+from gridgent.core.types import Step, Trace
+from gridgent.tools.grid_stub import VOLTAGE_MAX_PU, build_power_flow_result, get_feeder_summary
+from gridgent.tools.screening import screen_feeders
+from gridgent.tools.feeder_index import query_feeders
+from gridgent.tools.hosting_map import lookup_hosting_capacity
+from gridgent.tools.rollups import lookup_rollup
+from gridgent.tools.sensitivity import fast_path_enabled, solve_scenario_fast
+from gridgent.tools.solvers import evaluate_batch, get_backend, solve_scenario
+from gridgent.tools.voltage_control import optimize_voltage_controls, rescore_voltage_controls
+from gridgent.tools.forecast import GrowthAssumptions, forecast
+
+# Scenarios per solver call when comparing; the deadline is checked between calls.
+COMPARE_CHUNK = 64
 
 
 class PlanningAgent:
-    def plan_and_analyze(self, query: str, intent_info: Dict[str, Any]) -> Tuple[str, Dict[str, Any], List[Step]]:
+    def plan_and_analyze(
+        self,
+        query: str,
+        intent_info: Dict[str, Any],
+        trace: Optional[Trace] = None,
+        previous: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[str, Dict[str, Any], List[Step]]:
+        """``previous`` is the technical summary of the prior turn in a session (same config
+        version); searches that do not depend on what changed are reused from it."""
         intent = intent_info["intent"]
-        steps: List[Step] = []
+        trace = trace if trace is not None else Trace()
 
         if intent == "unknown":
             msg = (
                 "Received an underspecified or conversational query; no grid scenario was run. "
                 "Please mention at least a feeder (F1/F2/F3) and a change in MW load or PV."
             )
-            steps.append(
-                Step(
-                    role="planning_agent",
-                    content=msg,
-                    meta={"intent": intent},
-                )
+            trace.add(
+                role="planning_agent",
+                content=msg,
+                meta={"intent": intent},
             )
             technical_summary: Dict[str, Any] = {
                 "intent": intent,
                 "message": msg,
             }
-            return "no_scenario", technical_summary, steps
+            return "no_scenario", technical_summary, trace.steps
 
         has_mw = bool(intent_info.get("has_mw"))
         has_feeder = bool(intent_info.get("has_feeder"))
 
         if intent == "explanation" and not has_mw and not has_feeder:
-            steps.append(
-                Step(
-                    role="planning_agent",
-                    content="No specific feeder or MW change detected; treating as conceptual explanation request.",
-                    meta={"intent": intent},
-                )
+            trace.add(
+                role="planning_agent",
+                content="No specific feeder or MW change detected; treating as conceptual explanation request.",
+                meta={"intent": intent},
             )
             technical_summary = {
                 "intent": intent,
                 "topic_hint": query.strip(),
             }
-            return "conceptual", technical_summary, steps
+            return "conceptual", technical_summary, trace.steps
+
+        if intent == "fleet_screening":
+            return self._screen_fleet(intent_info, trace)
+        if intent == "feeder_query":
+            return self._query_feeders(intent_info, trace)
+        if intent == "load_forecast":
+            return self._forecast(intent_info, trace)
+        if intent == "rollup":
+            return self._rollup(intent_info, trace)
+        if len(intent_info.get("scenarios") or ()) > 1:
+            return self._compare_scenarios(intent_info, trace)
 
         feeder = intent_info.get("feeder")
         defaulted_feeder = False
@@ -54,35 +81,43 @@ class PlanningAgent:
         added_pv = float(intent_info.get("added_pv_mw", 0.0))
         added_load = float(intent_info.get("added_load_mw", 0.0))
 
+        backend = get_backend(query_type=intent)
         summary = (
             f"Analyzing feeder {feeder} with added PV={added_pv:.1f} MW, "
-            f"added load={added_load:.1f} MW using a simplified power-flow stub."
+            f"added load={added_load:.1f} MW using the '{backend.name}' power-flow backend."
         )
-        steps.append(
-            Step(
-                role="planning_agent",
-                content=summary,
-                meta={"feeder": feeder, "defaulted_feeder": defaulted_feeder},
-            )
+        trace.add(
+            role="planning_agent",
+            content=summary,
+            meta={"feeder": feeder, "defaulted_feeder": defaulted_feeder, "solver": backend.name},
         )
 
-        pf_result = run_power_flow_scenario(feeder, added_pv_mw=added_pv, added_load_mw=added_load)
-        pf_dict = pf_result.to_dict()
-        steps.append(
-            Step(
-                role="tool",
-                content="Ran simplified power-flow scenario (demo).",
-                meta=pf_dict,
+        approximation = None
+        if fast_path_enabled():
+            pf_result, approximation = solve_scenario_fast(
+                feeder, added_pv_mw=added_pv, added_load_mw=added_load, backend=backend
             )
+        else:
+            pf_result = solve_scenario(feeder, added_pv_mw=added_pv, added_load_mw=added_load, backend=backend)
+        pf_dict = pf_result.to_dict()
+        if approximation is not None:
+            pf_dict["approximation"] = approximation
+        estimated = approximation is not None and approximation["method"] == "sensitivity"
+        trace.add(
+            role="tool",
+            content=(
+                "Estimated the scenario from precomputed feeder sensitivities (demo)."
+                if estimated
+                else "Ran simplified power-flow scenario (demo)."
+            ),
+            meta=pf_dict,
         )
 
         feeder_meta = get_feeder_summary(feeder)
-        steps.append(
-            Step(
-                role="tool",
-                content="Retrieved static feeder metadata from config.",
-                meta=feeder_meta,
-            )
+        trace.add(
+            role="tool",
+            content="Retrieved static feeder metadata from config.",
+            meta=feeder_meta,
         )
 
         technical_summary: Dict[str, Any] = {
@@ -97,4 +132,213 @@ class PlanningAgent:
         rating_pct = pf_dict["peak_loading_pct"]
         technical_summary["loading_margin_pct"] = max(0.0, 100.0 - rating_pct)
 
-        return "ok", technical_summary, steps
+        if intent == "hosting_capacity":
+            hosting = lookup_hosting_capacity(feeder, added_pv_mw=added_pv, added_load_mw=added_load)
+            trace.add(
+                role="tool",
+                content=(
+                    "Looked up hosting capacity from the precomputed table."
+                    if hosting["source"] == "precomputed"
+                    else "Precomputed hosting table not ready; computed this feeder on demand."
+                ),
+                meta=hosting,
+            )
+            technical_summary["hosting"] = hosting
+
+        # Over-voltage gets a remediation search even when it was not asked for.
+        wants_control = intent == "voltage_control" or pf_dict["max_voltage_pu"] > VOLTAGE_MAX_PU
+        if wants_control and expired():
+            mark_partial("voltage_control")
+            trace.add(
+                role="planning_agent",
+                content="Time budget spent; skipped the regulator tap and inverter search.",
+                meta={"partial": True},
+            )
+        elif wants_control:
+            prior = (previous or {}).get("voltage_control")
+            if prior and prior["feeder"] == feeder and prior["scenario"]["added_load_mw"] == added_load:
+                control = rescore_voltage_controls(prior, added_pv)
+                content = "Reused the regulator tap and inverter search from the previous question at the new PV level."
+            else:
+                control = optimize_voltage_controls(feeder, added_pv_mw=added_pv, added_load_mw=added_load)
+                content = (
+                    f"Searched {control['candidates']} regulator tap and inverter settings "
+                    f"({control['evaluated']} evaluated, {control['pruned']} pruned)."
+                )
+            trace.add(role="tool", content=content, meta=control)
+            technical_summary["voltage_control"] = control
+
+        return "ok", technical_summary, trace.steps
+
+    def _screen_fleet(self, intent_info: Dict[str, Any], trace: Trace) -> Tuple[str, Dict[str, Any], List[Step]]:
+        added_pv = float(intent_info.get("added_pv_mw", 0.0))
+        added_load = float(intent_info.get("added_load_mw", 0.0))
+        top_k = int(intent_info.get("top_k", 5))
+
+        trace.add(
+            role="planning_agent",
+            content=(
+                f"Screening all feeders with added PV={added_pv:.1f} MW, added load={added_load:.1f} MW "
+                f"and ranking the {top_k} closest to their loading and voltage limits."
+            ),
+            meta={"top_k": top_k},
+        )
+
+        screening = screen_feeders(added_pv_mw=added_pv, added_load_mw=added_load, top_k=top_k).to_dict()
+        trace.add(
+            role="tool",
+            content=f"Screened {screening['num_feeders']} feeders with the simplified model (demo).",
+            meta=screening,
+        )
+
+        technical_summary: Dict[str, Any] = {
+            "intent": "fleet_screening",
+            "added_pv_mw": added_pv,
+            "added_load_mw": added_load,
+            "screening": screening,
+        }
+        return "ok", technical_summary, trace.steps
+
+    def _compare_scenarios(
+        self, intent_info: Dict[str, Any], trace: Trace
+    ) -> Tuple[str, Dict[str, Any], List[Step]]:
+        intent = intent_info["intent"]
+        specs = [dict(spec, feeder=spec.get("feeder") or "F1") for spec in intent_info["scenarios"]]
+        backend = get_backend(query_type=intent)
+
+        trace.add(
+            role="planning_agent",
+            content=(
+                f"Comparing {len(specs)} scenarios across feeder(s) "
+                f"{', '.join(dict.fromkeys(spec['feeder'] for spec in specs))} in batched "
+                f"'{backend.name}' solver calls."
+            ),
+            meta={
+                "num_scenarios": len(specs),
+                "truncated": bool(intent_info.get("scenarios_truncated")),
+                "solver": backend.name,
+            },
+        )
+
+        metas = {feeder: get_feeder_summary(feeder) for feeder in dict.fromkeys(spec["feeder"] for spec in specs)}
+        metrics: List[Tuple[float, float, float]] = []
+        for start in range(0, len(specs), COMPARE_CHUNK):
+            if start and expired():
+                mark_partial("comparison")
+                break
+            chunk = specs[start:start + COMPARE_CHUNK]
+            metrics += evaluate_batch(
+                [(metas[spec["feeder"]], spec["added_pv_mw"], spec["added_load_mw"]) for spec in chunk],
+                backend=backend,
+            )
+        partial = len(metrics) < len(specs)
+        rows: List[Dict[str, Any]] = []
+        for spec, (loading, vmin, vmax) in zip(specs, metrics):
+            row = build_power_flow_result(spec["feeder"], loading, vmin, vmax).to_dict()
+            row["added_pv_mw"] = spec["added_pv_mw"]
+            row["added_load_mw"] = spec["added_load_mw"]
+            row["loading_margin_pct"] = max(0.0, 100.0 - row["peak_loading_pct"])
+            rows.append(row)
+        trace.add(
+            role="tool",
+            content=(
+                f"Ran {len(rows)} of {len(specs)} scenarios before the time budget ran out (demo)."
+                if partial
+                else f"Ran {len(rows)} simplified power-flow scenarios in batched solver calls (demo)."
+            ),
+            meta=lambda: {"scenarios": rows, "partial": partial},
+        )
+
+        technical_summary: Dict[str, Any] = {
+            "intent": intent,
+            "comparison": {
+                "solver": backend.name,
+                "truncated": bool(intent_info.get("scenarios_truncated")),
+                "feeder_meta": metas,
+                "scenarios": rows,
+                "partial": partial,
+            },
+        }
+        return "ok", technical_summary, trace.steps
+
+    def _forecast(self, intent_info: Dict[str, Any], trace: Trace) -> Tuple[str, Dict[str, Any], List[Step]]:
+        assumptions = GrowthAssumptions(**(intent_info.get("forecast") or {}))
+        feeders = list(intent_info.get("feeders") or [])
+        top_k = int(intent_info.get("top_k", 5))
+
+        trace.add(
+            role="planning_agent",
+            content=(
+                f"Projecting {', '.join(feeders) if feeders else 'all feeders'} over "
+                f"{assumptions.horizon_years} years with {assumptions.load_growth_pct:g}% annual load growth"
+                + (" plus EV adoption" if assumptions.ev_pct_per_year or assumptions.ev_mw_per_year else "")
+                + (f" and {assumptions.pv_growth_pct:g}% annual PV growth" if assumptions.pv_growth_pct else "")
+                + "."
+            ),
+            meta=assumptions.to_dict(),
+        )
+
+        result = forecast(assumptions, feeder_ids=feeders, top_k=top_k)
+        trace.add(
+            role="tool",
+            content=(
+                f"Evaluated {result['num_feeders']} feeder(s) across {assumptions.horizon_years + 1} years in "
+                f"batched solver calls; {result['num_overloading']} overload within the horizon."
+            ),
+            meta=result,
+        )
+
+        technical_summary: Dict[str, Any] = {
+            "intent": "load_forecast",
+            "forecast": result,
+        }
+        return "ok", technical_summary, trace.steps
+
+    def _query_feeders(self, intent_info: Dict[str, Any], trace: Trace) -> Tuple[str, Dict[str, Any], List[Step]]:
+        filters = {field: (bounds[0], bounds[1]) for field, bounds in intent_info.get("filters", {}).items()}
+
+        trace.add(
+            role="planning_agent",
+            content="Translating the question into attribute filters over the feeder index.",
+            meta={"filters": intent_info.get("filters", {})},
+        )
+
+        matches = query_feeders(filters)
+        trace.add(
+            role="tool",
+            content=f"Queried the feeder index; {len(matches)} feeder(s) matched.",
+            meta=lambda: {"num_matches": len(matches), "feeders": [m["feeder"] for m in matches]},
+        )
+
+        technical_summary: Dict[str, Any] = {
+            "intent": "feeder_query",
+            "filters": intent_info.get("filters", {}),
+            "matches": matches,
+        }
+        return "ok", technical_summary, trace.steps
+
+    def _rollup(self, intent_info: Dict[str, Any], trace: Trace) -> Tuple[str, Dict[str, Any], List[Step]]:
+        target = intent_info.get("rollup") or {"level": "substation", "id": None}
+        level, key = target["level"], target.get("id")
+        trace.add(
+            role="planning_agent",
+            content=(
+                f"Reading precomputed totals for {level} {key}."
+                if key
+                else f"Reading precomputed totals for every {level}."
+            ),
+            meta=dict(target),
+        )
+
+        data = lookup_rollup(level, key, members=key is not None)
+        if key is not None:
+            found = data["rollup"] is not None
+            content = f"Looked up the {level} rollup; {key} {'found' if found else 'not found'}."
+            if not found:
+                data["available"] = [row["id"] for row in lookup_rollup(level)["groups"][:20]]
+        else:
+            content = f"Looked up the {level} rollups; {len(data['groups'])} {level}(s) in the model."
+        trace.add(role="tool", content=content, meta=lambda: data)
+
+        technical_summary: Dict[str, Any] = {"intent": "rollup", **data}
+        return "ok", technical_summary, trace.steps
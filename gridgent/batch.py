@@ -0,0 +1,432 @@
+"""Offline batch runner: stream a file of questions or scenarios through the pipeline.
+
+Usage::
+
+    python -m gridgent.batch scenarios.csv -o results.jsonl --workers 4
+    python -m gridgent.batch questions.jsonl -o results/ --format columnar --resume
+
+Input is read lazily, one record at a time. JSON-lines records carry a ``query`` (or
+``question`` / ``body``) field; CSV files have a ``query`` column or structured
+``feeder``, ``added_pv_mw`` and ``added_load_mw`` columns. Results are written in input
+order as they complete, so an interrupted run can be continued with ``--resume``.
+"""
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, TextIO, Tuple
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from gridgent.core.orchestrator import GridGentOrchestrator
+from gridgent.core.types import TRACE_LEVELS, TraceLevel
+
+try:  # optional dependency
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = pq = None
+
+# Flat result columns; JSON-lines rows may additionally carry "steps".
+COLUMNS: Tuple[str, ...] = (
+    "index",
+    "id",
+    "task_id",
+    "query",
+    "intent",
+    "status",
+    "feeder",
+    "added_pv_mw",
+    "added_load_mw",
+    "peak_loading_pct",
+    "min_voltage_pu",
+    "max_voltage_pu",
+    "answer",
+    "elapsed_ms",
+    "error",
+)
+# Latency samples kept for the percentile report (reservoir sampled beyond this).
+_LATENCY_SAMPLES = 10000
+
+# (index, record) pairs as read from the input file.
+Record = Tuple[int, Dict[str, Any]]
+
+
+# -- input ----------------------------------------------------------------------------
+
+
+def read_records(path: Path) -> Iterator[Record]:
+    """Yield ``(index, record)`` for every record in a CSV or JSON-lines file, lazily."""
+    path = Path(path)
+    with path.open("r", encoding="utf-8", newline="") as fh:
+        if path.suffix.lower() == ".csv":
+            yield from enumerate(csv.DictReader(fh))
+            return
+        index = 0
+        for line_no, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({exc.msg}).") from exc
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}:{line_no}: expected a JSON object per line.")
+            yield index, record
+            index += 1
+
+
+def record_query(record: Dict[str, Any]) -> str:
+    """The question to ask for one input record."""
+    for key in ("query", "question", "body"):
+        if record.get(key):
+            return str(record[key])
+    if record.get("feeder"):
+        pv = float(record.get("added_pv_mw") or 0.0)
+        load = float(record.get("added_load_mw") or 0.0)
+        return f"Simulate adding {load:g} MW of load and {pv:g} MW of PV on feeder {record['feeder']}"
+    raise ValueError("record has no 'query' field and no 'feeder' to build one from")
+
+
+# -- workers --------------------------------------------------------------------------
+
+_ORCHESTRATOR: Optional[GridGentOrchestrator] = None
+
+
+def _orchestrator() -> GridGentOrchestrator:
+    global _ORCHESTRATOR
+    if _ORCHESTRATOR is None:
+        # No history store: a batch run would otherwise flood it with one-off scenarios.
+        _ORCHESTRATOR = GridGentOrchestrator()
+    return _ORCHESTRATOR
+
+
+def _result_row(index: int, record: Dict[str, Any], steps: TraceLevel) -> Dict[str, Any]:
+    row: Dict[str, Any] = dict.fromkeys(COLUMNS)
+    row["index"] = index
+    row["id"] = str(record.get("request_id") or record.get("id") or index)
+    t0 = time.perf_counter()
+    try:
+        row["query"] = record_query(record)
+        result = _orchestrator().run(row["query"], task_id=row["id"], trace="full", record=False)
+    except Exception as exc:  # one bad record must not stop the run
+        row["status"] = "error"
+        row["error"] = f"{type(exc).__name__}: {exc}"
+        row["elapsed_ms"] = round((time.perf_counter() - t0) * 1000.0, 3)
+        return row
+    row["elapsed_ms"] = round((time.perf_counter() - t0) * 1000.0, 3)
+    row["task_id"] = result.task_id
+    row["answer"] = result.answer
+
+    intent_info = result.steps[0].meta
+    row["intent"] = intent_info.get("intent")
+    row["feeder"] = intent_info.get("feeder")
+    row["added_pv_mw"] = intent_info.get("added_pv_mw")
+    row["added_load_mw"] = intent_info.get("added_load_mw")
+    for step in result.steps[1:]:
+        if step.role == "tool" and "peak_loading_pct" in step.meta:
+            row["feeder"] = step.meta.get("feeder", row["feeder"])
+            row["peak_loading_pct"] = step.meta["peak_loading_pct"]
+            row["min_voltage_pu"] = step.meta["min_voltage_pu"]
+            row["max_voltage_pu"] = step.meta["max_voltage_pu"]
+            break
+    row["status"] = result.steps[-1].meta.get("status")
+    if steps != "none":
+        row["steps"] = [s.to_dict(steps) for s in result.steps]
+    return row
+
+
+def run_chunk(chunk: Sequence[Record], steps: TraceLevel = "none") -> List[Dict[str, Any]]:
+    """Answer one chunk of records; runs in a worker process (or inline with one worker)."""
+    return [_result_row(index, record, steps) for index, record in chunk]
+
+
+def _chunks(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    it = iter(records)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# -- output ---------------------------------------------------------------------------
+
+
+class JsonlWriter:
+    """Appends one JSON object per line; a torn last line is dropped on resume."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._fh: Optional[TextIO] = None
+
+    def completed(self) -> int:
+        """Rows already written, after truncating any partial trailing line."""
+        if not self.path.exists():
+            return 0
+        count = 0
+        end = 0  # offset just past the last newline
+        offset = 0
+        with self.path.open("rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                newlines = block.count(b"\n")
+                if newlines:
+                    count += newlines
+                    end = offset + block.rindex(b"\n") + 1
+                offset += len(block)
+        if end != offset:
+            with self.path.open("r+b") as fh:
+                fh.truncate(end)
+        return count
+
+    def open(self, append: bool) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.path.open("a" if append else "w", encoding="utf-8")
+
+    def write(self, rows: Sequence[Dict[str, Any]]) -> None:
+        assert self._fh is not None
+        self._fh.write("".join(json.dumps(row, default=str) + "\n" for row in rows))
+        self._fh.flush()
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class ColumnarWriter:
+    """Writes a directory of part files: Parquet with pyarrow installed, CSV otherwise.
+
+    Rows are buffered and written ``rows_per_part`` at a time; each part is written to a
+    temporary name and renamed, so a part on disk is always complete.
+    """
+
+    def __init__(self, directory: Path, rows_per_part: int = 10000) -> None:
+        self.directory = Path(directory)
+        self.rows_per_part = max(1, rows_per_part)
+        self.suffix = ".parquet" if pq is not None else ".csv"
+        self._buffer: List[Dict[str, Any]] = []
+        self._next_part = 0
+
+    def _parts(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(p for p in self.directory.glob("part-*") if p.suffix in (".parquet", ".csv"))
+
+    def completed(self) -> int:
+        total = 0
+        for part in self._parts():
+            if part.suffix == ".parquet":
+                if pq is None:
+                    raise RuntimeError(f"{part} needs pyarrow to resume from.")
+                total += pq.ParquetFile(str(part)).metadata.num_rows
+            else:
+                with part.open("r", encoding="utf-8", newline="") as fh:
+                    total += sum(1 for _ in csv.reader(fh)) - 1
+        return total
+
+    def open(self, append: bool) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        parts = self._parts()
+        if not append:
+            for part in parts:
+                part.unlink()
+            parts = []
+        self._next_part = len(parts)
+
+    def write(self, rows: Sequence[Dict[str, Any]]) -> None:
+        self._buffer.extend(rows)
+        while len(self._buffer) >= self.rows_per_part:
+            self._flush(self._buffer[:self.rows_per_part])
+            del self._buffer[:self.rows_per_part]
+
+    def _flush(self, rows: Sequence[Dict[str, Any]]) -> None:
+        part = self.directory / f"part-{self._next_part:05d}{self.suffix}"
+        tmp = part.with_name(part.name + ".tmp")
+        if pq is not None:
+            columns = {name: [row.get(name) for row in rows] for name in COLUMNS}
+            pq.write_table(pa.table(columns), str(tmp))
+        else:
+            with tmp.open("w", encoding="utf-8", newline="") as fh:
+                writer = csv.DictWriter(fh, fieldnames=COLUMNS, extrasaction="ignore")
+                writer.writeheader()
+                writer.writerows(rows)
+        os.replace(tmp, part)
+        self._next_part += 1
+
+    def close(self) -> None:
+        if self._buffer:
+            self._flush(self._buffer)
+            self._buffer = []
+
+
+# -- driver ---------------------------------------------------------------------------
+
+
+class _Throughput:
+    def __init__(self, stream: Optional[TextIO], every_s: float) -> None:
+        self.stream = stream
+        self.every_s = every_s
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.rows = 0
+        self.errors = 0
+        self.samples: List[float] = []
+        self._seen = 0
+
+    def add(self, rows: Sequence[Dict[str, Any]]) -> None:
+        for row in rows:
+            self.rows += 1
+            self.errors += row["error"] is not None
+            self._seen += 1
+            if len(self.samples) < _LATENCY_SAMPLES:
+                self.samples.append(row["elapsed_ms"])
+            else:
+                slot = random.randrange(self._seen)
+                if slot < _LATENCY_SAMPLES:
+                    self.samples[slot] = row["elapsed_ms"]
+        now = time.perf_counter()
+        if self.stream is not None and now - self.last_report >= self.every_s:
+            self.last_report = now
+            rate = self.rows / max(now - self.started, 1e-9)
+            self.stream.write(f"{self.rows} rows, {rate:.1f} rows/s, {self.errors} errors\n")
+            self.stream.flush()
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        ordered = sorted(self.samples)
+
+        def pct(p: float) -> Optional[float]:
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))], 3)
+
+        return {
+            "rows": self.rows,
+            "errors": self.errors,
+            "elapsed_s": round(elapsed, 3),
+            "rows_per_s": round(self.rows / max(elapsed, 1e-9), 1),
+            "latency_ms": {"p50": pct(50), "p95": pct(95), "p99": pct(99)},
+        }
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    # Forked workers inherit the loaded feeder model instead of re-reading it.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def run_batch(
+    input_path: Path,
+    output_path: Path,
+    fmt: str = "jsonl",
+    workers: int = 1,
+    chunk_size: int = 32,
+    resume: bool = False,
+    steps: TraceLevel = "none",
+    progress: Optional[TextIO] = None,
+    progress_every_s: float = 5.0,
+    rows_per_part: int = 10000,
+) -> Dict[str, Any]:
+    """Run every record of ``input_path`` and write results to ``output_path``.
+
+    With ``resume`` the rows already in the output are kept and the matching number of
+    input records is skipped. At most ``2 * workers`` chunks are in flight, so memory
+    stays bounded however large the input is.
+    """
+    if fmt not in ("jsonl", "columnar"):
+        raise ValueError(f"Unknown output format '{fmt}'; expected 'jsonl' or 'columnar'.")
+    if steps not in TRACE_LEVELS:
+        raise ValueError(f"Unknown trace level '{steps}'; expected one of {', '.join(TRACE_LEVELS)}.")
+    if fmt == "columnar" and steps != "none":
+        raise ValueError("Columnar output holds flat columns only; use --format jsonl to keep steps.")
+    workers = max(1, int(workers))
+    chunk_size = max(1, int(chunk_size))
+
+    writer = JsonlWriter(output_path) if fmt == "jsonl" else ColumnarWriter(output_path, rows_per_part)
+    skipped = writer.completed() if resume else 0
+    writer.open(append=resume)
+    stats = _Throughput(progress, progress_every_s)
+    chunks = _chunks(itertools.islice(read_records(input_path), skipped, None), chunk_size)
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                rows = run_chunk(chunk, steps)
+                writer.write(rows)
+                stats.add(rows)
+        else:
+            with _pool(workers) as pool:
+                pending: "deque[Future[List[Dict[str, Any]]]]" = deque()
+                for chunk in chunks:
+                    pending.append(pool.submit(run_chunk, chunk, steps))
+                    # Write in input order; the head of the window gates the rest.
+                    while len(pending) >= 2 * workers:
+                        rows = pending.popleft().result()
+                        writer.write(rows)
+                        stats.add(rows)
+                while pending:
+                    rows = pending.popleft().result()
+                    writer.write(rows)
+                    stats.add(rows)
+    finally:
+        writer.close()
+
+    report = stats.report()
+    report.update(
+        {
+            "skipped": skipped,
+            "workers": workers,
+            "format": fmt if fmt == "jsonl" else f"columnar ({writer.suffix.lstrip('.')})",
+            "output": str(output_path),
+        }
+    )
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m gridgent.batch",
+        description="Run a CSV or JSON-lines file of questions/scenarios through the Grid-Gent pipeline.",
+    )
+    parser.add_argument("input", type=Path, help="input file (.csv, or JSON lines)")
+    parser.add_argument("-o", "--output", type=Path, required=True, help="output file (jsonl) or directory (columnar)")
+    parser.add_argument("--format", choices=("jsonl", "columnar"), default="jsonl")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=32, help="records sent to a worker at a time")
+    parser.add_argument("--resume", action="store_true", help="keep existing output and skip records already done")
+    parser.add_argument("--steps", choices=TRACE_LEVELS, default="none", help="trace detail kept per row (jsonl)")
+    parser.add_argument("--rows-per-part", type=int, default=10000, help="rows per columnar part file")
+    parser.add_argument("--quiet", action="store_true", help="no progress lines on stderr")
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_batch(
+            args.input,
+            args.output,
+            fmt=args.format,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            resume=args.resume,
+            steps=args.steps,
+            progress=None if args.quiet else sys.stderr,
+            rows_per_part=args.rows_per_part,
+        )
+    except (OSError, ValueError) as exc:
+        parser.exit(2, f"error: {exc}\n")
+    except KeyboardInterrupt:
+        sys.stderr.write("interrupted; rerun with --resume to continue\n")
+        return 130
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,469 @@
+from __future__ import annotations
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Protocol, Tuple
+from urllib.parse import parse_qs, unquote, urlparse
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import socket
+import struct
+import threading
+import time
+import zlib
+
+try:  # POSIX only; without it the mmap backend serializes writers within one process
+    import fcntl
+except ImportError:  # pragma: no cover - depends on the platform
+    fcntl = None
+
+_BASE_DIR = Path(__file__).resolve().parents[2]
+
+# Values are marshal-encoded behind a 3-byte header; the marshal format version is part
+# of it so processes running a different Python treat each other's entries as misses.
+_HEADER = b"GG" + bytes([marshal.version])
+
+
+def encode(value: Any) -> bytes:
+    """Compact binary encoding for plain data (dict, list, tuple, str, numbers, None).
+
+    Raises ValueError for anything else, e.g. dataclass instances.
+    """
+    return _HEADER + marshal.dumps(value, marshal.version)
+
+
+def decode(blob: bytes) -> Any:
+    if blob[:3] != _HEADER:
+        raise ValueError("Cache entry has an unknown encoding.")
+    return marshal.loads(blob[3:])
+
+
+# Shared backends can be written by other processes, or by anything that reaches the Redis
+# server, so their entries are JSON: decoding one never does more than build plain data.
+_JSON_HEADER = b"GJ1"
+
+
+def encode_json(value: Any) -> bytes:
+    """JSON encoding for shared backends; tuples come back as lists.
+
+    Raises ValueError for values JSON cannot represent.
+    """
+    try:
+        return _JSON_HEADER + json.dumps(value, separators=(",", ":")).encode("utf-8")
+    except TypeError as exc:
+        raise ValueError(str(exc)) from exc
+
+
+def decode_json(blob: bytes) -> Any:
+    if blob[:3] != _JSON_HEADER:
+        raise ValueError("Cache entry has an unknown encoding.")
+    return json.loads(blob[3:])
+
+
+class CacheBackend(Protocol):
+    """Byte store behind ``Cache``; ``shared`` backends are visible to other processes."""
+
+    name: str
+    shared: bool
+
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    def set(self, key: str, value: bytes, ttl_s: float) -> bool: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+
+class LocalBackend:
+    """In-process LRU bounded by entry count and total bytes."""
+
+    name = "local"
+    shared = False
+
+    def __init__(self, max_items: int = 4096, max_bytes: int = 64 << 20) -> None:
+        self.max_items = max(1, max_items)
+        self.max_bytes = max(1, max_bytes)
+        self._items: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[0] < time.time():
+                self._drop(key)
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value: bytes, ttl_s: float) -> bool:
+        if len(value) > self.max_bytes:
+            return False
+        with self._lock:
+            self._drop(key)
+            self._items[key] = (time.time() + ttl_s, value)
+            self._bytes += len(value)
+            while len(self._items) > self.max_items or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._items)))
+        return True
+
+    def _drop(self, key: str) -> None:
+        item = self._items.pop(key, None)
+        if item is not None:
+            self._bytes -= len(item[1])
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._drop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._items), "bytes": self._bytes}
+
+
+# Slot header: key digest, expiry (epoch seconds), value length, CRC32 of digest + value.
+_SLOT = struct.Struct("<16sdII")
+
+
+class MmapBackend:
+    """Fixed-size hash table in a memory-mapped file shared by workers on one host.
+
+    Each key maps to one slot (direct-mapped; a colliding write evicts). Writers lock the
+    slot's byte range with ``fcntl.lockf``; readers take no lock and instead check the
+    CRC, so a read racing a write is a miss rather than torn data.
+    """
+
+    name = "mmap"
+    shared = True
+
+    def __init__(self, path: Optional[str] = None, slots: int = 4096, slot_size: int = 16384) -> None:
+        self.path = Path(path or _BASE_DIR / "data" / "cache.mmap")
+        self.slots = max(1, slots)
+        self.slot_size = max(_SLOT.size + 1, slot_size)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        size = self.slots * self.slot_size
+        self._fd = os.open(str(self.path), os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)  # sparse; pages are allocated as slots fill
+        self._mm = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+        self.too_large = 0
+
+    def _locate(self, key: str) -> Tuple[bytes, int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        return digest, (int.from_bytes(digest[:8], "little") % self.slots) * self.slot_size
+
+    def get(self, key: str) -> Optional[bytes]:
+        digest, offset = self._locate(key)
+        stored, expires, length, crc = _SLOT.unpack(self._mm[offset:offset + _SLOT.size])
+        if stored != digest or length > self.slot_size - _SLOT.size or expires < time.time():
+            return None
+        start = offset + _SLOT.size
+        value = self._mm[start:start + length]
+        if zlib.crc32(value, zlib.crc32(digest)) != crc:
+            return None
+        return value
+
+    def _write(self, offset: int, header: bytes, value: bytes) -> None:
+        with self._lock:
+            if fcntl is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, self.slot_size, offset)
+            try:
+                start = offset + _SLOT.size
+                self._mm[start:start + len(value)] = value
+                self._mm[offset:offset + _SLOT.size] = header
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, self.slot_size, offset)
+
+    def set(self, key: str, value: bytes, ttl_s: float) -> bool:
+        if len(value) > self.slot_size - _SLOT.size:
+            self.too_large += 1
+            return False
+        digest, offset = self._locate(key)
+        header = _SLOT.pack(digest, time.time() + ttl_s, len(value), zlib.crc32(value, zlib.crc32(digest)))
+        self._write(offset, header, value)
+        return True
+
+    def delete(self, key: str) -> None:
+        digest, offset = self._locate(key)
+        if self._mm[offset:offset + 16] == digest:
+            self._write(offset, bytes(_SLOT.size), b"")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": str(self.path), "slots": self.slots, "slot_size": self.slot_size, "too_large": self.too_large}
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+
+class RespError(Exception):
+    """Error reply from a Redis-protocol server."""
+
+
+def _resp_command(*args: Any) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+def _resp_reply(stream: Any) -> Any:
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("Connection closed mid-reply.")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode("utf-8")
+    if kind == b"-":
+        raise RespError(body.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        n = int(body)
+        if n < 0:
+            return None
+        data = stream.read(n + 2)
+        if len(data) != n + 2:
+            raise ConnectionError("Connection closed mid-reply.")
+        return data[:-2]
+    if kind == b"*":
+        n = int(body)
+        return None if n < 0 else [_resp_reply(stream) for _ in range(n)]
+    raise ConnectionError(f"Unexpected reply type {kind!r}.")
+
+
+class RespBackend:
+    """Minimal Redis-protocol (RESP2) client using GET / SET PX / DEL.
+
+    Connections are pooled. A failed call is a miss, and the server is then left alone
+    for ``retry_after_s`` so an outage costs each request nothing rather than a timeout.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        timeout_s: float = 0.25,
+        retry_after_s: float = 5.0,
+        max_idle: int = 8,
+    ) -> None:
+        self.host, self.port, self.db, self.password = host, port, db, password
+        self.timeout_s = timeout_s
+        self.retry_after_s = retry_after_s
+        self.max_idle = max_idle
+        self._idle: List[Tuple[socket.socket, Any]] = []
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self.errors = 0
+
+    def _connect(self) -> Tuple[socket.socket, Any]:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout_s)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        try:
+            if self.password:
+                self._call(conn, "AUTH", self.password)
+            if self.db:
+                self._call(conn, "SELECT", self.db)
+        except Exception:
+            sock.close()
+            raise
+        return conn
+
+    @staticmethod
+    def _call(conn: Tuple[socket.socket, Any], *args: Any) -> Any:
+        conn[0].sendall(_resp_command(*args))
+        return _resp_reply(conn[1])
+
+    def command(self, *args: Any) -> Any:
+        """Run one command; raises OSError / RespError / ValueError (callers below turn those into misses)."""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            reply = self._call(conn, *args)
+        except RespError:
+            self._release(conn)
+            raise
+        except (OSError, ValueError):
+            # Lost or malformed reply: the connection's position in the stream is unknown.
+            conn[0].close()
+            raise
+        self._release(conn)
+        return reply
+
+    def _release(self, conn: Tuple[socket.socket, Any]) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn[0].close()
+
+    def _try(self, *args: Any) -> Any:
+        if time.monotonic() < self._down_until:
+            return None
+        try:
+            return self.command(*args)
+        except RespError:
+            self.errors += 1
+            return None
+        except (OSError, ValueError):
+            self.errors += 1
+            self._down_until = time.monotonic() + self.retry_after_s
+            return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._try("GET", key)
+
+    def set(self, key: str, value: bytes, ttl_s: float) -> bool:
+        return self._try("SET", key, value, "PX", max(1, int(ttl_s * 1000))) == "OK"
+
+    def delete(self, key: str) -> None:
+        self._try("DEL", key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "server": f"{self.host}:{self.port}/{self.db}",
+            "errors": self.errors,
+            "available": time.monotonic() >= self._down_until,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for sock, _ in idle:
+            sock.close()
+
+
+class Cache:
+    """Namespaced, config-versioned key/value cache over a pluggable byte backend.
+
+    Keys are ``gridgent:<namespace>:<config version>:<digest of key>``, so entries for an
+    old model are never read again and simply age out. Values are marshal-encoded in
+    process and JSON-encoded in shared backends; a value that cannot be encoded is not cached.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_s: float = 3600.0) -> None:
+        self.backend = backend
+        self.ttl_s = ttl_s
+        self._encode, self._decode = (encode_json, decode_json) if backend.shared else (encode, decode)
+        self._stats = {"hits": 0, "misses": 0, "sets": 0, "unencodable": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.shared
+
+    @staticmethod
+    def key(namespace: str, config_version: str, key: Hashable) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return f"gridgent:{namespace}:{config_version}:{digest}"
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, namespace: str, config_version: str, key: Hashable) -> Any:
+        """The cached value, or None on a miss."""
+        blob = self.backend.get(self.key(namespace, config_version, key))
+        if blob is not None:
+            try:
+                value = self._decode(blob)
+            except (ValueError, EOFError, TypeError):
+                value = None
+            if value is not None:
+                self._bump("hits")
+                return value
+        self._bump("misses")
+        return None
+
+    def set(self, namespace: str, config_version: str, key: Hashable, value: Any) -> bool:
+        try:
+            blob = self._encode(value)
+        except ValueError:
+            self._bump("unencodable")
+            return False
+        stored = self.backend.set(self.key(namespace, config_version, key), blob, self.ttl_s)
+        if stored:
+            self._bump("sets")
+        return stored
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["backend"] = self.backend.name
+        stats.update(self.backend.stats())
+        return stats
+
+
+def cache_from_url(url: str, ttl_s: float = 3600.0) -> Optional[Cache]:
+    """``none``, ``local[?max_items=N]``, ``mmap[:PATH][?slots=N&slot_kb=K]`` or
+    ``redis://[:password@]host[:port][/db]``."""
+    url = (url or "").strip()
+    if url in ("", "none", "off", "0"):
+        return None
+    parsed = urlparse(url)
+    params = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+    scheme = parsed.scheme or url.split("?", 1)[0]
+    try:
+        if scheme == "local":
+            backend: CacheBackend = LocalBackend(
+                max_items=int(params.get("max_items", 4096)), max_bytes=int(params.get("max_mb", 64)) << 20
+            )
+        elif scheme == "mmap":
+            backend = MmapBackend(
+                (parsed.path or None) if parsed.scheme else None, slots=int(params.get("slots", 4096)), slot_size=int(params.get("slot_kb", 16)) << 10
+            )
+        elif scheme == "redis":
+            backend = RespBackend(
+                host=parsed.hostname or "127.0.0.1",
+                port=parsed.port or 6379,
+                db=int(parsed.path.strip("/") or 0),
+                password=unquote(parsed.password) if parsed.password else None,
+                timeout_s=float(params.get("timeout", 0.25)),
+            )
+        else:
+            raise ValueError(f"Unknown cache backend '{scheme}'; expected none, local, mmap or redis.")
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid GRID_GENT_CACHE '{url}': {exc}") from exc
+    return Cache(backend, ttl_s=ttl_s)
+
+
+_CACHE: Optional[Cache] = None
+_CACHE_READY = False
+_CACHE_LOCK = threading.Lock()
+
+
+def get_cache() -> Optional[Cache]:
+    """The process-wide cache configured by ``GRID_GENT_CACHE`` (default ``local``)."""
+    global _CACHE, _CACHE_READY
+    if not _CACHE_READY:
+        with _CACHE_LOCK:
+            if not _CACHE_READY:
+                try:
+                    ttl = float(os.environ.get("GRID_GENT_CACHE_TTL", "3600"))
+                except ValueError:
+                    ttl = 3600.0
+                _CACHE = cache_from_url(os.environ.get("GRID_GENT_CACHE", "local"), ttl_s=ttl)
+                _CACHE_READY = True
+    return _CACHE
+
+
+def shared_cache() -> Optional[Cache]:
+    """The configured cache if other processes can see it, else None."""
+    cache = get_cache()
+    return cache if cache is not None and cache.shared else None
@@ -0,0 +1,97 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import threading
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in flight block
+    and receive the same result (or exception). Nothing is cached once the call finishes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executions = 0
+        self._coalesced = 0
+        self._max_waiters = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Return ``(result, shared)`` where ``shared`` is True for callers that piggybacked."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                self._max_waiters = max(self._max_waiters, call.waiters)
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+        return call.result, False
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls),
+                "max_waiters": self._max_waiters,
+            }
+
+
+def scenario_key(query: str, intent_info: Dict[str, Any], config_version: str) -> Tuple[Any, ...]:
+    """Normalize a classified request into the key identical questions share."""
+    intent = intent_info.get("intent")
+    if intent in ("unknown", "explanation") and not intent_info.get("has_mw") and not intent_info.get("has_feeder"):
+        # Conceptual answers echo the question text, so only identical wording coalesces.
+        detail: Any = " ".join((query or "").lower().split())
+    else:
+        filters = intent_info.get("filters") or {}
+        scenarios = intent_info.get("scenarios") or ()
+        forecast = intent_info.get("forecast") or {}
+        rollup = intent_info.get("rollup") or {}
+        detail = (
+            tuple(sorted((k, tuple(v)) for k, v in filters.items())),
+            tuple((s.get("feeder"), s.get("added_pv_mw"), s.get("added_load_mw")) for s in scenarios),
+            tuple(sorted(forecast.items())),
+            tuple(sorted(rollup.items())),
+        )
+    return (
+        intent,
+        intent_info.get("feeder"),
+        round(float(intent_info.get("added_pv_mw", 0.0)), 6),
+        round(float(intent_info.get("added_load_mw", 0.0)), 6),
+        intent_info.get("top_k"),
+        detail,
+        config_version,
+    )
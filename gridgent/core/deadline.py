@@ -0,0 +1,82 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+import math
+import time
+
+
+class DeadlineExceeded(Exception):
+    """The time budget ran out before a stage had anything to return."""
+
+    def __init__(self, stage: str, budget_ms: Optional[float]) -> None:
+        super().__init__(f"Deadline of {budget_ms:g} ms exceeded during {stage}.")
+        self.stage = stage
+        self.budget_ms = budget_ms
+
+
+class Deadline:
+    """Time budget for one request, shared by every stage that runs on its behalf.
+
+    Expensive stages poll ``expired`` between units of work; when it trips they stop,
+    keep what they have and call ``mark_partial`` so the answer is flagged.
+    """
+
+    __slots__ = ("budget_ms", "expires_at", "partial")
+
+    def __init__(self, budget_ms: Optional[float] = None) -> None:
+        self.budget_ms = budget_ms if budget_ms and budget_ms > 0 else None
+        self.expires_at = time.monotonic() + self.budget_ms / 1000.0 if self.budget_ms else None
+        self.partial: List[str] = []
+
+    def remaining_s(self) -> float:
+        return math.inf if self.expires_at is None else max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self, stage: str) -> None:
+        if self.expired:
+            raise DeadlineExceeded(stage, self.budget_ms)
+
+    def mark_partial(self, stage: str) -> None:
+        if stage not in self.partial:
+            self.partial.append(stage)
+
+    def to_dict(self) -> Dict[str, Any]:
+        remaining = self.remaining_s()
+        return {
+            "budget_ms": self.budget_ms,
+            "remaining_ms": None if math.isinf(remaining) else round(remaining * 1000.0, 1),
+            "partial": list(self.partial),
+        }
+
+
+_CURRENT: ContextVar[Optional[Deadline]] = ContextVar("gridgent_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(deadline: Deadline) -> Iterator[Deadline]:
+    """Make ``deadline`` the one tools see through ``current_deadline()`` in this context."""
+    token = _CURRENT.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _CURRENT.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _CURRENT.get()
+
+
+def expired() -> bool:
+    """True once the current request's budget is spent (always False outside a request)."""
+    deadline = _CURRENT.get()
+    return deadline is not None and deadline.expired
+
+
+def mark_partial(stage: str) -> None:
+    deadline = _CURRENT.get()
+    if deadline is not None:
+        deadline.mark_partial(stage)
@@ -0,0 +1,334 @@
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from gridgent.core.types import Step, TraceLevel
+
+_BASE_DIR = Path(__file__).resolve().parents[2]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    task_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    query TEXT NOT NULL,
+    intent TEXT,
+    intent_info TEXT,
+    config_version TEXT,
+    scenario_hash TEXT,
+    trace_level TEXT,
+    status TEXT,
+    summary TEXT,
+    steps TEXT,
+    answer TEXT,
+    timings_ms TEXT
+);
+CREATE INDEX IF NOT EXISTS results_created ON results (created_at);
+CREATE INDEX IF NOT EXISTS results_scenario ON results (scenario_hash, config_version, created_at);
+CREATE TABLE IF NOT EXISTS result_feeders (
+    result_id INTEGER NOT NULL REFERENCES results (id),
+    feeder TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS result_feeders_lookup ON result_feeders (feeder, created_at);
+CREATE INDEX IF NOT EXISTS result_feeders_result ON result_feeders (result_id);
+"""
+
+
+def scenario_hash(key: Tuple[Any, ...]) -> str:
+    """Stable digest of a coalescing key (``gridgent.core.coalesce.scenario_key``)."""
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=5.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class HistoryStore:
+    """SQLite (WAL mode) log of answered questions, written in batches off the request path.
+
+    ``record()`` only enqueues; a background thread drains the queue and writes whatever
+    has accumulated in one transaction. When the queue is full new records are dropped
+    and counted rather than slowing requests down. The same thread prunes rows older than
+    ``max_age_s`` and beyond the newest ``max_rows`` (0 keeps them), at most once every
+    ``PRUNE_EVERY_S``.
+    """
+
+    PRUNE_EVERY_S = 60.0
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        max_pending: int = 10000,
+        batch_size: int = 256,
+        max_age_s: Optional[float] = None,
+        max_rows: Optional[int] = None,
+    ) -> None:
+        default_path = os.environ.get("GRID_GENT_HISTORY_DB") or str(_BASE_DIR / "data" / "history.sqlite3")
+        self.path = Path(path or default_path)
+        self.batch_size = max(1, batch_size)
+        if max_age_s is None:
+            max_age_s = _env_number("GRID_GENT_HISTORY_MAX_AGE_DAYS", 30) * 86400.0
+        if max_rows is None:
+            max_rows = int(_env_number("GRID_GENT_HISTORY_MAX_ROWS", 1_000_000))
+        self.max_age_s = max(0.0, max_age_s)
+        self.max_rows = max(0, max_rows)
+        self._pruned_at = 0.0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = _connect(self.path)
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.pruned = 0
+
+    # -- writes -------------------------------------------------------------------------
+
+    def _ensure_writer(self) -> None:
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the parent's queue and thread did not come along.
+                self._pid = os.getpid()
+                self._queue = queue.Queue(maxsize=self._queue.maxsize)
+                self._writer = None
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="gridgent-history", daemon=True)
+                self._writer.start()
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Queue one answered question (see ``GridGentOrchestrator`` for the fields)."""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def flush(self) -> None:
+        """Block until everything queued so far is written."""
+        self._queue.join()
+
+    def _write_loop(self) -> None:
+        conn = _connect(self.path)
+        q = self._queue
+        while True:
+            batch = [q.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(conn, batch)
+                with self._lock:
+                    self.written += len(batch)
+                    self.batches += 1
+                if time.monotonic() - self._pruned_at >= self.PRUNE_EVERY_S:
+                    self._pruned_at = time.monotonic()
+                    pruned = self._prune(conn)
+                    with self._lock:
+                        self.pruned += pruned
+            except (sqlite3.Error, TypeError, ValueError):
+                with self._lock:
+                    self.failed += len(batch)
+            finally:
+                for _ in batch:
+                    q.task_done()
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: List[Dict[str, Any]]) -> None:
+        with conn:
+            for e in batch:
+                cur = conn.execute(
+                    "INSERT INTO results (task_id, created_at, query, intent, intent_info, config_version, "
+                    "scenario_hash, trace_level, status, summary, steps, answer, timings_ms) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        e["task_id"],
+                        e["created_at"],
+                        e["query"],
+                        e.get("intent"),
+                        json.dumps(e.get("intent_info"), default=str),
+                        e.get("config_version"),
+                        e.get("scenario_hash"),
+                        e.get("trace_level"),
+                        e.get("status"),
+                        json.dumps(e.get("summary"), default=str),
+                        json.dumps([s.to_dict() for s in e.get("steps", [])], default=str),
+                        e.get("answer"),
+                        json.dumps(e.get("timings_ms", {})),
+                    ),
+                )
+                conn.executemany(
+                    "INSERT INTO result_feeders (result_id, feeder, created_at) VALUES (?, ?, ?)",
+                    [(cur.lastrowid, f, e["created_at"]) for f in e.get("feeders", [])],
+                )
+
+    def _prune(self, conn: sqlite3.Connection) -> int:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if self.max_age_s > 0:
+            clauses.append("created_at < ?")
+            params.append(time.time() - self.max_age_s)
+        if self.max_rows > 0:
+            row = conn.execute(
+                "SELECT id FROM results ORDER BY id DESC LIMIT 1 OFFSET ?", (self.max_rows,)
+            ).fetchone()
+            if row is not None:
+                clauses.append("id <= ?")
+                params.append(row[0])
+        if not clauses:
+            return 0
+        where = " OR ".join(clauses)
+        with conn:
+            conn.execute(f"DELETE FROM result_feeders WHERE result_id IN (SELECT id FROM results WHERE {where})", params)
+            return conn.execute(f"DELETE FROM results WHERE {where}", params).rowcount
+
+    # -- reads --------------------------------------------------------------------------
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = _connect(self.path)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def find_reusable(
+        self, key_hash: str, config_version: str, trace: TraceLevel = "full"
+    ) -> Optional[Tuple[str, Dict[str, Any], List[Step], float]]:
+        """Latest stored (status, technical_summary, planning_steps, created_at) for a scenario.
+
+        Only results computed against the same config version qualify, and only when the
+        stored trace is at least as detailed as the one requested.
+        """
+        row = self._reader().execute(
+            "SELECT status, summary, steps, created_at FROM results "
+            "WHERE scenario_hash = ? AND config_version = ? AND status = 'ok' "
+            "AND (trace_level = 'full' OR trace_level = ? OR ? = 'none') "
+            "ORDER BY created_at DESC LIMIT 1",
+            (key_hash, config_version, trace, trace),
+        ).fetchone()
+        if row is None:
+            return None
+        steps = [Step(role=s["role"], content=s["content"], meta=s.get("meta", {})) for s in json.loads(row["steps"])]
+        return row["status"], json.loads(row["summary"]), steps, row["created_at"]
+
+    def history(
+        self,
+        feeder: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        intent: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Recent questions, newest first, optionally for one feeder and a time window."""
+        if feeder:
+            # Drive from the (feeder, created_at) index rather than scanning results.
+            source, ts = "result_feeders f JOIN results r ON r.id = f.result_id", "f.created_at"
+            clauses, params = ["f.feeder = ?"], [feeder.upper().strip()]
+        else:
+            source, ts = "results r", "r.created_at"
+            clauses, params = [], []
+        if since is not None:
+            clauses.append(f"{ts} >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append(f"{ts} <= ?")
+            params.append(until)
+        if intent:
+            clauses.append("r.intent = ?")
+            params.append(intent)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._reader().execute(
+            "SELECT r.task_id, r.created_at, r.query, r.intent, r.config_version, r.status, r.answer, "
+            f"r.timings_ms, r.summary FROM {source} {where} ORDER BY {ts} DESC LIMIT ?",
+            (*params, max(1, int(limit))),
+        ).fetchall()
+        return [
+            {
+                "task_id": row["task_id"],
+                "created_at": row["created_at"],
+                "query": row["query"],
+                "intent": row["intent"],
+                "config_version": row["config_version"],
+                "status": row["status"],
+                "answer": row["answer"],
+                "timings_ms": json.loads(row["timings_ms"] or "{}"),
+                "summary": json.loads(row["summary"] or "null"),
+            }
+            for row in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "pending": self._queue.qsize(),
+                "written": self.written,
+                "batches": self.batches,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "pruned": self.pruned,
+            }
+
+
+def history_entry(
+    task_id: str,
+    query: str,
+    intent_info: Dict[str, Any],
+    config_version: str,
+    key_hash: str,
+    trace: TraceLevel,
+    status: str,
+    summary: Dict[str, Any],
+    steps: List[Step],
+    answer: str,
+    timings_ms: Dict[str, float],
+) -> Dict[str, Any]:
+    feeders = list(intent_info.get("feeders") or ())
+    if summary.get("feeder") and summary["feeder"] not in feeders:
+        feeders.append(summary["feeder"])
+    return {
+        "task_id": task_id,
+        "created_at": time.time(),
+        "query": query,
+        "intent": intent_info.get("intent"),
+        "intent_info": intent_info,
+        "config_version": config_version,
+        "scenario_hash": key_hash,
+        "trace_level": trace,
+        "status": status,
+        "summary": summary,
+        "steps": steps,
+        "answer": answer,
+        "timings_ms": timings_ms,
+        "feeders": feeders,
+    }
@@ -0,0 +1,299 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+from gridgent.tools.grid_stub import run_power_flow_scenario
+from gridgent.tools.screening import screen_feeders
+
+_BASE_DIR = Path(__file__).resolve().parents[2]
+
+# Callback used by job kinds to report (fraction_done, partial_item_or_None).
+ProgressFn = Callable[[float, Optional[Dict[str, Any]]], None]
+JobFn = Callable[["JobManager", "Job", ProgressFn], Any]
+
+# A sweep is solved one scenario at a time on a job worker, so it is capped well below the
+# columnar export limit; status reads return only the latest partial rows.
+MAX_SWEEP_SCENARIOS = 10_000
+MAX_PARTIAL_ROWS = 100
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the job queue is at capacity."""
+
+
+@dataclass
+class Job:
+    job_id: str
+    kind: str
+    params: Dict[str, Any]
+    priority: int = 5
+    status: str = "queued"
+    progress: float = 0.0
+    partial: List[Dict[str, Any]] = field(default_factory=list)
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "params": self.params,
+            "priority": self.priority,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "partial": self.partial[-MAX_PARTIAL_ROWS:],
+            "partial_count": len(self.partial),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobStore:
+    """Directory of completed job JSON files, evicting the oldest when over ``max_bytes``."""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = 50 * 1024 * 1024) -> None:
+        default_root = os.environ.get("GRID_GENT_JOB_DIR") or str(_BASE_DIR / "data" / "jobs")
+        self.root = Path(root or default_root)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, job_id: str) -> Path:
+        # Job ids are uuid4 strings; refuse anything that could escape the directory.
+        if not job_id or any(c not in "0123456789abcdef-" for c in job_id):
+            raise KeyError(job_id)
+        return self.root / f"{job_id}.json"
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            path = self._path(job.job_id)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(job.to_dict()), encoding="utf-8")
+            tmp.replace(path)
+            self._evict()
+
+    def load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            path = self._path(job_id)
+        except KeyError:
+            return None
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for p in self.root.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        entries.sort()
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                p.unlink()
+                total -= size
+            except OSError:
+                pass
+
+
+def _run_ask(manager: "JobManager", job: Job, progress: ProgressFn) -> Any:
+    query = str(job.params.get("query") or "").strip()
+    if not query:
+        raise ValueError("Job kind 'ask' requires a 'query'.")
+    result = manager.orchestrator.run(query, task_id=job.job_id)
+    return result.to_dict()
+
+
+def _sweep_axes(params: Dict[str, Any]) -> Tuple[List[float], List[float]]:
+    pv_values = [float(v) for v in params.get("added_pv_mw", [0.0])]
+    load_values = [float(v) for v in params.get("added_load_mw", [0.0])]
+    total = len(pv_values) * len(load_values)
+    if total == 0:
+        raise ValueError("Sweep needs at least one PV and one load value.")
+    if total > MAX_SWEEP_SCENARIOS:
+        raise ValueError(f"Sweep expands to {total} scenarios; the job limit is {MAX_SWEEP_SCENARIOS}.")
+    return pv_values, load_values
+
+
+def _run_sweep(manager: "JobManager", job: Job, progress: ProgressFn) -> Any:
+    feeder = str(job.params.get("feeder") or "F1")
+    pv_values, load_values = _sweep_axes(job.params)
+    total = len(pv_values) * len(load_values)
+
+    rows: List[Dict[str, Any]] = []
+    for n, (pv, load) in enumerate(itertools.product(pv_values, load_values), start=1):
+        row = run_power_flow_scenario(feeder, added_pv_mw=pv, added_load_mw=load).to_dict()
+        row["added_pv_mw"] = pv
+        row["added_load_mw"] = load
+        rows.append(row)
+        progress(n / total, row)
+    return {"feeder": feeder, "scenarios": rows}
+
+
+def _run_fleet_screening(manager: "JobManager", job: Job, progress: ProgressFn) -> Any:
+    result = screen_feeders(
+        added_pv_mw=float(job.params.get("added_pv_mw", 0.0)),
+        added_load_mw=float(job.params.get("added_load_mw", 0.0)),
+        top_k=int(job.params.get("top_k", 10)),
+    )
+    return result.to_dict()
+
+
+JOB_KINDS: Dict[str, JobFn] = {
+    "ask": _run_ask,
+    "sweep": _run_sweep,
+    "fleet_screening": _run_fleet_screening,
+}
+
+
+class JobManager:
+    """Runs long studies on a fixed pool of worker threads fed by a bounded priority queue.
+
+    Lower ``priority`` values run first; ties run in submission order. ``yield_to`` is
+    polled before each job and each progress step; while it returns True the worker waits
+    (up to ``MAX_YIELD_S`` at a time) so interactive requests get the CPU first. After
+    ``YIELD_STREAK`` waits in a row the next step runs regardless, so jobs keep moving
+    under steady interactive traffic.
+    """
+
+    MAX_YIELD_S = 0.25
+    YIELD_STREAK = 3
+
+    def __init__(
+        self,
+        orchestrator: Any,
+        workers: int = 2,
+        max_queue: int = 100,
+        store: Optional[JobStore] = None,
+        max_recent: int = 256,
+        yield_to: Optional[Callable[[], bool]] = None,
+    ) -> None:
+        self.orchestrator = orchestrator
+        self.yield_to = yield_to
+        self._yield_streak = threading.local()
+        self.workers = max(1, workers)
+        self.store = store or JobStore()
+        self._queue: "queue.PriorityQueue[tuple]" = queue.PriorityQueue(maxsize=max_queue)
+        self._seq = itertools.count()
+        self._active: Dict[str, Job] = {}
+        self._recent: "OrderedDict[str, Job]" = OrderedDict()
+        self._max_recent = max_recent
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def _ensure_workers(self) -> None:
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                t = threading.Thread(target=self._worker, name=f"gridgent-job-{len(self._threads)}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, kind: str, params: Dict[str, Any], priority: int = 5) -> Job:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'; expected one of {', '.join(sorted(JOB_KINDS))}.")
+        if kind == "sweep":
+            _sweep_axes(params)  # reject oversized or malformed sweeps before they are queued
+        job = Job(job_id=str(uuid.uuid4()), kind=kind, params=params, priority=int(priority))
+        with self._lock:
+            self._active[job.job_id] = job
+        try:
+            self._queue.put_nowait((job.priority, next(self._seq), job.job_id))
+        except queue.Full:
+            with self._lock:
+                self._active.pop(job.job_id, None)
+            raise JobQueueFull("Job queue is full; retry later.")
+        self._ensure_workers()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._active.get(job_id) or self._recent.get(job_id)
+            if job is not None:
+                return job.to_dict()
+        return self.store.load(job_id)
+
+    def wait(self, job_id: str, timeout: float = 10.0) -> Optional[Dict[str, Any]]:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            data = self.get(job_id)
+            if data is None or data["status"] in ("done", "failed"):
+                return data
+            time.sleep(0.01)
+        return self.get(job_id)
+
+    def _worker(self) -> None:
+        while True:
+            _, _, job_id = self._queue.get()
+            with self._lock:
+                job = self._active.get(job_id)
+            if job is not None:
+                self._execute(job)
+            self._queue.task_done()
+
+    def _yield(self) -> None:
+        if self.yield_to is None:
+            return
+        streak = getattr(self._yield_streak, "n", 0)
+        if streak >= self.YIELD_STREAK or not self.yield_to():
+            self._yield_streak.n = 0
+            return
+        self._yield_streak.n = streak + 1
+        deadline = time.monotonic() + self.MAX_YIELD_S
+        while self.yield_to() and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def _execute(self, job: Job) -> None:
+        def progress(fraction: float, item: Optional[Dict[str, Any]] = None) -> None:
+            job.progress = min(1.0, max(0.0, fraction))
+            if item is not None:
+                job.partial.append(item)
+            self._yield()
+
+        self._yield()
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = JOB_KINDS[job.kind](self, job, progress)
+            job.status = "done"
+            job.progress = 1.0
+            # The final result supersedes the streamed partial rows.
+            job.partial = []
+        except Exception as exc:
+            job.error = str(exc)
+            job.status = "failed"
+        job.finished_at = time.time()
+
+        try:
+            self.store.save(job)
+        except OSError:
+            pass
+        with self._lock:
+            self._active.pop(job.job_id, None)
+            self._recent[job.job_id] = job
+            while len(self._recent) > self._max_recent:
+                self._recent.popitem(last=False)
@@ -1,45 +1,227 @@
 from __future__ import annotations
+import time
 import uuid
-from typing import List
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
-from gridgent.core.types import Step, OrchestratorResult
-from gridgent.agents.intent import IntentAgent
-from gridgent.agents.planning import PlanningAgent
-from gridgent.agents.narrator import NarratorAgent
+from gridgent.core.types import OrchestratorResult, Step, Trace, TraceLevel
+from gridgent.core.cache import Cache
+from gridgent.core.deadline import Deadline, current_deadline, deadline_scope
+from gridgent.core.coalesce import SingleFlight, scenario_key
+from gridgent.core.history import HistoryStore, history_entry, scenario_hash
+from gridgent.core.pipeline import create_stage
+from gridgent.core.sessions import Session, SessionStore, remember_turn, resolve_follow_up
+from gridgent.tools.grid_stub import get_config_version, get_feeders_version
+from gridgent.tools.sensitivity import fast_path_enabled
+from gridgent.tools.solvers import get_backend
+
+
+# These read every feeder; other intents only read the feeders they name.
+_FLEET_INTENTS = ("fleet_screening", "feeder_query", "rollup")
+
+
+def _answer_version(intent_info: Dict[str, Any]) -> str:
+    """Config version an answer depends on: the named feeders' own for scenarios on
+    specific feeders, so cached and stored results survive deltas to other feeders."""
+    if intent_info.get("intent") in _FLEET_INTENTS:
+        return get_config_version()
+    feeders = [intent_info.get("feeder"), *(intent_info.get("feeders") or ())]
+    feeders += [s.get("feeder") for s in intent_info.get("scenarios") or ()]
+    if not intent_info.get("feeder") or any(not f for f in feeders):
+        return get_config_version()
+    return get_feeders_version(feeders)
 
 
 class GridGentOrchestrator:
-    def __init__(self) -> None:
-        self.intent_agent = IntentAgent()
-        self.planning_agent = PlanningAgent()
-        self.narrator_agent = NarratorAgent()
+    def __init__(
+        self,
+        stages: Optional[Mapping[str, Any]] = None,
+        history: Optional[HistoryStore] = None,
+        sessions: Optional[SessionStore] = None,
+        cache: Optional[Cache] = None,
+    ) -> None:
+        """Build the pipeline from the stage registry; ``stages`` overrides individual stages.
 
-    def run(self, query: str) -> OrchestratorResult:
-        task_id = str(uuid.uuid4())
-        steps: List[Step] = []
+        With a ``history`` store every answer is recorded, and a stored result for the same
+        scenario and feeder data is reused instead of planning again. ``sessions``
+        holds conversation state for ``run(..., session_id=...)``. A ``cache`` keeps
+        planning results in front of the history, shared across workers when its backend is.
+        """
+        self.intent_agent = create_stage("intent", stages)
+        self.planning_agent = create_stage("planning", stages)
+        self.narrator_agent = create_stage("narrator", stages)
+        self.coalescer = SingleFlight()
+        self.history = history
+        self.sessions = sessions if sessions is not None else SessionStore()
+        self.cache = cache
 
+    def run(
+        self,
+        query: str,
+        task_id: Optional[str] = None,
+        trace: TraceLevel = "full",
+        record: bool = True,
+        session_id: Optional[str] = None,
+        deadline_ms: Optional[float] = None,
+    ) -> OrchestratorResult:
+        """Answer one question; with a ``session_id`` follow-ups build on earlier turns.
+
+        With ``deadline_ms`` the stages share that time budget: expensive searches stop
+        early and the answer is flagged ``partial``; if the budget is gone before planning
+        produced anything, ``DeadlineExceeded`` is raised.
+        """
+        with deadline_scope(Deadline(deadline_ms)) as deadline:
+            if session_id is None:
+                return self._run(query, task_id, trace, record, None, deadline)
+            session = self.sessions.get(session_id)
+            with session.lock:
+                return self._run(query, task_id, trace, record, session, deadline)
+
+    def _run(
+        self,
+        query: str,
+        task_id: Optional[str],
+        trace: TraceLevel,
+        record: bool,
+        session: Optional[Session],
+        deadline: Deadline,
+    ) -> OrchestratorResult:
+        task_id = task_id or str(uuid.uuid4())
+        recorder = Trace(trace)
+        timings: Dict[str, float] = {}
+
+        deadline.check("queueing")
+        t0 = time.perf_counter()
         intent_info = self.intent_agent.classify(query)
-        steps.append(
-            Step(
-                role="intent_agent",
-                content=(
-                    f"Classified intent as '{intent_info['intent']}'"
-                    + (f" and selected feeder {intent_info['feeder']}." if intent_info.get("feeder") else ".")
-                ),
-                meta=intent_info,
-            )
+        timings["intent_ms"] = (time.perf_counter() - t0) * 1000.0
+        deadline.check("intent classification")
+        recorder.add(
+            role="intent_agent",
+            content=(
+                f"Classified intent as '{intent_info['intent']}'"
+                + (f" and selected feeder {intent_info['feeder']}." if intent_info.get("feeder") else ".")
+            ),
+            meta=intent_info,
         )
+        if session is not None:
+            resolved = resolve_follow_up(query, intent_info, session)
+            if resolved is not intent_info:
+                intent_info = resolved
+                recorder.add(
+                    role="intent_agent",
+                    content=(
+                        f"Follow-up in session {session.session_id}: carried forward "
+                        f"{', '.join(intent_info['follow_up']['carried'])} from the previous question "
+                        f"(feeder {intent_info['feeder']}, PV={intent_info['added_pv_mw']:.1f} MW, "
+                        f"load={intent_info['added_load_mw']:.1f} MW)."
+                    ),
+                    meta=intent_info,
+                )
 
-        status, technical_summary, planning_steps = self.planning_agent.plan_and_analyze(query, intent_info)
-        steps.extend(planning_steps)
+        # Identical scenarios arriving concurrently share one planning run; each request
+        # keeps its own task_id and narration.
+        config_version = _answer_version(intent_info)
+        base_key = scenario_key(query, intent_info, config_version)
+        # Stored results are only valid for the solver that produced them.
+        backend_key = (get_backend(query_type=intent_info["intent"]).name,)
+        # Sensitivity estimates are not interchangeable with full solves.
+        key_hash = scenario_hash(base_key + backend_key + (("fast_path",) if fast_path_enabled() else ()))
+        t0 = time.perf_counter()
 
+        def plan() -> Tuple[str, Dict[str, Any], List[Step], Optional[float]]:
+            return self._plan(query, intent_info, trace, key_hash, config_version, session)
+
+        # Only requests with the same budget share a run.
+        coalesce_key = base_key + (trace,) + ((deadline.budget_ms,) if deadline.budget_ms else ())
+        (status, technical_summary, planning_steps, reused_from), coalesced = self.coalescer.do(coalesce_key, plan)
+        if coalesced and technical_summary.get("partial"):
+            # The leader's answer was cut short by its deadline; this request gets its own attempt.
+            (status, technical_summary, planning_steps, reused_from), coalesced = plan(), False
+        timings["planning_ms"] = (time.perf_counter() - t0) * 1000.0
+        recorder.extend(planning_steps)
+        partial = list(technical_summary.get("partial") or ())
+        # Partial answers are not reused: the next question deserves the full search.
+        if session is not None and not partial:
+            session.remember(
+                (key_hash, trace), (status, technical_summary, planning_steps, reused_from or time.time()),
+                self.sessions.max_solved,
+            )
+            remember_turn(session, intent_info, status, technical_summary, config_version)
+
+        t0 = time.perf_counter()
         answer = self.narrator_agent.narrate(query, technical_summary)
-        steps.append(
-            Step(
-                role="narrator_agent",
-                content="Generated human-readable explanation for planner/operator.",
-                meta={"status": status},
+        timings["narrator_ms"] = (time.perf_counter() - t0) * 1000.0
+        recorder.add(
+            role="narrator_agent",
+            content="Generated human-readable explanation for planner/operator.",
+            meta={"status": status, "coalesced": coalesced, "reused_from": reused_from, "partial": partial},
+        )
+
+        # Every complete answer is recorded, reused or not, so the history doubles as an
+        # audit log. Partial answers are left out so they can never be served again.
+        if record and self.history is not None and not partial:
+            self.history.record(
+                history_entry(
+                    task_id, query, intent_info, config_version, key_hash, trace,
+                    status, technical_summary, planning_steps, answer, timings,
+                )
             )
+
+        return OrchestratorResult(
+            task_id=task_id, answer=answer, steps=recorder.steps, trace_level=trace, partial=partial
+        )
+
+    def _plan(
+        self,
+        query: str,
+        intent_info: Dict[str, Any],
+        trace: TraceLevel,
+        key_hash: str,
+        config_version: str,
+        session: Optional[Session] = None,
+    ) -> Tuple[str, Dict[str, Any], List[Step], Optional[float]]:
+        """Plan the scenario, or reuse a result solved earlier in the session, held in the
+        cache or stored in the history (and report when it was computed)."""
+        stored = session.recall((key_hash, trace)) if session is not None else None
+        if stored is not None:
+            return stored
+        if self.cache is not None:
+            cached = self.cache.get("plan", config_version, (key_hash, trace))
+            if cached is not None:
+                status, technical_summary, steps, created_at = cached
+                return status, technical_summary, [Step(s["role"], s["content"], s.get("meta", {})) for s in steps], created_at
+        if self.history is not None:
+            stored = self.history.find_reusable(key_hash, config_version, trace)
+            if stored is not None:
+                status, technical_summary, steps, created_at = stored
+                recorder = Trace(trace)
+                for step in steps:
+                    recorder.add(step.role, step.content, step.meta)
+                self._cache_plan(key_hash, trace, config_version, status, technical_summary, recorder.steps, created_at)
+                return status, technical_summary, recorder.steps, created_at
+        previous = session.previous_summary(config_version) if session is not None else None
+        # Only passed when there is something to reuse, so custom planning stages without
+        # the keyword keep working outside sessions.
+        extra = {"previous": previous} if previous else {}
+        status, technical_summary, steps = self.planning_agent.plan_and_analyze(
+            query, intent_info, Trace(trace), **extra
         )
+        deadline = current_deadline()
+        if deadline is not None and deadline.partial:
+            status = "partial"
+            technical_summary["partial"] = list(deadline.partial)
+        self._cache_plan(key_hash, trace, config_version, status, technical_summary, steps, time.time())
+        return status, technical_summary, steps, None
 
-        return OrchestratorResult(task_id=task_id, answer=answer, steps=steps)
+    def _cache_plan(
+        self,
+        key_hash: str,
+        trace: TraceLevel,
+        config_version: str,
+        status: str,
+        technical_summary: Dict[str, Any],
+        steps: List[Step],
+        created_at: float,
+    ) -> None:
+        if self.cache is not None and status == "ok":
+            entry = (status, technical_summary, [s.to_dict(trace) for s in steps], created_at)
+            self.cache.set("plan", config_version, (key_hash, trace), entry)
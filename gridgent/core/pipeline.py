@@ -0,0 +1,37 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Mapping, Optional
+
+from gridgent.agents.intent import IntentAgent
+from gridgent.agents.planning import PlanningAgent
+from gridgent.agents.narrator import NarratorAgent
+
+# Stage name -> zero-argument factory. The orchestrator asks for "intent", "planning" and
+# "narrator"; anything exposing the same methods as the built-in agents can be registered.
+StageFactory = Callable[[], Any]
+
+_STAGES: Dict[str, StageFactory] = {}
+
+
+def register_stage(name: str, factory: StageFactory) -> None:
+    """Register (or replace) the factory used to build pipeline stage ``name``."""
+    _STAGES[name] = factory
+
+
+def create_stage(name: str, overrides: Optional[Mapping[str, Any]] = None) -> Any:
+    """Return ``overrides[name]`` if given, otherwise a fresh instance from the registry."""
+    if overrides and name in overrides:
+        return overrides[name]
+    try:
+        factory = _STAGES[name]
+    except KeyError:
+        raise ValueError(f"No pipeline stage registered for '{name}'.") from None
+    return factory()
+
+
+def registered_stages() -> Dict[str, StageFactory]:
+    return dict(_STAGES)
+
+
+register_stage("intent", IntentAgent)
+register_stage("planning", PlanningAgent)
+register_stage("narrator", NarratorAgent)
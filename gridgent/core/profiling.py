@@ -0,0 +1,203 @@
+from __future__ import annotations
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+import cProfile
+import itertools
+import os
+import pstats
+import sys
+import threading
+import time
+
+T = TypeVar("T")
+
+PROFILE_MODES = ("cprofile", "sample")
+# Distinct stacks kept in the aggregate; further new stacks are counted under one bucket.
+MAX_STACKS = 20000
+_OVERFLOW_STACK = "[other stacks]"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, str(default)))
+    except ValueError:
+        return default
+
+
+class ProfilingConfig:
+    """Which profiling is switched on; everything is off unless the environment says so.
+
+    ``on_demand`` honours per-request ``X-Profile`` headers / ``?profile=`` flags;
+    ``sample_every`` > 0 samples one request in N into the aggregate collapsed stacks.
+    """
+
+    def __init__(self, on_demand: bool = False, sample_every: int = 0, interval_ms: float = 1.0) -> None:
+        self.on_demand = on_demand
+        self.sample_every = max(0, int(sample_every))
+        self.interval_ms = max(0.1, float(interval_ms))
+
+    @classmethod
+    def from_env(cls) -> "ProfilingConfig":
+        return cls(
+            on_demand=os.environ.get("GRID_GENT_PROFILE", "0") == "1",
+            sample_every=int(_env_float("GRID_GENT_PROFILE_SAMPLE_N", 0)),
+            interval_ms=_env_float("GRID_GENT_PROFILE_INTERVAL_MS", 1.0),
+        )
+
+
+CONFIG = ProfilingConfig.from_env()
+_COUNTER = itertools.count(1)
+_SAMPLING = threading.Semaphore(1)  # at most one background-sampled request at a time
+_AGGREGATE: Counter = Counter()
+_AGGREGATE_LOCK = threading.Lock()
+_STATS = {"profiled": 0, "sampled": 0, "skipped_busy": 0}
+
+
+def _bump(name: str) -> None:
+    with _AGGREGATE_LOCK:
+        _STATS[name] += 1
+
+
+def _frame_name(frame: Any) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class StackSampler:
+    """Samples one thread's Python stack every ``interval_ms`` from a helper thread.
+
+    Stacks are recorded root first, ``;``-joined, which is the collapsed format
+    flamegraph tools read.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval_ms: float = 1.0) -> None:
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval_s = interval_ms / 1000.0
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names: List[str] = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+            self.samples += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._run, name="gridgent-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def _merge(stacks: Counter) -> None:
+    with _AGGREGATE_LOCK:
+        for stack, count in stacks.items():
+            if stack in _AGGREGATE or len(_AGGREGATE) < MAX_STACKS:
+                _AGGREGATE[stack] += count
+            else:
+                _AGGREGATE[_OVERFLOW_STACK] += count
+
+
+def _cprofile_summary(profile: cProfile.Profile, limit: int) -> List[Dict[str, Any]]:
+    stats = pstats.Stats(profile)
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:limit]  # type: ignore[attr-defined]
+    return [
+        {
+            "function": f"{os.path.basename(filename)}:{line}({name})",
+            "ncalls": ncalls,
+            "tottime_ms": round(tottime * 1000.0, 3),
+            "cumtime_ms": round(cumtime * 1000.0, 3),
+        }
+        for (filename, line, name), (_, ncalls, tottime, cumtime, _) in rows
+    ]
+
+
+def requested_mode(header: Optional[str], query_flag: Optional[str]) -> Optional[str]:
+    """The on-demand profile mode a request asked for, or None (also when switched off)."""
+    if not CONFIG.on_demand:
+        return None
+    mode = (header or query_flag or "").strip().lower()
+    if mode in ("1", "true", "yes"):
+        mode = "cprofile"
+    return mode if mode in PROFILE_MODES else None
+
+
+def profile_call(fn: Callable[[], T], mode: Optional[str] = None, limit: int = 30) -> Tuple[T, Optional[Dict[str, Any]]]:
+    """Run ``fn`` under the requested profiler, or the 1-in-N background sampler.
+
+    Returns ``(result, profile)``; ``profile`` is only set for on-demand modes. With
+    nothing enabled this costs one attribute check.
+    """
+    if mode is None:
+        if CONFIG.sample_every <= 0 or next(_COUNTER) % CONFIG.sample_every:
+            return fn(), None
+        if not _SAMPLING.acquire(blocking=False):
+            _bump("skipped_busy")
+            return fn(), None
+        try:
+            with StackSampler(interval_ms=CONFIG.interval_ms) as sampler:
+                result = fn()
+        finally:
+            _SAMPLING.release()
+        _merge(sampler.stacks)
+        _bump("sampled")
+        return result, None
+
+    _bump("profiled")
+    t0 = time.perf_counter()
+    if mode == "cprofile":
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            result = fn()
+        finally:
+            profile.disable()
+        return result, {
+            "mode": mode,
+            "total_ms": round((time.perf_counter() - t0) * 1000.0, 3),
+            "functions": _cprofile_summary(profile, limit),
+        }
+
+    with StackSampler(interval_ms=CONFIG.interval_ms) as sampler:
+        result = fn()
+    _merge(sampler.stacks)
+    return result, {
+        "mode": mode,
+        "total_ms": round((time.perf_counter() - t0) * 1000.0, 3),
+        "interval_ms": CONFIG.interval_ms,
+        "samples": sampler.samples,
+        "stacks": dict(sampler.stacks.most_common(limit)),
+    }
+
+
+def collapsed_stacks(reset: bool = False) -> str:
+    """Aggregated samples as ``frame;frame;frame count`` lines (flamegraph.pl / speedscope)."""
+    with _AGGREGATE_LOCK:
+        lines = [f"{stack} {count}" for stack, count in _AGGREGATE.most_common()]
+        if reset:
+            _AGGREGATE.clear()
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def profiling_stats() -> Dict[str, Any]:
+    with _AGGREGATE_LOCK:
+        return {
+            "on_demand": CONFIG.on_demand,
+            "sample_every": CONFIG.sample_every,
+            "interval_ms": CONFIG.interval_ms,
+            "distinct_stacks": len(_AGGREGATE),
+            **_STATS,
+        }
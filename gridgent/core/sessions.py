@@ -0,0 +1,209 @@
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, List, Optional
+import threading
+import time
+import uuid
+
+from gridgent.agents.intent import LOAD_WORDS_RE, PV_WORDS_RE
+
+# Intents describing one feeder scenario; only these pick up context from earlier turns.
+SCENARIO_INTENTS = ("simulation", "hosting_capacity", "voltage_control")
+
+
+@dataclass
+class Session:
+    session_id: str
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.monotonic)
+    turns: int = 0
+    # Scenario of the last answered scenario question: intent, feeder, added_pv_mw, added_load_mw.
+    last: Optional[Dict[str, Any]] = None
+    # Technical summary of that answer and the config version it was computed against.
+    summary: Optional[Dict[str, Any]] = None
+    config_version: Optional[str] = None
+    # Planning results solved in this session, most recent last.
+    solved: "OrderedDict[Hashable, Any]" = field(default_factory=OrderedDict)
+    # Held for the whole turn so concurrent requests in one session run in order.
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def recall(self, key: Hashable) -> Any:
+        value = self.solved.get(key)
+        if value is not None:
+            self.solved.move_to_end(key)
+        return value
+
+    def remember(self, key: Hashable, value: Any, limit: int) -> None:
+        self.solved[key] = value
+        self.solved.move_to_end(key)
+        while len(self.solved) > limit:
+            self.solved.popitem(last=False)
+
+    def previous_summary(self, config_version: str) -> Optional[Dict[str, Any]]:
+        """The last technical summary, if it was computed against ``config_version``."""
+        return self.summary if self.config_version == config_version else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "created_at": self.created_at,
+            "turns": self.turns,
+            "last": self.last,
+        }
+
+
+class SessionStore:
+    """Bounded in-memory conversation sessions with idle TTL and LRU eviction.
+
+    Sessions live in the process that served them; with pre-forked workers a follow-up
+    routed to another worker starts a fresh session.
+    """
+
+    def __init__(self, max_sessions: int = 10000, ttl_s: float = 1800.0, max_solved: int = 16) -> None:
+        self.max_sessions = max(1, max_sessions)
+        self.ttl_s = ttl_s
+        self.max_solved = max(1, max_solved)
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.resumed = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _purge(self, now: float) -> None:
+        # Least recently used first, so expired sessions are always at the front.
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used <= self.ttl_s:
+                break
+            self._sessions.popitem(last=False)
+            self.expired += 1
+
+    def get(self, session_id: Optional[str] = None) -> Session:
+        """Return the live session ``session_id``, creating it (or a new id) when absent."""
+        now = time.monotonic()
+        with self._lock:
+            self._purge(now)
+            session = self._sessions.get(session_id) if session_id else None
+            if session is not None:
+                self.resumed += 1
+                self._sessions.move_to_end(session.session_id)
+            else:
+                session = Session(session_id=session_id or uuid.uuid4().hex)
+                self._sessions[session.session_id] = session
+                self.created += 1
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    self.evicted += 1
+            session.last_used = now
+            return session
+
+    def drop(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "created": self.created,
+                "resumed": self.resumed,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "ttl_s": self.ttl_s,
+                "max_sessions": self.max_sessions,
+            }
+
+
+def resolve_follow_up(query: str, intent_info: Dict[str, Any], session: Session) -> Dict[str, Any]:
+    """Fill what a follow-up question leaves out from the session's last scenario.
+
+    Questions that name both a feeder and MW values stand alone. Otherwise a missing feeder
+    is carried forward, and so is any MW quantity the question does not mention; a bare
+    "what about 8 MW?" replaces whichever quantity the last scenario varied. The default
+    "simulation" intent also inherits the last intent. Returns ``intent_info`` unchanged
+    or a resolved copy with a ``follow_up`` entry listing what was carried.
+    """
+    last = session.last
+    if last is None or intent_info.get("intent") not in SCENARIO_INTENTS:
+        return intent_info
+    has_feeder = bool(intent_info.get("has_feeder"))
+    has_mw = bool(intent_info.get("has_mw"))
+    if has_feeder and has_mw:
+        return intent_info
+
+    text = (query or "").lower()
+    mentions_pv = bool(PV_WORDS_RE.search(text))
+    mentions_load = bool(LOAD_WORDS_RE.search(text))
+    specs = [dict(spec) for spec in intent_info.get("scenarios") or ()] or [
+        {"feeder": intent_info.get("feeder"), "added_pv_mw": 0.0, "added_load_mw": 0.0}
+    ]
+    carried: List[str] = []
+
+    if not has_feeder:
+        for spec in specs:
+            spec["feeder"] = last["feeder"]
+        carried.append("feeder")
+    if not has_mw:
+        for spec in specs:
+            spec["added_pv_mw"] = last["added_pv_mw"]
+            spec["added_load_mw"] = last["added_load_mw"]
+        carried += ["added_pv_mw", "added_load_mw"]
+    else:
+        if not mentions_pv and not mentions_load:
+            # Unlabelled MW were parsed as load; they change what the last scenario varied.
+            if last["added_pv_mw"] and not last["added_load_mw"]:
+                for spec in specs:
+                    spec["added_pv_mw"], spec["added_load_mw"] = spec["added_load_mw"], 0.0
+                mentions_pv = True
+            else:
+                mentions_load = True
+        if not mentions_pv:
+            for spec in specs:
+                spec["added_pv_mw"] = last["added_pv_mw"]
+            carried.append("added_pv_mw")
+        if not mentions_load:
+            for spec in specs:
+                spec["added_load_mw"] = last["added_load_mw"]
+            carried.append("added_load_mw")
+
+    resolved = dict(intent_info)
+    resolved.update(
+        {
+            "feeder": specs[0]["feeder"],
+            "feeders": list(dict.fromkeys(spec["feeder"] for spec in specs)),
+            "added_pv_mw": specs[0]["added_pv_mw"],
+            "added_load_mw": specs[0]["added_load_mw"],
+            "has_feeder": True,
+            "has_mw": True,
+            "scenarios": specs,
+            "follow_up": {"turn": session.turns, "carried": carried},
+        }
+    )
+    if resolved["intent"] == "simulation" and last["intent"] != "simulation":
+        resolved["intent"] = last["intent"]
+        carried.append("intent")
+    return resolved
+
+
+def remember_turn(
+    session: Session, intent_info: Dict[str, Any], status: str, summary: Dict[str, Any], config_version: str
+) -> None:
+    """Record an answered turn; scenario answers become the context for the next one."""
+    session.turns += 1
+    # The planner's feeder covers questions that fell back to the default feeder.
+    feeder = summary.get("feeder") or intent_info.get("feeder")
+    if status == "ok" and intent_info.get("intent") in SCENARIO_INTENTS and feeder:
+        session.last = {
+            "intent": intent_info["intent"],
+            "feeder": feeder,
+            "added_pv_mw": float(intent_info.get("added_pv_mw", 0.0)),
+            "added_load_mw": float(intent_info.get("added_load_mw", 0.0)),
+        }
+        session.summary = summary
+        session.config_version = config_version
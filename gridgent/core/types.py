@@ -1,17 +1,28 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict, Any, List, Literal
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Literal, Callable, Optional, Union
 
 StepRole = Literal["user", "intent_agent", "planning_agent", "narrator_agent", "tool"]
 
+# How much of the reasoning trace a caller wants back:
+#   none    - answer only; steps are never built
+#   summary - role and content of each step, no meta payloads
+#   full    - everything, including meta
+TraceLevel = Literal["none", "summary", "full"]
+TRACE_LEVELS = ("none", "summary", "full")
 
-@dataclass
+MetaSource = Union[Dict[str, Any], Callable[[], Dict[str, Any]], None]
+
+
+@dataclass(slots=True)
 class Step:
     role: StepRole
     content: str
     meta: Dict[str, Any]
 
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, level: TraceLevel = "full") -> Dict[str, Any]:
+        if level == "summary":
+            return {"role": self.role, "content": self.content}
         return {
             "role": self.role,
             "content": self.content,
@@ -19,15 +30,54 @@ class Step:
         }
 
 
-@dataclass
+class Trace:
+    """Step collector that only builds what the requested ``level`` needs.
+
+    ``meta`` may be passed as a zero-argument callable so payloads that exist only for
+    the trace are never built below ``full``. Meta dicts are stored by reference, so a
+    payload shared with the technical summary is not copied.
+    """
+
+    __slots__ = ("level", "steps")
+
+    def __init__(self, level: TraceLevel = "full") -> None:
+        if level not in TRACE_LEVELS:
+            raise ValueError(f"Unknown trace level '{level}'; expected one of {', '.join(TRACE_LEVELS)}.")
+        self.level: TraceLevel = level
+        self.steps: List[Step] = []
+
+    def add(self, role: StepRole, content: str, meta: MetaSource = None) -> None:
+        if self.level == "none":
+            return
+        if self.level == "summary":
+            self.steps.append(Step(role=role, content=content, meta={}))
+            return
+        if callable(meta):
+            meta = meta()
+        self.steps.append(Step(role=role, content=content, meta=meta if meta is not None else {}))
+
+    def extend(self, steps: List[Step]) -> None:
+        if self.level != "none":
+            self.steps.extend(steps)
+
+
+@dataclass(slots=True)
 class OrchestratorResult:
     task_id: str
     answer: str
     steps: List[Step]
+    trace_level: TraceLevel = "full"
+    # Stages cut short by the request's deadline; empty for complete answers.
+    partial: List[str] = field(default_factory=list)
 
-    def to_dict(self) -> Dict[str, Any]:
-        return {
+    def to_dict(self, steps: Optional[TraceLevel] = None) -> Dict[str, Any]:
+        level = steps or self.trace_level
+        out: Dict[str, Any] = {
             "task_id": self.task_id,
             "answer": self.answer,
-            "steps": [s.to_dict() for s in self.steps],
         }
+        if self.partial:
+            out["partial"] = self.partial
+        if level != "none":
+            out["steps"] = [s.to_dict(level) for s in self.steps]
+        return out
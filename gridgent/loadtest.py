@@ -0,0 +1,583 @@
+"""Load-test harness: replay a recorded request log against a running server.
+
+Usage::
+
+    python -m gridgent.loadtest run traffic.jsonl --url http://127.0.0.1:8000 --concurrency 16 -o base.json
+    python -m gridgent.loadtest run traffic.jsonl --url http://127.0.0.1:8001 --rate 50 -o cand.json
+    python -m gridgent.loadtest compare base.json cand.json --threshold-pct 10
+
+The log is JSON lines (or CSV, as for ``gridgent.batch``). A record with a ``path`` is
+sent as recorded: ``method`` (default POST with a body, else GET), ``body`` (an object is
+sent as JSON) and ``headers``. Any other record is a question for ``/api/ask``, built
+from its ``query`` / ``question`` / ``body`` text or its ``feeder`` / MW columns. ``ts``
+(epoch seconds) or ``offset_s`` gives the request's place in the recording for
+``--rate recorded``.
+
+Without ``--rate`` the run is closed loop: ``--concurrency`` clients each send their next
+request as soon as the last one is answered. With ``--rate`` it is open loop: requests
+start on a fixed, Poisson or recorded schedule whatever the server's latency, with at
+most ``--concurrency`` in flight. Open-loop latency is measured from the scheduled start,
+so time spent waiting for a free client counts against the server.
+"""
+from __future__ import annotations
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+import argparse
+import http.client
+import itertools
+import json
+import math
+import random
+import re
+import sys
+import threading
+import time
+
+from gridgent.batch import read_records, record_query
+
+PERCENTILES: Tuple[float, ...] = (50.0, 90.0, 95.0, 99.0)
+# Scheduled requests allowed to wait for a free client per unit of concurrency before
+# the generator itself is the bottleneck and further arrivals are dropped.
+BACKLOG_PER_CLIENT = 100
+# Latency changes smaller than this (ms) are never reported as regressions.
+MIN_DELTA_MS = 1.0
+# Path segments that are record ids (job ids, numbers) are grouped under one endpoint.
+_ID_SEGMENT = re.compile(r"^(?:\d+|[0-9a-f]{8,}|[0-9a-f-]{36})$", re.IGNORECASE)
+
+
+class ReplayRequest(NamedTuple):
+    method: str
+    path: str
+    body: Optional[bytes]
+    headers: Dict[str, str]
+    offset_s: Optional[float]  # position in the recording, if it has timestamps
+
+    @property
+    def endpoint(self) -> str:
+        path = self.path.split("?", 1)[0]
+        return f"{self.method} " + "/".join("{id}" if _ID_SEGMENT.match(s) else s for s in path.split("/"))
+
+
+# -- input ----------------------------------------------------------------------------
+
+
+def request_from_record(record: Dict[str, Any]) -> ReplayRequest:
+    """Turn one log record into the HTTP request to replay."""
+    ts = record.get("offset_s", record.get("ts", record.get("timestamp")))
+    offset = float(ts) if ts not in (None, "") else None
+    headers = {str(k): str(v) for k, v in (record.get("headers") or {}).items()}
+    if record.get("path"):
+        body = record.get("body")
+        if isinstance(body, (dict, list)):
+            payload: Optional[bytes] = json.dumps(body).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        elif body is not None:
+            payload = str(body).encode("utf-8")
+        else:
+            payload = None
+        method = str(record.get("method") or ("POST" if payload is not None else "GET")).upper()
+        return ReplayRequest(method, str(record["path"]), payload, headers, offset)
+    ask: Dict[str, Any] = {"query": record_query(record)}
+    for key in ("steps", "timeout_ms"):
+        if record.get(key) is not None:
+            ask[key] = record[key]
+    headers.setdefault("Content-Type", "application/json")
+    return ReplayRequest("POST", "/api/ask", json.dumps(ask).encode("utf-8"), headers, offset)
+
+
+def replay_requests(path: Path, loop: bool = False) -> Iterator[ReplayRequest]:
+    """Yield the log's requests, lazily; with ``loop`` start over at the end, forever.
+
+    Offsets are relative to the first record; each further pass continues from the
+    last offset of the previous one.
+    """
+    base = 0.0
+    while True:
+        first: Optional[float] = None
+        last = base
+        count = 0
+        for _, record in read_records(path):
+            try:
+                req = request_from_record(record)
+            except ValueError as exc:
+                raise ValueError(f"{path}: record {count}: {exc}") from exc
+            if req.offset_s is not None:
+                first = req.offset_s if first is None else first
+                last = base + req.offset_s - first
+                req = req._replace(offset_s=last)
+            count += 1
+            yield req
+        if not count:
+            raise ValueError(f"{path}: no requests to replay.")
+        if not loop:
+            return
+        base = last
+
+
+def schedule(
+    requests: Iterator[ReplayRequest], rate: str, speed: float = 1.0, seed: Optional[int] = None
+) -> Iterator[Tuple[ReplayRequest, float]]:
+    """Pair every request with its start time in seconds from the beginning of the run.
+
+    ``rate`` is requests per second, ``poisson:<rps>`` for exponential gaps, or
+    ``recorded`` to keep the log's own spacing (divided by ``speed``).
+    """
+    if rate == "recorded":
+        for req in requests:
+            if req.offset_s is None:
+                raise ValueError("--rate recorded needs a 'ts' or 'offset_s' on every record.")
+            yield req, req.offset_s / speed
+        return
+    poisson = rate.startswith("poisson:")
+    try:
+        rps = float(rate.split(":", 1)[1] if poisson else rate)
+    except ValueError:
+        rps = 0.0
+    if not rps > 0 or math.isinf(rps):
+        raise ValueError(f"Invalid rate '{rate}'; expected requests per second, 'poisson:<rps>' or 'recorded'.")
+    rng = random.Random(seed)
+    at = 0.0
+    for i, req in enumerate(requests):
+        yield req, at
+        at = at + rng.expovariate(rps) if poisson else (i + 1) / rps
+
+
+# -- client ---------------------------------------------------------------------------
+
+
+class HttpClient:
+    """One keep-alive connection per thread to the target server."""
+
+    def __init__(self, url: str, timeout_s: float = 30.0, headers: Optional[Dict[str, str]] = None) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Invalid target URL '{url}'; expected http[s]://host[:port].")
+        self._cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip("/")
+        self.timeout_s = timeout_s
+        self.headers = dict(headers or {})
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open: List[http.client.HTTPConnection] = []
+
+    def _connection(self) -> Tuple[http.client.HTTPConnection, bool]:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn, conn.sock is not None
+        conn = self._cls(self.host, self.port, timeout=self.timeout_s)
+        self._local.conn = conn
+        with self._lock:
+            self._open.append(conn)
+        return conn, False
+
+    def send(self, req: ReplayRequest) -> Tuple[int, int]:
+        """Send one request and read the whole response; returns ``(status, body_bytes)``."""
+        headers = {**self.headers, **req.headers}
+        for attempt in range(2):
+            conn, reused = self._connection()
+            try:
+                conn.request(req.method, self.prefix + req.path, body=req.body, headers=headers)
+                resp = conn.getresponse()
+                return resp.status, len(resp.read())
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                # The server may close an idle keep-alive connection under us; retry once on a fresh one.
+                if not reused or attempt:
+                    raise
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                raise
+        raise AssertionError("unreachable")
+
+    def close(self) -> None:
+        """Close every thread's connection."""
+        with self._lock:
+            conns, self._open = self._open, []
+        for conn in conns:
+            conn.close()
+
+
+# -- measurement ----------------------------------------------------------------------
+
+
+def percentile(ordered: Sequence[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of already sorted samples."""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(p / 100.0 * len(ordered)) - 1))]
+
+
+class _EndpointStats:
+    __slots__ = ("latencies", "errors", "statuses", "bytes")
+
+    def __init__(self) -> None:
+        self.latencies: List[float] = []
+        self.errors = 0
+        self.statuses: Counter = Counter()
+        self.bytes = 0
+
+    def to_dict(self, elapsed_s: float) -> Dict[str, Any]:
+        n = len(self.latencies)
+        ordered = sorted(self.latencies)
+        latency: Dict[str, Optional[float]] = {
+            f"p{p:g}": None if not n else round(percentile(ordered, p), 3) for p in PERCENTILES  # type: ignore[arg-type]
+        }
+        latency["mean"] = round(sum(ordered) / n, 3) if n else None
+        latency["max"] = round(ordered[-1], 3) if n else None
+        return {
+            "requests": n,
+            "errors": self.errors,
+            "error_rate": round(self.errors / n, 4) if n else 0.0,
+            "throughput_rps": round(n / max(elapsed_s, 1e-9), 2),
+            "statuses": dict(sorted(self.statuses.items())),
+            "bytes": self.bytes,
+            "latency_ms": latency,
+        }
+
+
+class Recorder:
+    """Thread-safe per-endpoint latency, status and error counts.
+
+    Every sample is kept so percentiles are exact; a replay holds a few bytes per request.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self._total = _EndpointStats()
+        self.first_start: Optional[float] = None
+        self.last_end: Optional[float] = None
+
+    def record(self, endpoint: str, started: float, ended: float, status: Optional[int], nbytes: int = 0) -> None:
+        """``status`` None means the request failed without an HTTP response."""
+        latency_ms = (ended - started) * 1000.0
+        with self._lock:
+            self.first_start = started if self.first_start is None else min(self.first_start, started)
+            self.last_end = ended if self.last_end is None else max(self.last_end, ended)
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _EndpointStats()
+            for s in (stats, self._total):
+                s.latencies.append(latency_ms)
+                s.statuses[str(status) if status is not None else "error"] += 1
+                s.errors += status is None or status >= 400
+                s.bytes += nbytes
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = (self.last_end - self.first_start) if self.first_start is not None else 0.0  # type: ignore[operator]
+            return {
+                "elapsed_s": round(elapsed, 3),
+                "overall": self._total.to_dict(elapsed),
+                "endpoints": {name: s.to_dict(elapsed) for name, s in sorted(self._endpoints.items())},
+            }
+
+
+# -- driver ---------------------------------------------------------------------------
+
+
+def _send(client: HttpClient, recorder: Recorder, req: ReplayRequest, started: float, measured: bool) -> None:
+    try:
+        status, nbytes = client.send(req)
+    except (OSError, http.client.HTTPException):
+        status, nbytes = None, 0
+    if measured:
+        recorder.record(req.endpoint, started, time.perf_counter(), status, nbytes)
+
+
+def _closed_loop(
+    requests: Iterator[ReplayRequest],
+    client: HttpClient,
+    recorder: Recorder,
+    concurrency: int,
+    warmup: int,
+    stop_at: float,
+    think_s: float,
+) -> None:
+    lock = threading.Lock()
+    counter = itertools.count()
+    failures: List[BaseException] = []
+
+    def worker() -> None:
+        while time.perf_counter() < stop_at and not failures:
+            with lock:
+                try:
+                    req = next(requests, None)
+                except Exception as exc:  # a bad record later in the log
+                    failures.append(exc)
+                    return
+                index = next(counter)
+            if req is None:
+                return
+            _send(client, recorder, req, time.perf_counter(), index >= warmup)
+            if think_s:
+                time.sleep(think_s)
+
+    threads = [threading.Thread(target=worker, name=f"loadtest-{i}", daemon=True) for i in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if failures:
+        raise failures[0]
+
+
+def _open_loop(
+    timed: Iterator[Tuple[ReplayRequest, float]],
+    client: HttpClient,
+    recorder: Recorder,
+    concurrency: int,
+    warmup: int,
+    stop_at: float,
+) -> int:
+    """Start requests on schedule; returns how many were dropped because the backlog was full."""
+    backlog = threading.BoundedSemaphore(concurrency * BACKLOG_PER_CLIENT)
+    dropped = 0
+
+    def task(req: ReplayRequest, due: float, measured: bool) -> None:
+        try:
+            _send(client, recorder, req, due, measured)
+        finally:
+            backlog.release()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadtest") as pool:
+        for index, (req, at) in enumerate(timed):
+            due = start + at
+            if due >= stop_at:
+                break
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            if not backlog.acquire(blocking=False):
+                dropped += 1
+                continue
+            pool.submit(task, req, due, index >= warmup)
+    return dropped
+
+
+def run_load(
+    log_path: Path,
+    url: str,
+    rate: Optional[str] = None,
+    concurrency: int = 8,
+    requests: Optional[int] = None,
+    duration_s: Optional[float] = None,
+    warmup: int = 0,
+    speed: float = 1.0,
+    think_ms: float = 0.0,
+    timeout_s: float = 30.0,
+    headers: Optional[Dict[str, str]] = None,
+    seed: Optional[int] = None,
+    label: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Replay ``log_path`` against ``url`` and return the report.
+
+    The log is sent once unless ``requests`` (total, warm-up included) or ``duration_s``
+    asks for more, in which case it is replayed from the start as often as needed. The
+    first ``warmup`` requests are sent but not measured.
+    """
+    concurrency = max(1, int(concurrency))
+    if speed <= 0:
+        raise ValueError("--speed must be positive.")
+    client = HttpClient(url, timeout_s=timeout_s, headers=headers)
+    loop = requests is not None or duration_s is not None
+    stream: Iterator[ReplayRequest] = replay_requests(Path(log_path), loop=loop)
+    stream = itertools.chain([next(stream)], stream)  # an empty or unreadable log fails here
+    if requests is not None:
+        stream = itertools.islice(stream, max(0, int(requests)))
+    stop_at = time.perf_counter() + duration_s if duration_s else math.inf
+    recorder = Recorder()
+    dropped = 0
+    try:
+        if rate is None:
+            _closed_loop(stream, client, recorder, concurrency, warmup, stop_at, think_ms / 1000.0)
+        else:
+            timed = schedule(stream, rate, speed, seed)
+            dropped = _open_loop(timed, client, recorder, concurrency, warmup, stop_at)
+    finally:
+        client.close()
+
+    report = recorder.report()
+    report.update(
+        {
+            "label": label or url,
+            "target": url,
+            "log": str(log_path),
+            "mode": "closed" if rate is None else "open",
+            "rate": rate,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "dropped": dropped,
+            "finished_at": round(time.time(), 3),
+        }
+    )
+    return report
+
+
+# -- comparison -----------------------------------------------------------------------
+
+
+def _change_pct(base: Optional[float], cand: Optional[float]) -> Optional[float]:
+    if base is None or cand is None or base == 0:
+        return None
+    return round((cand - base) / base * 100.0, 2)
+
+
+def compare_reports(
+    baseline: Dict[str, Any],
+    candidate: Dict[str, Any],
+    threshold_pct: float = 10.0,
+    error_rate_delta: float = 0.01,
+) -> Dict[str, Any]:
+    """Compare two ``run_load`` reports endpoint by endpoint.
+
+    A regression is a p95/p99 latency up by more than ``threshold_pct`` (and more than
+    ``MIN_DELTA_MS``), closed-loop throughput down by more than ``threshold_pct``, or an
+    error rate up by more than ``error_rate_delta``. Endpoints seen in only one report
+    are listed but not judged.
+    """
+    base_eps = {"overall": baseline["overall"], **baseline.get("endpoints", {})}
+    cand_eps = {"overall": candidate["overall"], **candidate.get("endpoints", {})}
+    closed = baseline.get("mode") == candidate.get("mode") == "closed"
+    endpoints: Dict[str, Any] = {}
+    regressions: List[str] = []
+    for name in sorted(set(base_eps) & set(cand_eps), key=lambda n: (n != "overall", n)):
+        b, c = base_eps[name], cand_eps[name]
+        rows: Dict[str, Any] = {}
+        for key in [f"p{p:g}" for p in PERCENTILES] + ["mean", "max"]:
+            bv, cv = b["latency_ms"].get(key), c["latency_ms"].get(key)
+            rows[f"{key}_ms"] = {"baseline": bv, "candidate": cv, "change_pct": _change_pct(bv, cv)}
+            change = rows[f"{key}_ms"]["change_pct"]
+            if key in ("p95", "p99") and change is not None and change > threshold_pct and cv - bv > MIN_DELTA_MS:
+                regressions.append(f"{name}: {key} latency {bv:g} -> {cv:g} ms ({change:+g}%)")
+        bt, ct = b["throughput_rps"], c["throughput_rps"]
+        rows["throughput_rps"] = {"baseline": bt, "candidate": ct, "change_pct": _change_pct(bt, ct)}
+        change = rows["throughput_rps"]["change_pct"]
+        if closed and change is not None and change < -threshold_pct:
+            regressions.append(f"{name}: throughput {bt:g} -> {ct:g} req/s ({change:+g}%)")
+        be, ce = b["error_rate"], c["error_rate"]
+        rows["error_rate"] = {"baseline": be, "candidate": ce, "change_pct": _change_pct(be, ce)}
+        if ce - be > error_rate_delta:
+            regressions.append(f"{name}: error rate {be:.2%} -> {ce:.2%}")
+        endpoints[name] = rows
+    return {
+        "baseline": baseline.get("label"),
+        "candidate": candidate.get("label"),
+        "threshold_pct": threshold_pct,
+        # Runs with different loop modes or rates measure different things.
+        "comparable": (baseline.get("mode"), baseline.get("rate")) == (candidate.get("mode"), candidate.get("rate")),
+        "endpoints": endpoints,
+        "only_in_baseline": sorted(set(base_eps) - set(cand_eps)),
+        "only_in_candidate": sorted(set(cand_eps) - set(base_eps)),
+        "regressions": regressions,
+        "ok": not regressions,
+    }
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    """Plain-text table of ``compare_reports`` output."""
+    lines = [f"baseline:  {comparison['baseline']}", f"candidate: {comparison['candidate']}", ""]
+    if not comparison["comparable"]:
+        lines[-1:-1] = ["warning: the runs used different load modes or rates"]
+    lines.append(f"{'endpoint':<32} {'metric':<15} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for name, rows in comparison["endpoints"].items():
+        for metric, row in rows.items():
+            cells = ["-" if row[k] is None else f"{row[k]:g}" for k in ("baseline", "candidate")]
+            change = "-" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+            lines.append(f"{name:<32} {metric:<15} {cells[0]:>12} {cells[1]:>12} {change:>9}")
+    for key in ("only_in_baseline", "only_in_candidate"):
+        if comparison[key]:
+            lines.append(f"{key.replace('_', ' ')}: {', '.join(comparison[key])}")
+    lines.append("")
+    if comparison["ok"]:
+        lines.append(f"no regressions beyond {comparison['threshold_pct']:g}%")
+    else:
+        lines.extend(["REGRESSIONS:"] + [f"  {r}" for r in comparison["regressions"]])
+    return "\n".join(lines)
+
+
+# -- command line ---------------------------------------------------------------------
+
+
+def _header(value: str) -> Tuple[str, str]:
+    name, sep, content = value.partition(":")
+    if not sep or not name.strip():
+        raise argparse.ArgumentTypeError(f"expected 'Name: value', got '{value}'")
+    return name.strip(), content.strip()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m gridgent.loadtest",
+        description="Replay recorded requests against a Grid-Gent server and compare runs.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="replay a request log and write a report")
+    run.add_argument("log", type=Path, help="request log (JSON lines or CSV)")
+    run.add_argument("--url", default="http://127.0.0.1:8000", help="server base URL")
+    run.add_argument(
+        "--rate", help="open loop: requests/s, 'poisson:<rps>' or 'recorded' (default: closed loop)"
+    )
+    run.add_argument("--concurrency", type=int, default=8, help="clients (closed) or max in flight (open)")
+    run.add_argument("--requests", type=int, help="total requests to send, repeating the log as needed")
+    run.add_argument("--duration", type=float, help="stop starting new requests after this many seconds")
+    run.add_argument("--warmup", type=int, default=0, help="initial requests left out of the report")
+    run.add_argument("--speed", type=float, default=1.0, help="time compression for --rate recorded")
+    run.add_argument("--think-ms", type=float, default=0.0, help="pause between a client's requests (closed)")
+    run.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    run.add_argument("-H", "--header", type=_header, action="append", default=[], help="extra header, 'Name: value'")
+    run.add_argument("--seed", type=int, help="random seed for Poisson arrivals")
+    run.add_argument("--label", help="name for this run in comparisons (default: the URL)")
+    run.add_argument("-o", "--output", type=Path, help="write the JSON report here as well")
+
+    cmp_ = sub.add_parser("compare", help="compare two reports; exits 1 on a regression")
+    cmp_.add_argument("baseline", type=Path)
+    cmp_.add_argument("candidate", type=Path)
+    cmp_.add_argument("--threshold-pct", type=float, default=10.0, help="allowed latency/throughput change")
+    cmp_.add_argument("--error-rate-delta", type=float, default=0.01, help="allowed error-rate increase")
+    cmp_.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "run":
+            report = run_load(
+                args.log,
+                args.url,
+                rate=args.rate,
+                concurrency=args.concurrency,
+                requests=args.requests,
+                duration_s=args.duration,
+                warmup=args.warmup,
+                speed=args.speed,
+                think_ms=args.think_ms,
+                timeout_s=args.timeout,
+                headers=dict(args.header),
+                seed=args.seed,
+                label=args.label,
+            )
+            text = json.dumps(report, indent=2)
+            if args.output is not None:
+                args.output.parent.mkdir(parents=True, exist_ok=True)
+                args.output.write_text(text + "\n", encoding="utf-8")
+            print(text)
+            return 0
+        reports = [json.loads(p.read_text(encoding="utf-8")) for p in (args.baseline, args.candidate)]
+        comparison = compare_reports(*reports, threshold_pct=args.threshold_pct, error_rate_delta=args.error_rate_delta)
+    except (OSError, ValueError, KeyError) as exc:
+        parser.exit(2, f"error: {exc}\n")
+    except KeyboardInterrupt:
+        sys.stderr.write("interrupted\n")
+        return 130
+    print(json.dumps(comparison, indent=2) if args.json else format_comparison(comparison))
+    return 0 if comparison["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,4 @@
 # package
+from gridgent.tools.grid_stub import PowerFlowResult, get_feeder_summary, run_power_flow_scenario
+
+__all__ = ["PowerFlowResult", "get_feeder_summary", "run_power_flow_scenario"]
@@ -0,0 +1,175 @@
+from __future__ import annotations
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+import csv
+import io
+import itertools
+
+from gridgent.tools.grid_stub import (
+    get_all_feeders,
+    get_feeder_summary,
+    LOADING_LIMIT_PCT,
+    VOLTAGE_MIN_PU,
+    VOLTAGE_MAX_PU,
+)
+from gridgent.tools.solvers import SolverBackend, evaluate_batch, get_backend
+
+try:  # optional dependency
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = pq = None
+
+EXPORT_COLUMNS: Tuple[str, ...] = (
+    "feeder",
+    "name",
+    "peak_mw",
+    "pv_mw",
+    "added_pv_mw",
+    "added_load_mw",
+    "peak_loading_pct",
+    "min_voltage_pu",
+    "max_voltage_pu",
+    "loading_margin_pct",
+    "voltage_margin_pu",
+    "within_limits",
+)
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+# Rows per solver call and per record batch / row group.
+DEFAULT_BATCH_ROWS = 4096
+# Upper bound on rows one export request may expand to.
+MAX_EXPORT_ROWS = 10_000_000
+
+# (feeder id, added_pv_mw, added_load_mw)
+ScenarioSpec = Tuple[str, float, float]
+
+
+def available_formats() -> List[str]:
+    return ["csv", "arrow", "parquet"] if pa is not None else ["csv"]
+
+
+def _arrow_schema() -> Any:
+    return pa.schema(
+        [("feeder", pa.string()), ("name", pa.string())]
+        + [(name, pa.float64()) for name in EXPORT_COLUMNS[2:-1]]
+        + [("within_limits", pa.bool_())]
+    )
+
+
+def _row(fid: str, meta: Mapping[str, Any], pv: float, load: float, metrics: Tuple[float, float, float]) -> Dict[str, Any]:
+    loading, vmin, vmax = metrics
+    return {
+        "feeder": fid,
+        "name": str(meta.get("name", fid)),
+        "peak_mw": float(meta.get("peak_mw", 10.0)),
+        "pv_mw": float(meta.get("pv_mw", 1.0)),
+        "added_pv_mw": pv,
+        "added_load_mw": load,
+        "peak_loading_pct": round(loading, 1),
+        "min_voltage_pu": round(vmin, 3),
+        "max_voltage_pu": round(vmax, 3),
+        "loading_margin_pct": round(LOADING_LIMIT_PCT - loading, 1),
+        "voltage_margin_pu": round(min(vmin - VOLTAGE_MIN_PU, VOLTAGE_MAX_PU - vmax), 3),
+        "within_limits": loading <= LOADING_LIMIT_PCT and VOLTAGE_MIN_PU <= vmin and vmax <= VOLTAGE_MAX_PU,
+    }
+
+
+def scenario_rows(
+    scenarios: Iterable[ScenarioSpec],
+    backend: Optional[SolverBackend] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Evaluate ``(feeder, added_pv_mw, added_load_mw)`` scenarios, yielding batches of rows.
+
+    ``scenarios`` is consumed lazily, one solver batch at a time.
+    """
+    backend = backend or get_backend(query_type="export")
+    metas: Dict[str, Mapping[str, Any]] = {}
+    it = iter(scenarios)
+    while True:
+        chunk = list(itertools.islice(it, batch_rows))
+        if not chunk:
+            return
+        for fid, _, _ in chunk:
+            if fid not in metas:
+                metas[fid] = get_feeder_summary(fid)
+        metrics = evaluate_batch([(metas[fid], pv, load) for fid, pv, load in chunk], backend=backend)
+        yield [_row(fid, metas[fid], pv, load, m) for (fid, pv, load), m in zip(chunk, metrics)]
+
+
+def fleet_rows(
+    added_pv_mw: float = 0.0,
+    added_load_mw: float = 0.0,
+    feeders: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    backend: Optional[SolverBackend] = None,
+    batch_rows: int = DEFAULT_BATCH_ROWS,
+) -> Iterator[List[Dict[str, Any]]]:
+    """The same scenario on every feeder (the full screening result, not just the top-K)."""
+    feeders = get_all_feeders() if feeders is None else feeders
+    backend = backend or get_backend(query_type="fleet_screening")
+    items = iter(feeders.items())
+    while True:
+        chunk = list(itertools.islice(items, batch_rows))
+        if not chunk:
+            return
+        metrics = evaluate_batch([(meta, added_pv_mw, added_load_mw) for _, meta in chunk], backend=backend)
+        yield [
+            _row(str(fid).upper(), meta, added_pv_mw, added_load_mw, m) for (fid, meta), m in zip(chunk, metrics)
+        ]
+
+
+def sweep_scenarios(
+    feeders: Sequence[str], pv_values: Sequence[float], load_values: Sequence[float]
+) -> Iterator[ScenarioSpec]:
+    """Every feeder x PV x load combination, generated lazily."""
+    total = len(feeders) * len(pv_values) * len(load_values)
+    if total == 0:
+        raise ValueError("A sweep needs at least one feeder, one PV value and one load value.")
+    if total > MAX_EXPORT_ROWS:
+        raise ValueError(f"Sweep expands to {total} scenarios; the export limit is {MAX_EXPORT_ROWS}.")
+    return ((str(f).upper(), float(pv), float(load)) for f, pv, load in itertools.product(feeders, pv_values, load_values))
+
+
+def write_rows(batches: Iterable[List[Dict[str, Any]]], out: BinaryIO, fmt: str = "csv") -> int:
+    """Write row batches to ``out`` as CSV, Arrow IPC stream or Parquet; returns the row count.
+
+    Each batch becomes one record batch / row group (or block of CSV lines) and is written
+    before the next is computed, so memory holds one batch at a time.
+    """
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f"Unknown export format '{fmt}'; expected one of {', '.join(CONTENT_TYPES)}.")
+    if fmt != "csv" and pa is None:
+        raise ValueError(f"Export format '{fmt}' needs pyarrow; available: csv.")
+
+    rows = 0
+    if fmt == "csv":
+        text = io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True)
+        writer = csv.DictWriter(text, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for batch in batches:
+            writer.writerows(batch)
+            rows += len(batch)
+        text.flush()
+        text.detach()
+        return rows
+
+    schema = _arrow_schema()
+    sink = pa.PythonFile(out, mode="w")
+    writer = pa.ipc.new_stream(sink, schema) if fmt == "arrow" else pq.ParquetWriter(sink, schema)
+    try:
+        for batch in batches:
+            columns = [[row[name] for row in batch] for name in EXPORT_COLUMNS]
+            record_batch = pa.RecordBatch.from_arrays(
+                [pa.array(col, type=schema.field(i).type) for i, col in enumerate(columns)], schema=schema
+            )
+            if fmt == "arrow":
+                writer.write_batch(record_batch)
+            else:
+                writer.write_table(pa.Table.from_batches([record_batch]))
+            rows += len(batch)
+    finally:
+        writer.close()
+    return rows
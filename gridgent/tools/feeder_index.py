@@ -0,0 +1,192 @@
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple
+import threading
+
+from gridgent.tools.grid_stub import (
+    get_all_feeders,
+    get_config_version,
+    evaluate_feeder_metrics,
+    register_delta_hook,
+)
+
+INDEXED_FIELDS = ("peak_mw", "pv_mw", "num_customers", "loading_pct")
+
+# (min, max) bounds, both inclusive; None leaves that side open.
+Bounds = Tuple[Optional[float], Optional[float]]
+
+_INDEX_CACHE: "FeederIndex | None" = None
+_INDEX_LOCK = threading.Lock()
+
+
+def _feeder_record(meta: Mapping[str, Any]) -> Dict[str, float]:
+    peak = float(meta.get("peak_mw", 10.0))
+    pv = float(meta.get("pv_mw", 1.0))
+    loading, _, _ = evaluate_feeder_metrics(peak, pv)
+    return {
+        "peak_mw": peak,
+        "pv_mw": pv,
+        "num_customers": float(meta.get("num_customers", 1000)),
+        "loading_pct": loading,
+    }
+
+
+class FeederIndex:
+    """Sorted-array secondary index over feeder attributes.
+
+    Each indexed field keeps a sorted list of values with the matching feeder ids, so a
+    single range lookup is two bisections. Compound queries pick the narrowest range
+    and filter its candidates against the remaining predicates.
+    """
+
+    def __init__(self, feeders: Mapping[str, Mapping[str, Any]], version: str = "") -> None:
+        self.version = version
+        self.records: Dict[str, Dict[str, float]] = {
+            str(fid).upper(): _feeder_record(meta) for fid, meta in feeders.items()
+        }
+        self._values: Dict[str, List[float]] = {}
+        self._ids: Dict[str, List[str]] = {}
+        for field in INDEXED_FIELDS:
+            pairs = sorted((rec[field], fid) for fid, rec in self.records.items())
+            self._values[field] = [v for v, _ in pairs]
+            self._ids[field] = [fid for _, fid in pairs]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def updated(
+        self,
+        changed: Mapping[str, Mapping[str, Any]],
+        removed: Iterable[str] = (),
+        version: str = "",
+    ) -> "FeederIndex":
+        """Return a copy with ``changed`` feeders re-indexed and ``removed`` ones dropped.
+
+        Only the affected positions move; the copy keeps concurrent readers of this
+        index consistent.
+        """
+        index = FeederIndex.__new__(FeederIndex)
+        index.version = version
+        index.records = dict(self.records)
+        index._values = {field: list(values) for field, values in self._values.items()}
+        index._ids = {field: list(ids) for field, ids in self._ids.items()}
+
+        for fid in [*removed, *changed]:
+            old = index.records.pop(fid, None)
+            if old is None:
+                continue
+            for field in INDEXED_FIELDS:
+                values, ids = index._values[field], index._ids[field]
+                pos = bisect_left(values, old[field])
+                while ids[pos] != fid:
+                    pos += 1
+                del values[pos]
+                del ids[pos]
+
+        for fid, meta in changed.items():
+            rec = _feeder_record(meta)
+            index.records[fid] = rec
+            for field in INDEXED_FIELDS:
+                values, ids = index._values[field], index._ids[field]
+                # Keep (value, id) order so results match a fresh build.
+                pos = bisect_left(values, rec[field])
+                while pos < len(values) and values[pos] == rec[field] and ids[pos] < fid:
+                    pos += 1
+                values.insert(pos, rec[field])
+                ids.insert(pos, fid)
+        return index
+
+    def _span(self, field: str, bounds: Bounds) -> Tuple[int, int]:
+        if field not in self._values:
+            raise ValueError(f"Unknown index field '{field}'; expected one of {', '.join(INDEXED_FIELDS)}.")
+        values = self._values[field]
+        lo, hi = bounds
+        start = 0 if lo is None else bisect_left(values, lo)
+        stop = len(values) if hi is None else bisect_right(values, hi)
+        return start, max(start, stop)
+
+    def range(self, field: str, lo: Optional[float] = None, hi: Optional[float] = None) -> List[str]:
+        start, stop = self._span(field, (lo, hi))
+        return self._ids[field][start:stop]
+
+    def query(self, predicates: Mapping[str, Bounds], limit: Optional[int] = None) -> List[str]:
+        """Return feeder ids matching every predicate, ordered by the driving field."""
+        if limit is not None and limit < 1:
+            raise ValueError("'limit' must be at least 1.")
+        if not predicates:
+            ids = sorted(self.records)
+            return ids[:limit] if limit is not None else ids
+
+        spans = {field: self._span(field, bounds) for field, bounds in predicates.items()}
+        driver = min(spans, key=lambda f: spans[f][1] - spans[f][0])
+        start, stop = spans[driver]
+        rest = [(f, b) for f, b in predicates.items() if f != driver]
+
+        out: List[str] = []
+        for fid in self._ids[driver][start:stop]:
+            rec = self.records[fid]
+            if all(
+                (lo is None or rec[f] >= lo) and (hi is None or rec[f] <= hi) for f, (lo, hi) in rest
+            ):
+                if limit is not None and len(out) >= limit:
+                    break
+                out.append(fid)
+        return out
+
+
+def parse_predicates(params: Mapping[str, Any]) -> Dict[str, Bounds]:
+    """Turn flat ``<field>_min`` / ``<field>_max`` parameters into index predicates."""
+    predicates: Dict[str, List[Optional[float]]] = {}
+    for key, raw in params.items():
+        if key.endswith("_min"):
+            field, side = key[:-4], 0
+        elif key.endswith("_max"):
+            field, side = key[:-4], 1
+        else:
+            continue
+        if field not in INDEXED_FIELDS:
+            raise ValueError(f"Unknown filter '{key}'; indexed fields are {', '.join(INDEXED_FIELDS)}.")
+        try:
+            value = float(raw)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Filter '{key}' must be numeric.") from exc
+        predicates.setdefault(field, [None, None])[side] = value
+    return {field: (b[0], b[1]) for field, b in predicates.items()}
+
+
+def get_feeder_index() -> FeederIndex:
+    """Return the index for the active feeder config, rebuilding it if the config changed."""
+    global _INDEX_CACHE
+    version = get_config_version()
+    index = _INDEX_CACHE
+    if index is not None and index.version == version:
+        return index
+    with _INDEX_LOCK:
+        if _INDEX_CACHE is None or _INDEX_CACHE.version != version:
+            _INDEX_CACHE = FeederIndex(get_all_feeders(), version=version)
+        return _INDEX_CACHE
+
+
+def _apply_delta(
+    changed: Mapping[str, Mapping[str, Any]], removed: Iterable[str], old_version: str, new_version: str
+) -> None:
+    global _INDEX_CACHE
+    with _INDEX_LOCK:
+        index = _INDEX_CACHE
+        if index is not None and index.version == old_version:
+            _INDEX_CACHE = index.updated(changed, removed, version=new_version)
+
+
+def query_feeders(predicates: Mapping[str, Bounds], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Run a compound range query against the active index and return matching feeders."""
+    index = get_feeder_index()
+    feeders = get_all_feeders()
+    out: List[Dict[str, Any]] = []
+    for fid in index.query(predicates, limit=limit):
+        row = {"feeder": fid, **feeders.get(fid, {})}
+        row["loading_pct"] = round(index.records[fid]["loading_pct"], 1)
+        out.append(row)
+    return out
+
+
+register_delta_hook(_apply_delta)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+import time
+
+from gridgent.core.deadline import expired, mark_partial
+from gridgent.tools.grid_stub import (
+    get_all_feeders,
+    get_feeder_summary,
+    LOADING_LIMIT_PCT,
+    LOADING_WARN_PCT,
+    VOLTAGE_MIN_PU,
+    VOLTAGE_MAX_PU,
+)
+from gridgent.tools.solvers import SolverBackend, evaluate_batch, get_backend
+
+# Thresholds from the screening model, in the order they are reported.
+THRESHOLDS = ("thermal_warning", "overload", "low_voltage", "over_voltage")
+THRESHOLD_LABELS = {
+    "thermal_warning": f"loading above {LOADING_WARN_PCT:g}%",
+    "overload": f"loading above {LOADING_LIMIT_PCT:g}%",
+    "low_voltage": f"voltage below {VOLTAGE_MIN_PU:g} pu",
+    "over_voltage": f"voltage above {VOLTAGE_MAX_PU:g} pu",
+}
+
+DEFAULT_HORIZON_YEARS = 20
+MAX_HORIZON_YEARS = 50
+# Feeders projected per batched solver call; bounds the scenario list for large fleets.
+_CHUNK_FEEDERS = 2000
+
+
+@dataclass
+class GrowthAssumptions:
+    load_growth_pct: float = 0.0  # compound, per year
+    pv_growth_pct: float = 0.0  # compound, per year, on installed PV
+    ev_pct_per_year: float = 0.0  # linear EV load, % of today's peak added per year
+    ev_mw_per_year: float = 0.0  # linear EV load, MW per year
+    horizon_years: int = DEFAULT_HORIZON_YEARS
+
+    def __post_init__(self) -> None:
+        if not 1 <= int(self.horizon_years) <= MAX_HORIZON_YEARS:
+            raise ValueError(f"Forecast horizon must be between 1 and {MAX_HORIZON_YEARS} years.")
+        self.horizon_years = int(self.horizon_years)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "load_growth_pct": self.load_growth_pct,
+            "pv_growth_pct": self.pv_growth_pct,
+            "ev_pct_per_year": self.ev_pct_per_year,
+            "ev_mw_per_year": self.ev_mw_per_year,
+            "horizon_years": self.horizon_years,
+        }
+
+    def deltas(self, peak_mw: float, pv_mw: float, year: int) -> Tuple[float, float]:
+        """(added_pv_mw, added_load_mw) relative to today after ``year`` years."""
+        load = peak_mw * ((1.0 + self.load_growth_pct / 100.0) ** year - 1.0)
+        load += year * (self.ev_mw_per_year + peak_mw * self.ev_pct_per_year / 100.0)
+        pv = pv_mw * ((1.0 + self.pv_growth_pct / 100.0) ** year - 1.0)
+        return pv, load
+
+
+def _crossed(loading: float, vmin: float, vmax: float) -> Dict[str, bool]:
+    return {
+        "thermal_warning": loading > LOADING_WARN_PCT,
+        "overload": loading > LOADING_LIMIT_PCT,
+        "low_voltage": vmin < VOLTAGE_MIN_PU,
+        "over_voltage": vmax > VOLTAGE_MAX_PU,
+    }
+
+
+def project_feeders(
+    assumptions: GrowthAssumptions,
+    feeders: Optional[Mapping[str, Mapping[str, Any]]] = None,
+    trajectory: bool = False,
+    backend: Optional[SolverBackend] = None,
+    start_year: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Project every feeder over the horizon and find the first year each threshold is crossed.
+
+    All (feeder, year) pairs of a chunk go to the solver in one ``evaluate_batch`` call,
+    so a vectorized backend evaluates the whole horizon at once. Year 0 is today. When the
+    request's deadline expires, chunks not yet started are skipped (fewer entries returned).
+    """
+    feeders = get_all_feeders() if feeders is None else feeders
+    backend = backend or get_backend(query_type="load_forecast")
+    start_year = start_year or time.localtime().tm_year
+    years = range(assumptions.horizon_years + 1)
+    items = list(feeders.items())
+
+    out: List[Dict[str, Any]] = []
+    for chunk_start in range(0, len(items), _CHUNK_FEEDERS):
+        if chunk_start and expired():
+            mark_partial("load_forecast")
+            break
+        chunk = items[chunk_start:chunk_start + _CHUNK_FEEDERS]
+        scenarios = []
+        for _, meta in chunk:
+            peak = float(meta.get("peak_mw", 10.0))
+            pv = float(meta.get("pv_mw", 1.0))
+            for year in years:
+                added_pv, added_load = assumptions.deltas(peak, pv, year)
+                scenarios.append((meta, added_pv, added_load))
+        metrics = evaluate_batch(scenarios, backend=backend)
+
+        n_years = len(years)
+        for i, (fid, meta) in enumerate(chunk):
+            first: Dict[str, Optional[int]] = {name: None for name in THRESHOLDS}
+            rows = metrics[i * n_years:(i + 1) * n_years]
+            for year, (loading, vmin, vmax) in zip(years, rows):
+                for name, hit in _crossed(loading, vmin, vmax).items():
+                    if hit and first[name] is None:
+                        first[name] = start_year + year
+            loading, vmin, vmax = rows[-1]
+            entry: Dict[str, Any] = {
+                "feeder": str(fid).upper(),
+                "name": meta.get("name", str(fid)),
+                "first_year": first,
+                "final": {
+                    "year": start_year + assumptions.horizon_years,
+                    "peak_loading_pct": round(loading, 1),
+                    "min_voltage_pu": round(vmin, 3),
+                    "max_voltage_pu": round(vmax, 3),
+                },
+            }
+            if trajectory:
+                peak = float(meta.get("peak_mw", 10.0))
+                pv = float(meta.get("pv_mw", 1.0))
+                entry["trajectory"] = []
+                for year, (loading, vmin, vmax) in zip(years, rows):
+                    added_pv, added_load = assumptions.deltas(peak, pv, year)
+                    entry["trajectory"].append(
+                        {
+                            "year": start_year + year,
+                            "peak_mw": round(peak + added_load, 2),
+                            "pv_mw": round(pv + added_pv, 2),
+                            "peak_loading_pct": round(loading, 1),
+                            "min_voltage_pu": round(vmin, 3),
+                            "max_voltage_pu": round(vmax, 3),
+                        }
+                    )
+            out.append(entry)
+    return out
+
+
+def forecast(
+    assumptions: GrowthAssumptions,
+    feeder_ids: Sequence[str] = (),
+    top_k: int = 10,
+    start_year: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Forecast the named feeders (with yearly trajectories) or rank the whole fleet.
+
+    Fleet results are ordered by the year they first overload, soonest first; feeders that
+    stay within limits over the horizon come last.
+    """
+    start_year = start_year or time.localtime().tm_year
+    if feeder_ids:
+        feeders = {fid.upper(): get_feeder_summary(fid) for fid in feeder_ids}
+        results = project_feeders(assumptions, feeders, trajectory=True, start_year=start_year)
+    else:
+        feeders = get_all_feeders()
+        results = project_feeders(assumptions, feeders, start_year=start_year)
+        never = start_year + assumptions.horizon_years + 1
+        results.sort(
+            key=lambda r: (
+                r["first_year"]["overload"] or never,
+                r["first_year"]["thermal_warning"] or never,
+                -r["final"]["peak_loading_pct"],
+            )
+        )
+    return {
+        "assumptions": assumptions.to_dict(),
+        "start_year": start_year,
+        "thresholds": THRESHOLD_LABELS,
+        "num_feeders": len(results),
+        "num_skipped": len(feeders) - len(results),
+        "partial": len(results) < len(feeders),
+        "num_overloading": sum(1 for r in results if r["first_year"]["overload"] is not None),
+        "feeders": results if feeder_ids else results[:top_k],
+    }
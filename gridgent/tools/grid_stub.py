@@ -1,14 +1,37 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, Iterable, List, Mapping, Set, Tuple
 from pathlib import Path
+import hashlib
 import json
 import csv
 import io
+import os
+import threading
 
 _CONFIG_CACHE: Dict[str, Any] | None = None
+_CONFIG_VERSION: str | None = None
+_CONFIG_GENERATION = 0
+_RELOAD_HOOKS: List[Callable[[], None]] = []
+# hook(changed_feeders, removed_ids, old_version, new_version)
+_DELTA_HOOKS: List[Callable[[Dict[str, Dict[str, Any]], Set[str], str, str], None]] = []
+_DELTA_LOCK = threading.Lock()
+_LOG_ENTRIES = 0
+_DISK_STAMP: Tuple[Any, ...] | None = None
 _BASE_DIR = Path(__file__).resolve().parents[2]
 
+# Delta log entries replayed on load; the log is folded into the uploaded model this often.
+LOG_COMPACT_EVERY = 256
+
+# Screening thresholds used by the simplified model.
+LOADING_LIMIT_PCT = 100.0
+LOADING_WARN_PCT = 95.0
+VOLTAGE_MIN_PU = 0.95
+VOLTAGE_MAX_PU = 1.05
+
+# Optional grouping attributes of a feeder, narrowest first.
+HIERARCHY_LEVELS: Tuple[str, ...] = ("substation", "region")
+
 
 def _default_feeder_config() -> Dict[str, Any]:
     return {
@@ -38,42 +61,183 @@ def _default_feeder_config() -> Dict[str, Any]:
     }
 
 
+def _uploaded_path() -> Path:
+    return _BASE_DIR / "config" / "uploaded_feedermodel.json"
+
+
+def _log_path() -> Path:
+    return _BASE_DIR / "config" / "uploaded_feedermodel.log.jsonl"
+
+
+def _disk_stamp() -> Tuple[Any, ...]:
+    """Cheap signature of the on-disk model (files' size and mtime)."""
+    stamp = []
+    for path in (_uploaded_path(), _BASE_DIR / "config" / "feeders.json", _log_path()):
+        try:
+            st = path.stat()
+            stamp.append((st.st_size, st.st_mtime_ns))
+        except OSError:
+            stamp.append(None)
+    return tuple(stamp)
+
+
+def _shared_cache() -> Any:
+    """The cross-process cache when one is configured (imported lazily; core imports tools)."""
+    try:
+        from gridgent.core.cache import shared_cache
+
+        return shared_cache()
+    except ValueError:
+        return None
+
+
+def _publish_shared_config(cfg: Dict[str, Any], version: str | None) -> None:
+    """Share the parsed model (and its version) with workers that see the same files."""
+    cache = _shared_cache()
+    if cache is not None and _DISK_STAMP is not None:
+        cache.set("config", "disk", (str(_BASE_DIR), _DISK_STAMP), (cfg, version, _LOG_ENTRIES))
+
+
+def _read_feeder_config() -> Tuple[Dict[str, Any], str | None]:
+    """Parse the model files, or take them from the shared cache; returns (config, version).
+
+    The version is only known when another worker already computed it for these files.
+    """
+    global _DISK_STAMP, _LOG_ENTRIES
+    _DISK_STAMP = _disk_stamp()
+    cache = _shared_cache()
+    if cache is not None:
+        hit = cache.get("config", "disk", (str(_BASE_DIR), _DISK_STAMP))
+        if hit is not None:
+            data, version, _LOG_ENTRIES = hit
+            return data, version
+    return _parse_feeder_config(), None
+
+
+def _parse_feeder_config() -> Dict[str, Any]:
+    base_path = _BASE_DIR / "config" / "feeders.json"
+
+    for path in (_uploaded_path(), base_path):
+        if path.exists():
+            try:
+                with path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if isinstance(data, dict) and "feeders" in data:
+                    return _replay_feeder_log(data)
+            except Exception:
+                pass
+
+    return _replay_feeder_log(_default_feeder_config())
+
+
+def _replay_feeder_log(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply delta-log entries written since the last full upload or compaction."""
+    global _LOG_ENTRIES
+    entries = 0
+    path = _log_path()
+    if path.exists():
+        feeders = data.setdefault("feeders", {})
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A torn final write; everything before it was applied.
+                    break
+                feeders.update(entry.get("upsert", {}))
+                for fid in entry.get("remove", []):
+                    feeders.pop(fid, None)
+                entries += 1
+    _LOG_ENTRIES = entries
+    return data
+
+
 def _load_feeder_config() -> Dict[str, Any]:
     """Load feeder configuration with upload override."""
-    global _CONFIG_CACHE
-    if _CONFIG_CACHE is not None:
-        return _CONFIG_CACHE
+    global _CONFIG_CACHE, _CONFIG_VERSION
+    cached = _CONFIG_CACHE
+    if cached is not None:
+        return cached
 
-    uploaded_path = _BASE_DIR / "config" / "uploaded_feedermodel.json"
-    base_path = _BASE_DIR / "config" / "feeders.json"
+    # Background refreshes may race a reload; only publish if no reload happened meanwhile.
+    generation = _CONFIG_GENERATION
+    data, version = _read_feeder_config()
+    if generation == _CONFIG_GENERATION:
+        _CONFIG_CACHE = data
+        if version is not None:
+            _CONFIG_VERSION = version
+    return data
 
-    if uploaded_path.exists():
-        try:
-            with uploaded_path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, dict) and "feeders" in data:
-                _CONFIG_CACHE = data
-                return _CONFIG_CACHE
-        except Exception:
-            pass
-
-    if base_path.exists():
-        try:
-            with base_path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, dict) and "feeders" in data:
-                _CONFIG_CACHE = data
-                return _CONFIG_CACHE
-        except Exception:
-            pass
 
-    _CONFIG_CACHE = _default_feeder_config()
-    return _CONFIG_CACHE
+def register_reload_hook(hook: Callable[[], None]) -> None:
+    """Call ``hook`` after every config reload (including uploads)."""
+    if hook not in _RELOAD_HOOKS:
+        _RELOAD_HOOKS.append(hook)
 
 
 def reload_feeder_config() -> None:
-    global _CONFIG_CACHE
+    global _CONFIG_CACHE, _CONFIG_VERSION, _CONFIG_GENERATION
+    _CONFIG_GENERATION += 1
     _CONFIG_CACHE = None
+    _CONFIG_VERSION = None
+    for hook in list(_RELOAD_HOOKS):
+        hook()
+
+
+def register_delta_hook(hook: Callable[[Dict[str, Dict[str, Any]], Set[str], str, str], None]) -> None:
+    """Call ``hook(changed, removed, old_version, new_version)`` after every feeder delta.
+
+    Derived data built for ``old_version`` can patch just the affected feeders and move
+    to ``new_version``; anything else is rebuilt lazily because the version changed.
+    """
+    if hook not in _DELTA_HOOKS:
+        _DELTA_HOOKS.append(hook)
+
+
+def reload_if_changed_on_disk() -> bool:
+    """Reload only if another process changed the model files since this one last saw them."""
+    if _CONFIG_CACHE is not None and _disk_stamp() == _DISK_STAMP:
+        return False
+    reload_feeder_config()
+    return True
+
+
+def get_config_version() -> str:
+    """Short content fingerprint of the active feeder configuration.
+
+    Derived caches (indexes, precomputed tables, result caches) key on this value so
+    they are rebuilt whenever the model changes.
+    """
+    global _CONFIG_VERSION
+    version = _CONFIG_VERSION
+    if version is not None:
+        return version
+    generation = _CONFIG_GENERATION
+    cfg = _load_feeder_config()
+    payload = json.dumps(cfg, sort_keys=True, separators=(",", ":"))
+    version = hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+    if generation == _CONFIG_GENERATION:
+        _CONFIG_VERSION = version
+        _publish_shared_config(cfg, version)
+    return version
+
+
+def get_feeders_version(feeder_ids: Iterable[str]) -> str:
+    """Fingerprint of just these feeders' records and the config's top-level settings.
+
+    Answers about a few named feeders key on this instead of :func:`get_config_version`,
+    so a delta to some other feeder leaves them valid. With no ids, or an id that is not
+    in the model, this is the full config version.
+    """
+    cfg = _load_feeder_config()
+    feeders = cfg.get("feeders", {})
+    ids = sorted({str(fid).upper().strip() for fid in feeder_ids})
+    if not ids or any(fid not in feeders for fid in ids):
+        return get_config_version()
+    scoped = {k: v for k, v in cfg.items() if k != "feeders"}
+    scoped["feeders"] = {fid: feeders[fid] for fid in ids}
+    payload = json.dumps(scoped, sort_keys=True, separators=(",", ":"))
+    return "f-" + hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
 
 
 def get_feeder_summary(feeder: str) -> Dict[str, Any]:
@@ -91,6 +255,11 @@ def get_feeder_summary(feeder: str) -> Dict[str, Any]:
     }
 
 
+def get_config_setting(key: str, default: Any = None) -> Any:
+    """Return a top-level setting (e.g. ``solver``) from the active feeder config."""
+    return _load_feeder_config().get(key, default)
+
+
 def get_all_feeders() -> Dict[str, Dict[str, Any]]:
     cfg = _load_feeder_config()
     feeders = cfg.get("feeders", {})
@@ -120,36 +289,43 @@ class PowerFlowResult:
         }
 
 
-def run_power_flow_scenario(
-    feeder: str,
+def evaluate_feeder_metrics(
+    base_peak_mw: float,
+    base_pv_mw: float,
     added_pv_mw: float = 0.0,
     added_load_mw: float = 0.0,
-) -> PowerFlowResult:
-    meta = get_feeder_summary(feeder)
-    base_peak = float(meta.get("peak_mw", 10.0))
-    base_pv = float(meta.get("pv_mw", 1.0))
-
-    new_peak = base_peak + added_load_mw - 0.5 * added_pv_mw
+) -> Tuple[float, float, float]:
+    """Return (peak_loading_pct, min_voltage_pu, max_voltage_pu) for one feeder scenario."""
+    new_peak = base_peak_mw + added_load_mw - 0.5 * added_pv_mw
     if new_peak < 0:
         new_peak = 0.0
 
-    rating_mva = base_peak * 1.2 if base_peak > 0 else 12.0
+    rating_mva = base_peak_mw * 1.2 if base_peak_mw > 0 else 12.0
     peak_loading_pct = 100.0 * (new_peak / rating_mva) if rating_mva > 0 else 0.0
 
-    min_voltage = 0.97 - 0.01 * (added_load_mw / max(base_peak, 1.0))
-    max_voltage = 1.03 + 0.01 * (added_pv_mw / max(base_pv, 0.5))
+    min_voltage = 0.97 - 0.01 * (added_load_mw / max(base_peak_mw, 1.0))
+    max_voltage = 1.03 + 0.01 * (added_pv_mw / max(base_pv_mw, 0.5))
 
     min_voltage = max(min_voltage, 0.9)
     max_voltage = min(max_voltage, 1.10)
+    return peak_loading_pct, min_voltage, max_voltage
+
 
+def build_power_flow_result(
+    feeder: str,
+    peak_loading_pct: float,
+    min_voltage: float,
+    max_voltage: float,
+) -> PowerFlowResult:
+    """Apply the screening thresholds to solver outputs and package them as a result."""
     overload_elements: List[str] = []
-    if peak_loading_pct > 100.0:
+    if peak_loading_pct > LOADING_LIMIT_PCT:
         overload_elements.append("Main transformer overloaded (demo flag)")
-    if peak_loading_pct > 95.0:
+    if peak_loading_pct > LOADING_WARN_PCT:
         overload_elements.append("Line segments near thermal limit (demo flag)")
-    if min_voltage < 0.95:
+    if min_voltage < VOLTAGE_MIN_PU:
         overload_elements.append("Low voltage at end-of-line customers (demo flag)")
-    if max_voltage > 1.05:
+    if max_voltage > VOLTAGE_MAX_PU:
         overload_elements.append("Risk of over-voltage near PV clusters (demo flag)")
 
     if overload_elements:
@@ -167,6 +343,42 @@ def run_power_flow_scenario(
     )
 
 
+def run_power_flow_scenario(
+    feeder: str,
+    added_pv_mw: float = 0.0,
+    added_load_mw: float = 0.0,
+) -> PowerFlowResult:
+    meta = get_feeder_summary(feeder)
+    base_peak = float(meta.get("peak_mw", 10.0))
+    base_pv = float(meta.get("pv_mw", 1.0))
+
+    peak_loading_pct, min_voltage, max_voltage = evaluate_feeder_metrics(
+        base_peak, base_pv, added_pv_mw=added_pv_mw, added_load_mw=added_load_mw
+    )
+    return build_power_flow_result(feeder, peak_loading_pct, min_voltage, max_voltage)
+
+
+def _hierarchy_fields(v: Mapping[str, Any]) -> Dict[str, str]:
+    """The feeder's substation/region, if given; blank or null values leave it unassigned."""
+    out: Dict[str, str] = {}
+    for level in HIERARCHY_LEVELS:
+        value = v.get(level)
+        if value is not None and str(value).strip():
+            out[level] = str(value).strip()
+    return out
+
+
+def _normalize_feeder(fid: str, v: Mapping[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": v.get("name", fid),
+        "base_kv": float(v.get("base_kv", 13.8)),
+        "num_customers": int(v.get("num_customers", 1000)),
+        "peak_mw": float(v.get("peak_mw", 10.0)),
+        "pv_mw": float(v.get("pv_mw", 1.0)),
+        **_hierarchy_fields(v),
+    }
+
+
 def parse_uploaded_grid(raw: str, fmt: str) -> Dict[str, Any]:
     fmt = (fmt or "").lower().strip()
     if fmt not in {"json", "csv"}:
@@ -194,6 +406,7 @@ def parse_uploaded_grid(raw: str, fmt: str) -> Dict[str, Any]:
                     "num_customers": int(row.get("num_customers", 1000)),
                     "peak_mw": float(row.get("peak_mw", 10.0)),
                     "pv_mw": float(row.get("pv_mw", 1.0)),
+                    **_hierarchy_fields(row),
                 }
         else:
             raise ValueError("JSON must be an object with 'feeders' or a list of feeders.")
@@ -203,13 +416,7 @@ def parse_uploaded_grid(raw: str, fmt: str) -> Dict[str, Any]:
             fid = str(k).upper()
             if not isinstance(v, dict):
                 raise ValueError("Each feeder entry must be an object.")
-            feeders_out[fid] = {
-                "name": v.get("name", fid),
-                "base_kv": float(v.get("base_kv", 13.8)),
-                "num_customers": int(v.get("num_customers", 1000)),
-                "peak_mw": float(v.get("peak_mw", 10.0)),
-                "pv_mw": float(v.get("pv_mw", 1.0)),
-            }
+            feeders_out[fid] = _normalize_feeder(fid, v)
         if not feeders_out:
             raise ValueError("No feeders found in uploaded JSON.")
         return {"feeders": feeders_out}
@@ -236,6 +443,8 @@ def parse_uploaded_grid(raw: str, fmt: str) -> Dict[str, Any]:
             "num_customers": int(row.get("num_customers") or 1000),
             "peak_mw": float(row.get("peak_mw") or 10.0),
             "pv_mw": float(row.get("pv_mw") or 1.0),
+            # Optional columns.
+            **_hierarchy_fields(row),
         }
 
     if not feeders_out:
@@ -246,6 +455,114 @@ def parse_uploaded_grid(raw: str, fmt: str) -> Dict[str, Any]:
 def save_uploaded_grid(config: Dict[str, Any]) -> None:
     if not isinstance(config, dict) or "feeders" not in config:
         raise ValueError("Uploaded config must be a dict with 'feeders'.")
-    path = _BASE_DIR / "config" / "uploaded_feedermodel.json"
-    path.write_text(json.dumps(config, indent=2), encoding="utf-8")
-    reload_feeder_config()
+    global _LOG_ENTRIES
+    with _DELTA_LOCK:
+        path = _uploaded_path()
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(config, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+        # A full upload supersedes every pending delta, but the log only goes once the new
+        # model is on disk: a failed write leaves the previous model and its log intact.
+        _log_path().unlink(missing_ok=True)
+        _LOG_ENTRIES = 0
+        reload_feeder_config()
+
+
+def apply_feeder_delta(
+    upsert: Mapping[str, Mapping[str, Any]] | None = None,
+    remove: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """Add, update or remove individual feeders without replacing the whole model.
+
+    ``upsert`` maps feeder ids to (possibly partial) fields merged over the current
+    record. The change is appended to the delta log before it is published in memory,
+    and registered delta hooks patch derived data for the affected feeders only.
+    """
+    global _CONFIG_CACHE, _CONFIG_VERSION, _CONFIG_GENERATION, _LOG_ENTRIES, _DISK_STAMP
+    upsert = upsert or {}
+    if not isinstance(upsert, Mapping):
+        raise ValueError("'upsert' must be an object keyed by feeder id.")
+    if not isinstance(remove, (list, tuple, set, frozenset)) or not all(isinstance(fid, str) for fid in remove):
+        raise ValueError("'remove' must be a list of feeder ids.")
+    removed = {str(fid).upper().strip() for fid in remove}
+
+    with _DELTA_LOCK:
+        old_version = get_config_version()
+        cfg = _load_feeder_config()
+        current = {str(k).upper(): v for k, v in cfg.get("feeders", {}).items()}
+
+        changed: Dict[str, Dict[str, Any]] = {}
+        for k, fields in upsert.items():
+            fid = str(k).upper().strip()
+            if not fid:
+                raise ValueError("Feeder ids must be non-empty.")
+            if not isinstance(fields, Mapping):
+                raise ValueError(f"Feeder '{fid}' update must be an object.")
+            if fid in removed:
+                raise ValueError(f"Feeder '{fid}' cannot be both updated and removed.")
+            try:
+                changed[fid] = _normalize_feeder(fid, {**current.get(fid, {}), **fields})
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"Invalid fields for feeder '{fid}': {exc}") from exc
+        removed &= set(current)
+        if not changed and not removed:
+            return {"changed": [], "removed": [], "config_version": old_version, "log_entries": _LOG_ENTRIES}
+
+        entry = {"upsert": changed, "remove": sorted(removed)}
+        line = json.dumps(entry, sort_keys=True, separators=(",", ":"))
+        path = _log_path()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        _DISK_STAMP = _disk_stamp()
+
+        # Copy-on-write so readers iterating the previous mapping are unaffected. The
+        # version is chained from the previous one instead of rehashing the full model.
+        feeders = dict(current)
+        feeders.update(changed)
+        for fid in removed:
+            feeders.pop(fid, None)
+        new_version = hashlib.sha1(f"{old_version}:{line}".encode("utf-8")).hexdigest()[:12]
+        _CONFIG_GENERATION += 1
+        _CONFIG_CACHE = {**cfg, "feeders": feeders}
+        _CONFIG_VERSION = new_version
+        _LOG_ENTRIES += 1
+        # Other workers reloading these files then agree on the chained version.
+        _publish_shared_config(_CONFIG_CACHE, new_version)
+
+        for hook in list(_DELTA_HOOKS):
+            hook(changed, removed, old_version, new_version)
+
+        if _LOG_ENTRIES >= LOG_COMPACT_EVERY:
+            _compact_feeder_log()
+
+        return {
+            "changed": sorted(changed),
+            "removed": sorted(removed),
+            "config_version": new_version,
+            "log_entries": _LOG_ENTRIES,
+        }
+
+
+def _compact_feeder_log() -> None:
+    """Fold the in-memory model into the uploaded model file and truncate the delta log.
+
+    Replaying a log over an already-compacted model is harmless (entries carry full
+    records), so a crash between the two steps loses nothing. Caller holds ``_DELTA_LOCK``.
+    """
+    global _LOG_ENTRIES, _DISK_STAMP
+    path = _uploaded_path()
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(_load_feeder_config(), indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    _log_path().unlink(missing_ok=True)
+    _LOG_ENTRIES = 0
+    _DISK_STAMP = _disk_stamp()
+    _publish_shared_config(_load_feeder_config(), _CONFIG_VERSION)
+
+
+def compact_feeder_log() -> None:
+    with _DELTA_LOCK:
+        _compact_feeder_log()
@@ -0,0 +1,294 @@
+from __future__ import annotations
+from array import array
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Sequence, Tuple
+import threading
+import time
+
+from gridgent.tools.grid_stub import (
+    get_all_feeders,
+    get_config_version,
+    evaluate_feeder_metrics,
+    register_delta_hook,
+    register_reload_hook,
+    LOADING_LIMIT_PCT,
+    VOLTAGE_MIN_PU,
+    VOLTAGE_MAX_PU,
+)
+
+# Standard study increments (MW) evaluated for every feeder.
+PV_STEPS_MW: Tuple[float, ...] = tuple(0.5 * i for i in range(41))
+LOAD_STEPS_MW: Tuple[float, ...] = tuple(float(i) for i in range(21))
+
+_LIMIT_NAMES = ("none within study range", "voltage", "thermal loading")
+
+_TABLE: "HostingCapacityTable | None" = None
+_REFRESH_EVENT = threading.Event()
+_WORKER_LOCK = threading.Lock()
+_WORKER: Optional[threading.Thread] = None
+
+
+def _interp(steps: Sequence[float], values: Sequence[float], x: float) -> float:
+    """Piecewise-linear interpolation, extrapolating from the outer segments."""
+    n = len(steps)
+    if n == 1:
+        return values[0]
+    if x <= steps[0]:
+        i = 0
+    elif x >= steps[-1]:
+        i = n - 2
+    else:
+        # Steps are uniform, so the segment can be found arithmetically.
+        i = min(int((x - steps[0]) / (steps[1] - steps[0])), n - 2)
+    x0, x1 = steps[i], steps[i + 1]
+    y0, y1 = values[i], values[i + 1]
+    return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+
+def _first_crossing(steps: Sequence[float], series: Sequence[Tuple[float, float]]) -> Tuple[float, int]:
+    """Return (capacity_mw, limiting_code) for per-step (voltage_excess, loading_excess) values.
+
+    Excess values are positive once a limit is violated; the crossing point is linearly
+    interpolated between the last compliant and the first violating step.
+    """
+    prev_x, prev = steps[0], series[0]
+    if prev[0] > 0 or prev[1] > 0:
+        return 0.0, 1 if prev[0] > 0 else 2
+    for x, cur in zip(steps[1:], series[1:]):
+        for code, (before, after) in enumerate(zip(prev, cur), start=1):
+            if after > 0:
+                frac = -before / (after - before) if after != before else 1.0
+                return prev_x + frac * (x - prev_x), code
+        prev_x, prev = x, cur
+    return steps[-1], 0
+
+
+def _study_rows(meta: Mapping[str, Any]) -> Tuple[List[Tuple[float, float, float]], List[Tuple[float, float, float]]]:
+    """Metrics at every standard PV step and every standard load step for one feeder."""
+    peak = float(meta.get("peak_mw", 10.0))
+    pv = float(meta.get("pv_mw", 1.0))
+    pv_rows = [evaluate_feeder_metrics(peak, pv, added_pv_mw=step) for step in PV_STEPS_MW]
+    load_rows = [evaluate_feeder_metrics(peak, pv, added_load_mw=step) for step in LOAD_STEPS_MW]
+    return pv_rows, load_rows
+
+
+def hosting_capacities(meta: Mapping[str, Any]) -> Tuple[float, float]:
+    """``(pv_capacity_mw, load_capacity_mw)`` for one feeder, as the hosting table computes them."""
+    pv_rows, load_rows = _study_rows(meta)
+    pv_capacity, _ = _first_crossing(
+        PV_STEPS_MW, [(vmax - VOLTAGE_MAX_PU, loading - LOADING_LIMIT_PCT) for loading, _, vmax in pv_rows]
+    )
+    load_capacity, _ = _first_crossing(
+        LOAD_STEPS_MW, [(VOLTAGE_MIN_PU - vmin, loading - LOADING_LIMIT_PCT) for loading, vmin, _ in load_rows]
+    )
+    return pv_capacity, load_capacity
+
+
+class HostingCapacityTable:
+    """Compact per-feeder table of loading/voltage results on the standard increments.
+
+    Values are stored in flat ``array('d')`` buffers (feeder-major) rather than nested
+    dicts so a table for tens of thousands of feeders stays small.
+    """
+
+    _BUFFERS = (
+        "pv_loading",
+        "pv_vmax",
+        "load_loading",
+        "load_vmin",
+        "pv_capacity",
+        "pv_limit",
+        "load_capacity",
+        "load_limit",
+    )
+
+    def __init__(self, version: str, feeder_ids: List[str]) -> None:
+        self.version = version
+        self.built_at = time.time()
+        self.pv_steps = PV_STEPS_MW
+        self.load_steps = LOAD_STEPS_MW
+        self._pos = {fid: i for i, fid in enumerate(feeder_ids)}
+        self.pv_loading = array("d")
+        self.pv_vmax = array("d")
+        self.load_loading = array("d")
+        self.load_vmin = array("d")
+        self.pv_capacity = array("d")
+        self.pv_limit = array("b")
+        self.load_capacity = array("d")
+        self.load_limit = array("b")
+
+    def __len__(self) -> int:
+        return len(self._pos)
+
+    def __contains__(self, feeder: str) -> bool:
+        return feeder in self._pos
+
+    @classmethod
+    def build(cls, feeders: Mapping[str, Mapping[str, Any]], version: str = "") -> "HostingCapacityTable":
+        table = cls(version, [str(fid).upper() for fid in feeders])
+        for meta in feeders.values():
+            table._append_rows(meta)
+        return table
+
+    def _append_rows(self, meta: Mapping[str, Any]) -> None:
+        pv_rows, load_rows = _study_rows(meta)
+
+        pv_excess = []
+        for loading, _, vmax in pv_rows:
+            self.pv_loading.append(loading)
+            self.pv_vmax.append(vmax)
+            pv_excess.append((vmax - VOLTAGE_MAX_PU, loading - LOADING_LIMIT_PCT))
+        capacity, code = _first_crossing(PV_STEPS_MW, pv_excess)
+        self.pv_capacity.append(capacity)
+        self.pv_limit.append(code)
+
+        load_excess = []
+        for loading, vmin, _ in load_rows:
+            self.load_loading.append(loading)
+            self.load_vmin.append(vmin)
+            load_excess.append((VOLTAGE_MIN_PU - vmin, loading - LOADING_LIMIT_PCT))
+        capacity, code = _first_crossing(LOAD_STEPS_MW, load_excess)
+        self.load_capacity.append(capacity)
+        self.load_limit.append(code)
+
+    def capacities(self, feeder: str) -> Tuple[float, float]:
+        """``(pv_capacity_mw, load_capacity_mw)`` of one feeder in the table."""
+        i = self._pos[feeder]
+        return self.pv_capacity[i], self.load_capacity[i]
+
+    def updated(
+        self,
+        changed: Mapping[str, Mapping[str, Any]],
+        removed: Iterable[str] = (),
+        version: str = "",
+    ) -> "HostingCapacityTable":
+        """Return a copy with rows recomputed for ``changed`` feeders and ``removed`` ones dropped.
+
+        Updated feeders get fresh rows appended; their old rows (and those of removed
+        feeders) stay in the buffers unreferenced until the next full rebuild.
+        """
+        table = HostingCapacityTable(version, [])
+        table.built_at = self.built_at
+        table._pos = dict(self._pos)
+        for name in self._BUFFERS:
+            setattr(table, name, array(getattr(self, name).typecode, getattr(self, name)))
+        for fid in removed:
+            table._pos.pop(fid, None)
+        for fid, meta in changed.items():
+            table._pos[fid] = len(table.pv_capacity)
+            table._append_rows(meta)
+        return table
+
+    def lookup(self, feeder: str, added_pv_mw: float = 0.0, added_load_mw: float = 0.0) -> Dict[str, Any]:
+        """Interpolate margins for one scenario and report the feeder's hosting capacities.
+
+        PV and load effects are superposed around the base case, which is exact for the
+        linear demo model and a first-order estimate otherwise.
+        """
+        i = self._pos[feeder]
+        npv, nload = len(self.pv_steps), len(self.load_steps)
+        pv_loading = self.pv_loading[i * npv:(i + 1) * npv]
+        pv_vmax = self.pv_vmax[i * npv:(i + 1) * npv]
+        load_loading = self.load_loading[i * nload:(i + 1) * nload]
+        load_vmin = self.load_vmin[i * nload:(i + 1) * nload]
+
+        base_loading = pv_loading[0]
+        loading = (
+            _interp(self.pv_steps, pv_loading, added_pv_mw)
+            + _interp(self.load_steps, load_loading, added_load_mw)
+            - base_loading
+        )
+        vmax = _interp(self.pv_steps, pv_vmax, added_pv_mw)
+        vmin = _interp(self.load_steps, load_vmin, added_load_mw)
+        pv_capacity = self.pv_capacity[i]
+        load_capacity = self.load_capacity[i]
+
+        return {
+            "feeder": feeder,
+            "table_version": self.version,
+            "table_built_at": self.built_at,
+            "pv_hosting_capacity_mw": round(pv_capacity, 2),
+            "pv_limiting_factor": _LIMIT_NAMES[self.pv_limit[i]],
+            "load_capacity_mw": round(load_capacity, 2),
+            "load_limiting_factor": _LIMIT_NAMES[self.load_limit[i]],
+            "remaining_pv_headroom_mw": round(max(0.0, pv_capacity - added_pv_mw), 2),
+            "peak_loading_pct": round(loading, 1),
+            "loading_margin_pct": round(LOADING_LIMIT_PCT - loading, 1),
+            "min_voltage_pu": round(vmin, 3),
+            "max_voltage_pu": round(vmax, 3),
+            "extrapolated": added_pv_mw > self.pv_steps[-1] or added_load_mw > self.load_steps[-1],
+        }
+
+
+def refresh_hosting_table() -> HostingCapacityTable:
+    """Rebuild the table for the active config synchronously and publish it."""
+    global _TABLE
+    version = get_config_version()
+    table = HostingCapacityTable.build(get_all_feeders(), version=version)
+    # A reload or delta during the build makes this table stale; leave the newer one.
+    if get_config_version() == version:
+        _TABLE = table
+    return table
+
+
+def _refresh_loop() -> None:
+    while True:
+        _REFRESH_EVENT.wait()
+        _REFRESH_EVENT.clear()
+        try:
+            refresh_hosting_table()
+        except Exception:
+            # A broken upload must not kill the worker; the next reload retries.
+            pass
+
+
+def schedule_refresh() -> None:
+    """Ask the background worker to rebuild the table (non-blocking)."""
+    global _WORKER
+    with _WORKER_LOCK:
+        if _WORKER is None or not _WORKER.is_alive():
+            _WORKER = threading.Thread(target=_refresh_loop, name="gridgent-hosting-map", daemon=True)
+            _WORKER.start()
+    _REFRESH_EVENT.set()
+
+
+def get_hosting_table() -> Optional[HostingCapacityTable]:
+    """Return the precomputed table if it matches the active config, else schedule a rebuild."""
+    table = _TABLE
+    if table is not None and table.version == get_config_version():
+        return table
+    schedule_refresh()
+    return None
+
+
+def lookup_hosting_capacity(feeder: str, added_pv_mw: float = 0.0, added_load_mw: float = 0.0) -> Dict[str, Any]:
+    """Answer from the precomputed table, computing just this feeder when it is not ready yet."""
+    feeder = (feeder or "").upper().strip()
+    table = get_hosting_table()
+    if table is not None and feeder in table:
+        result = table.lookup(feeder, added_pv_mw, added_load_mw)
+        result["source"] = "precomputed"
+        return result
+
+    feeders = get_all_feeders()
+    meta = feeders.get(feeder, {})
+    single = HostingCapacityTable.build({feeder: meta}, version=get_config_version())
+    result = single.lookup(feeder, added_pv_mw, added_load_mw)
+    result["source"] = "on_demand"
+    result["table_version"] = None
+    return result
+
+
+def _apply_delta(
+    changed: Mapping[str, Mapping[str, Any]], removed: Iterable[str], old_version: str, new_version: str
+) -> None:
+    global _TABLE
+    table = _TABLE
+    if table is not None and table.version == old_version:
+        _TABLE = table.updated(changed, removed, version=new_version)
+        if len(_TABLE.pv_capacity) > 2 * len(_TABLE) + 64:
+            # Mostly superseded rows now; reclaim them with a background rebuild.
+            schedule_refresh()
+
+
+register_reload_hook(schedule_refresh)
+register_delta_hook(_apply_delta)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+import threading
+
+from gridgent.tools.grid_stub import (
+    HIERARCHY_LEVELS,
+    get_all_feeders,
+    get_config_version,
+    register_delta_hook,
+)
+from gridgent.tools.hosting_map import get_hosting_table, hosting_capacities
+
+# Summed per group, in this order. Headroom is the hosting capacity on the standard
+# study increments, so a feeder with no limit in range adds the top of the range.
+ROLLUP_FIELDS = ("feeders", "num_customers", "peak_mw", "pv_mw", "pv_headroom_mw", "load_headroom_mw")
+
+_ROLLUPS: "FeederRollups | None" = None
+_ROLLUPS_LOCK = threading.Lock()
+
+# (group key per hierarchy level or None, values in ROLLUP_FIELDS order)
+_Contribution = Tuple[Tuple[Optional[str], ...], Tuple[float, ...]]
+
+
+def _contribution(meta: Mapping[str, Any], capacities: Optional[Tuple[float, float]] = None) -> _Contribution:
+    pv_capacity, load_capacity = capacities if capacities is not None else hosting_capacities(meta)
+    keys = tuple(
+        str(meta[level]).strip().upper() if str(meta.get(level) or "").strip() else None for level in HIERARCHY_LEVELS
+    )
+    values = (
+        1.0,
+        float(meta.get("num_customers", 1000)),
+        float(meta.get("peak_mw", 10.0)),
+        float(meta.get("pv_mw", 1.0)),
+        pv_capacity,
+        load_capacity,
+    )
+    return keys, values
+
+
+def _check_level(level: str) -> None:
+    if level not in HIERARCHY_LEVELS:
+        raise ValueError(f"Unknown hierarchy level '{level}'; expected one of {', '.join(HIERARCHY_LEVELS)}.")
+
+
+class FeederRollups:
+    """Running totals of feeder attributes per substation and per region.
+
+    Every feeder's contribution is kept, so a delta subtracts the old contribution and
+    adds the new one: updates cost O(changed feeders) and a group lookup is a dict access.
+    Feeders without a substation (region) are counted as unassigned at that level.
+    """
+
+    def __init__(
+        self,
+        feeders: Mapping[str, Mapping[str, Any]],
+        version: str = "",
+        capacities: Optional[Mapping[str, Tuple[float, float]]] = None,
+    ) -> None:
+        self.version = version
+        self._feeders: Dict[str, _Contribution] = {}
+        self._totals: Dict[str, Dict[str, List[float]]] = {level: {} for level in HIERARCHY_LEVELS}
+        self._members: Dict[str, Dict[str, Set[str]]] = {level: {} for level in HIERARCHY_LEVELS}
+        self._unassigned = dict.fromkeys(HIERARCHY_LEVELS, 0)
+        capacities = capacities or {}
+        for fid, meta in feeders.items():
+            fid = str(fid).upper()
+            self._add(fid, _contribution(meta, capacities.get(fid)))
+
+    def __len__(self) -> int:
+        return len(self._feeders)
+
+    def _add(self, fid: str, contribution: _Contribution) -> None:
+        keys, values = contribution
+        self._feeders[fid] = contribution
+        for level, key in zip(HIERARCHY_LEVELS, keys):
+            if key is None:
+                self._unassigned[level] += 1
+                continue
+            totals = self._totals[level].setdefault(key, [0.0] * len(ROLLUP_FIELDS))
+            for i, value in enumerate(values):
+                totals[i] += value
+            self._members[level].setdefault(key, set()).add(fid)
+
+    def _remove(self, fid: str) -> None:
+        contribution = self._feeders.pop(fid, None)
+        if contribution is None:
+            return
+        keys, values = contribution
+        for level, key in zip(HIERARCHY_LEVELS, keys):
+            if key is None:
+                self._unassigned[level] -= 1
+                continue
+            members = self._members[level][key]
+            members.discard(fid)
+            if not members:
+                # Drop emptied groups outright rather than leave float residue behind.
+                del self._members[level][key]
+                del self._totals[level][key]
+                continue
+            totals = self._totals[level][key]
+            for i, value in enumerate(values):
+                totals[i] -= value
+
+    def updated(
+        self,
+        changed: Mapping[str, Mapping[str, Any]],
+        removed: Iterable[str] = (),
+        version: str = "",
+    ) -> "FeederRollups":
+        """Return a copy with ``changed`` feeders re-counted and ``removed`` ones dropped.
+
+        Only the groups those feeders leave or join are copied, so readers of this
+        instance keep seeing consistent totals.
+        """
+        incoming = {fid: _contribution(meta) for fid, meta in changed.items()}
+        rollups = FeederRollups.__new__(FeederRollups)
+        rollups.version = version
+        rollups._feeders = dict(self._feeders)
+        rollups._totals = {level: dict(groups) for level, groups in self._totals.items()}
+        rollups._members = {level: dict(groups) for level, groups in self._members.items()}
+        rollups._unassigned = dict(self._unassigned)
+
+        touched: Set[Tuple[str, str]] = set()
+        old = [self._feeders[fid][0] for fid in [*removed, *changed] if fid in self._feeders]
+        for keys in old + [keys for keys, _ in incoming.values()]:
+            touched.update((level, key) for level, key in zip(HIERARCHY_LEVELS, keys) if key is not None)
+        for level, key in touched:
+            if key in rollups._totals[level]:
+                rollups._totals[level][key] = list(rollups._totals[level][key])
+                rollups._members[level][key] = set(rollups._members[level][key])
+
+        for fid in [*removed, *changed]:
+            rollups._remove(fid)
+        for fid, contribution in incoming.items():
+            rollups._add(fid, contribution)
+        return rollups
+
+    def _row(self, level: str, key: str, members: bool) -> Dict[str, Any]:
+        totals = self._totals[level][key]
+        row: Dict[str, Any] = {"level": level, "id": key}
+        for field, value in zip(ROLLUP_FIELDS, totals):
+            row[field] = int(round(value)) if field in ("feeders", "num_customers") else round(value, 3)
+        if members:
+            row["feeder_ids"] = sorted(self._members[level][key])
+        return row
+
+    def get(self, level: str, key: str, members: bool = False) -> Optional[Dict[str, Any]]:
+        """Totals for one substation or region (ids are case-insensitive), or None."""
+        _check_level(level)
+        key = str(key).strip().upper()
+        if key not in self._totals[level]:
+            return None
+        return self._row(level, key, members)
+
+    def groups(self, level: str, members: bool = False) -> List[Dict[str, Any]]:
+        """Totals for every group at ``level``, ordered by id."""
+        _check_level(level)
+        return [self._row(level, key, members) for key in sorted(self._totals[level])]
+
+    def unassigned(self, level: str) -> int:
+        _check_level(level)
+        return self._unassigned[level]
+
+
+def get_rollups() -> FeederRollups:
+    """Return the rollups for the active feeder config, rebuilding them if the config changed."""
+    global _ROLLUPS
+    version = get_config_version()
+    rollups = _ROLLUPS
+    if rollups is not None and rollups.version == version:
+        return rollups
+    with _ROLLUPS_LOCK:
+        if _ROLLUPS is None or _ROLLUPS.version != version:
+            feeders = get_all_feeders()
+            # Reuse hosting capacities the precomputed table already has for this version.
+            table = get_hosting_table()
+            capacities = {fid: table.capacities(fid) for fid in feeders if fid in table} if table else None
+            _ROLLUPS = FeederRollups(feeders, version=version, capacities=capacities)
+        return _ROLLUPS
+
+
+def _apply_delta(
+    changed: Mapping[str, Mapping[str, Any]], removed: Iterable[str], old_version: str, new_version: str
+) -> None:
+    global _ROLLUPS
+    with _ROLLUPS_LOCK:
+        rollups = _ROLLUPS
+        if rollups is not None and rollups.version == old_version:
+            _ROLLUPS = rollups.updated(changed, removed, version=new_version)
+
+
+def lookup_rollup(level: str, key: Optional[str] = None, members: bool = False) -> Dict[str, Any]:
+    """One group's totals (``rollup``, None if unknown) or every group at ``level`` (``groups``)."""
+    rollups = get_rollups()
+    out: Dict[str, Any] = {
+        "level": level,
+        "config_version": rollups.version,
+        "unassigned_feeders": rollups.unassigned(level),
+    }
+    if key is not None:
+        out["rollup"] = rollups.get(level, key, members=members)
+    else:
+        out["groups"] = rollups.groups(level, members=members)
+    return out
+
+
+register_delta_hook(_apply_delta)
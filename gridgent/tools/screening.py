@@ -0,0 +1,147 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Any, List, Mapping, Optional, Tuple
+import heapq
+
+from gridgent.core.deadline import expired, mark_partial
+from gridgent.tools.grid_stub import (
+    get_all_feeders,
+    evaluate_feeder_metrics,
+    LOADING_LIMIT_PCT,
+    VOLTAGE_MIN_PU,
+    VOLTAGE_MAX_PU,
+)
+
+# The deadline is polled once every DEADLINE_CHECK_MASK + 1 feeders.
+DEADLINE_CHECK_MASK = 1023
+
+
+@dataclass
+class ScreeningEntry:
+    feeder: str
+    name: str
+    peak_loading_pct: float
+    loading_margin_pct: float
+    min_voltage_pu: float
+    max_voltage_pu: float
+    voltage_margin_pu: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "feeder": self.feeder,
+            "name": self.name,
+            "peak_loading_pct": round(self.peak_loading_pct, 1),
+            "loading_margin_pct": round(self.loading_margin_pct, 1),
+            "min_voltage_pu": round(self.min_voltage_pu, 3),
+            "max_voltage_pu": round(self.max_voltage_pu, 3),
+            "voltage_margin_pu": round(self.voltage_margin_pu, 3),
+        }
+
+
+@dataclass
+class ScreeningResult:
+    num_feeders: int
+    top_k: int
+    added_pv_mw: float
+    added_load_mw: float
+    worst_loading: List[ScreeningEntry]
+    worst_voltage: List[ScreeningEntry]
+    # Fewer than num_feeders when the request's deadline stopped the scan early.
+    num_screened: int = 0
+    partial: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "num_feeders": self.num_feeders,
+            "num_screened": self.num_screened,
+            "partial": self.partial,
+            "top_k": self.top_k,
+            "added_pv_mw": self.added_pv_mw,
+            "added_load_mw": self.added_load_mw,
+            "worst_loading": [e.to_dict() for e in self.worst_loading],
+            "worst_voltage": [e.to_dict() for e in self.worst_voltage],
+        }
+
+
+def _entry(fid: str, meta: Dict[str, Any], added_pv_mw: float, added_load_mw: float) -> ScreeningEntry:
+    loading, vmin, vmax = evaluate_feeder_metrics(
+        float(meta.get("peak_mw", 10.0)),
+        float(meta.get("pv_mw", 1.0)),
+        added_pv_mw=added_pv_mw,
+        added_load_mw=added_load_mw,
+    )
+    return ScreeningEntry(
+        feeder=fid,
+        name=str(meta.get("name", fid)),
+        peak_loading_pct=loading,
+        loading_margin_pct=LOADING_LIMIT_PCT - loading,
+        min_voltage_pu=vmin,
+        max_voltage_pu=vmax,
+        voltage_margin_pu=min(vmin - VOLTAGE_MIN_PU, VOLTAGE_MAX_PU - vmax),
+    )
+
+
+def screen_feeders(
+    added_pv_mw: float = 0.0,
+    added_load_mw: float = 0.0,
+    top_k: int = 5,
+    feeders: Optional[Mapping[str, Dict[str, Any]]] = None,
+) -> ScreeningResult:
+    """Apply the same scenario to every feeder and keep the top-K closest to their limits.
+
+    Two bounded heaps (worst loading margin, worst voltage margin) are kept while
+    scanning, so the cost is O(n log k) and only the K finalists are materialized. If the
+    request's deadline expires the scan stops and ranks the feeders seen so far.
+    """
+    if feeders is None:
+        feeders = get_all_feeders()
+    top_k = max(1, int(top_k))
+
+    # Max-heaps on margin (stored negated) holding the K smallest margins seen so far.
+    loading_heap: List[Tuple[float, str]] = []
+    voltage_heap: List[Tuple[float, str]] = []
+    push, pushpop = heapq.heappush, heapq.heappushpop
+
+    screened = 0
+    for fid, meta in feeders.items():
+        if screened and not screened & DEADLINE_CHECK_MASK and expired():
+            break
+        screened += 1
+        loading, vmin, vmax = evaluate_feeder_metrics(
+            float(meta.get("peak_mw", 10.0)),
+            float(meta.get("pv_mw", 1.0)),
+            added_pv_mw,
+            added_load_mw,
+        )
+        neg_loading_margin = loading - LOADING_LIMIT_PCT
+        low = vmin - VOLTAGE_MIN_PU
+        high = VOLTAGE_MAX_PU - vmax
+        neg_voltage_margin = -(low if low < high else high)
+
+        if len(loading_heap) < top_k:
+            push(loading_heap, (neg_loading_margin, fid))
+        elif neg_loading_margin > loading_heap[0][0]:
+            pushpop(loading_heap, (neg_loading_margin, fid))
+
+        if len(voltage_heap) < top_k:
+            push(voltage_heap, (neg_voltage_margin, fid))
+        elif neg_voltage_margin > voltage_heap[0][0]:
+            pushpop(voltage_heap, (neg_voltage_margin, fid))
+
+    def _finalize(heap: List[Tuple[float, str]]) -> List[ScreeningEntry]:
+        ranked = sorted(heap, key=lambda item: (-item[0], item[1]))
+        return [_entry(fid, feeders[fid], added_pv_mw, added_load_mw) for _, fid in ranked]
+
+    partial = screened < len(feeders)
+    if partial:
+        mark_partial("fleet_screening")
+    return ScreeningResult(
+        num_feeders=len(feeders),
+        top_k=top_k,
+        added_pv_mw=added_pv_mw,
+        added_load_mw=added_load_mw,
+        worst_loading=_finalize(loading_heap),
+        worst_voltage=_finalize(voltage_heap),
+        num_screened=screened,
+        partial=partial,
+    )
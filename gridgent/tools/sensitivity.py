@@ -0,0 +1,288 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+import os
+import threading
+import time
+
+from gridgent.tools.grid_stub import (
+    PowerFlowResult,
+    build_power_flow_result,
+    get_all_feeders,
+    get_config_setting,
+    get_config_version,
+    register_delta_hook,
+    register_reload_hook,
+    LOADING_LIMIT_PCT,
+    LOADING_WARN_PCT,
+    VOLTAGE_MIN_PU,
+    VOLTAGE_MAX_PU,
+)
+from gridgent.tools.solvers import Metrics, SolverBackend, evaluate_batch, get_backend, solve_scenario
+
+# Central-difference step (MW) for the derivatives.
+DERIVATIVE_STEP_MW = 0.05
+# Candidate validity boxes [0, R] x [0, R] (MW), largest first; the first one whose
+# corners the linearization reproduces within TOLERANCE is kept.
+RADII_MW: Tuple[float, ...] = (4.0, 2.0, 1.0, 0.5)
+# Allowed linearization error per metric: (loading %, min voltage pu, max voltage pu).
+TOLERANCE: Metrics = (0.5, 0.002, 0.002)
+# Extra distance from a screening threshold, on top of the error bound, before an
+# estimate is trusted; closer scenarios go to the solver so flags are never guessed.
+NEAR_LIMIT_MARGIN: Metrics = (1.0, 0.005, 0.005)
+# Added to every error bound to cover floating-point rounding in the estimate.
+BOUND_FLOOR = 1e-6
+# Feeders per solver batch while building.
+BUILD_CHUNK = 512
+
+_METRICS = ("peak_loading_pct", "min_voltage_pu", "max_voltage_pu")
+_THRESHOLDS: Tuple[Tuple[float, ...], ...] = (
+    (LOADING_WARN_PCT, LOADING_LIMIT_PCT),
+    (VOLTAGE_MIN_PU,),
+    (VOLTAGE_MAX_PU,),
+)
+_H = DERIVATIVE_STEP_MW
+# (added_pv_mw, added_load_mw) probes per feeder: base, +-h on each axis, then the
+# three far corners of every candidate box.
+_PROBES: Tuple[Tuple[float, float], ...] = (
+    (0.0, 0.0),
+    (_H, 0.0),
+    (-_H, 0.0),
+    (0.0, _H),
+    (0.0, -_H),
+) + tuple(p for r in RADII_MW for p in ((r, 0.0), (0.0, r), (r, r)))
+
+_TABLES: Dict[str, "SensitivityTable"] = {}
+_PENDING: Set[str] = set()
+_REFRESH_EVENT = threading.Event()
+_WORKER_LOCK = threading.Lock()
+_WORKER: Optional[threading.Thread] = None
+_STATS = {"estimated": 0, "near_limit": 0, "out_of_range": 0, "not_ready": 0}
+_STATS_LOCK = threading.Lock()
+
+
+def fast_path_enabled() -> bool:
+    """``GRID_GENT_FAST_PATH`` (``1``/``0``) > config ``fast_path`` > off."""
+    env = os.environ.get("GRID_GENT_FAST_PATH")
+    if env is not None:
+        return env == "1"
+    return bool(get_config_setting("fast_path", False))
+
+
+@dataclass(frozen=True)
+class FeederSensitivity:
+    """First-order model of one feeder around the base case.
+
+    ``residual`` is the largest gap between solver and linearization at the corners of
+    the ``[0, radius_mw]`` box. When a metric is convex or concave over the box (true for
+    the demo model, whose only nonlinearities are clamps) the gap at any point inside is
+    at most ``residual * s / radius_mw`` with ``s`` the larger of the two MW changes.
+    """
+
+    base: Metrics
+    d_pv: Metrics  # per MW of added PV
+    d_load: Metrics  # per MW of added load
+    radius_mw: float
+    residual: Metrics
+
+    @classmethod
+    def from_probes(cls, values: List[Metrics]) -> "FeederSensitivity":
+        base = values[0]
+        d_pv = tuple((a - b) / (2 * _H) for a, b in zip(values[1], values[2]))
+        d_load = tuple((a - b) / (2 * _H) for a, b in zip(values[3], values[4]))
+        radius, residual = 0.0, (0.0, 0.0, 0.0)
+        for k, r in enumerate(RADII_MW):
+            corners = values[5 + 3 * k:8 + 3 * k]
+            points = ((r, 0.0), (0.0, r), (r, r))
+            gaps = tuple(
+                max(abs(m[i] - (base[i] + d_pv[i] * pv + d_load[i] * load)) for m, (pv, load) in zip(corners, points))
+                for i in range(3)
+            )
+            if all(g <= tol for g, tol in zip(gaps, TOLERANCE)):
+                radius, residual = r, gaps
+                break
+        return cls(base, d_pv, d_load, radius, residual)  # type: ignore[arg-type]
+
+    def predict(self, added_pv_mw: float, added_load_mw: float) -> Optional[Tuple[Metrics, Metrics]]:
+        """``(metrics, error_bound)`` inside the validity box, else None."""
+        s = max(added_pv_mw, added_load_mw)
+        if min(added_pv_mw, added_load_mw) < 0 or s > self.radius_mw:
+            return None
+        metrics = tuple(b + dp * added_pv_mw + dl * added_load_mw for b, dp, dl in zip(self.base, self.d_pv, self.d_load))
+        bound = tuple(r * s / self.radius_mw + BOUND_FLOOR for r in self.residual)
+        return metrics, bound  # type: ignore[return-value]
+
+
+class SensitivityTable:
+    """Per-feeder sensitivities for one backend, built from batched solver probes.
+
+    Derivatives are finite differences rather than read off the demo formulas, so the
+    same table works for nonlinear backends (with a smaller validity box).
+    """
+
+    def __init__(self, version: str, backend_name: str, rows: Dict[str, FeederSensitivity]) -> None:
+        self.version = version
+        self.backend_name = backend_name
+        self.rows = rows
+        self.built_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, feeder: str) -> bool:
+        return feeder in self.rows
+
+    @staticmethod
+    def _rows(feeders: Mapping[str, Mapping[str, Any]], backend: SolverBackend) -> Dict[str, FeederSensitivity]:
+        rows: Dict[str, FeederSensitivity] = {}
+        items = list(feeders.items())
+        n = len(_PROBES)
+        for start in range(0, len(items), BUILD_CHUNK):
+            chunk = items[start:start + BUILD_CHUNK]
+            values = evaluate_batch([(meta, pv, load) for _, meta in chunk for pv, load in _PROBES], backend=backend)
+            for i, (fid, _) in enumerate(chunk):
+                rows[str(fid).upper()] = FeederSensitivity.from_probes(values[i * n:(i + 1) * n])
+        return rows
+
+    @classmethod
+    def build(
+        cls, feeders: Mapping[str, Mapping[str, Any]], backend: SolverBackend, version: str = ""
+    ) -> "SensitivityTable":
+        return cls(version, backend.name, cls._rows(feeders, backend))
+
+    def updated(
+        self,
+        changed: Mapping[str, Mapping[str, Any]],
+        removed: Iterable[str] = (),
+        version: str = "",
+        backend: Optional[SolverBackend] = None,
+    ) -> "SensitivityTable":
+        """Return a copy with rows re-probed for ``changed`` feeders and ``removed`` ones dropped."""
+        rows = dict(self.rows)
+        for fid in removed:
+            rows.pop(fid, None)
+        rows.update(self._rows(changed, backend or get_backend(self.backend_name)))
+        table = SensitivityTable(version, self.backend_name, rows)
+        table.built_at = self.built_at
+        return table
+
+
+def refresh_sensitivity_table(backend: Optional[SolverBackend] = None) -> SensitivityTable:
+    """Build the table for ``backend`` (default backend if None) synchronously and publish it."""
+    backend = backend or get_backend()
+    version = get_config_version()
+    table = SensitivityTable.build(get_all_feeders(), backend, version=version)
+    # A reload or delta during the build makes this table stale; leave the newer one.
+    if get_config_version() == version:
+        _TABLES[backend.name] = table
+    return table
+
+
+def _refresh_loop() -> None:
+    while True:
+        _REFRESH_EVENT.wait()
+        _REFRESH_EVENT.clear()
+        with _WORKER_LOCK:
+            names = list(_PENDING)
+            _PENDING.clear()
+        for name in names:
+            try:
+                refresh_sensitivity_table(get_backend(name))
+            except Exception:
+                # A broken upload must not kill the worker; the next reload retries.
+                pass
+
+
+def schedule_refresh(backend_name: Optional[str] = None) -> None:
+    """Ask the background worker to rebuild one backend's table, or every built one (non-blocking)."""
+    global _WORKER
+    with _WORKER_LOCK:
+        _PENDING.update([backend_name] if backend_name else list(_TABLES))
+        if not _PENDING:
+            return
+        if _WORKER is None or not _WORKER.is_alive():
+            _WORKER = threading.Thread(target=_refresh_loop, name="gridgent-sensitivity", daemon=True)
+            _WORKER.start()
+    _REFRESH_EVENT.set()
+
+
+def get_sensitivity_table(backend: Optional[SolverBackend] = None) -> Optional[SensitivityTable]:
+    """Return the table for ``backend`` if it matches the active config, else schedule a rebuild."""
+    name = (backend or get_backend()).name
+    table = _TABLES.get(name)
+    if table is not None and table.version == get_config_version():
+        return table
+    schedule_refresh(name)
+    return None
+
+
+def _bump(name: str) -> None:
+    with _STATS_LOCK:
+        _STATS[name] += 1
+
+
+def _near_limit(metrics: Metrics, bound: Metrics) -> bool:
+    return any(
+        abs(value - threshold) <= err + margin
+        for value, err, margin, thresholds in zip(metrics, bound, NEAR_LIMIT_MARGIN, _THRESHOLDS)
+        for threshold in thresholds
+    )
+
+
+def solve_scenario_fast(
+    feeder: str,
+    added_pv_mw: float = 0.0,
+    added_load_mw: float = 0.0,
+    backend: Optional[SolverBackend] = None,
+) -> Tuple[PowerFlowResult, Dict[str, Any]]:
+    """Answer small perturbations from the sensitivity table, else run the solver.
+
+    Returns ``(result, approximation)``. ``approximation["method"]`` is ``"sensitivity"``
+    with a per-metric ``error_bound``, or ``"solver"`` with the ``reason`` the estimate
+    was not used: outside the validity box, within the error bound plus a margin of a
+    screening threshold, or table not built yet.
+    """
+    feeder = (feeder or "").upper().strip()
+    backend = backend or get_backend()
+    table = get_sensitivity_table(backend)
+    row = table.rows.get(feeder) if table is not None else None
+    if row is None:
+        reason = "not_ready"
+    else:
+        prediction = row.predict(added_pv_mw, added_load_mw)
+        if prediction is None:
+            reason = "out_of_range"
+        elif _near_limit(*prediction):
+            reason = "near_limit"
+        else:
+            (loading, vmin, vmax), bound = prediction
+            _bump("estimated")
+            return build_power_flow_result(feeder, loading, vmin, vmax), {
+                "method": "sensitivity",
+                "error_bound": {name: round(err, 6) for name, err in zip(_METRICS, bound)},
+                "radius_mw": row.radius_mw,
+                "table_version": table.version,  # type: ignore[union-attr]
+            }
+    _bump(reason)
+    result = solve_scenario(feeder, added_pv_mw=added_pv_mw, added_load_mw=added_load_mw, backend=backend)
+    return result, {"method": "solver", "reason": reason}
+
+
+def sensitivity_stats() -> Dict[str, Any]:
+    with _STATS_LOCK:
+        stats: Dict[str, Any] = dict(_STATS)
+    stats["enabled"] = fast_path_enabled()
+    stats["tables"] = {name: {"feeders": len(t), "version": t.version} for name, t in list(_TABLES.items())}
+    return stats
+
+
+def _apply_delta(
+    changed: Mapping[str, Mapping[str, Any]], removed: Iterable[str], old_version: str, new_version: str
+) -> None:
+    for name, table in list(_TABLES.items()):
+        if table.version == old_version:
+            _TABLES[name] = table.updated(changed, removed, version=new_version)
+
+
+register_reload_hook(schedule_refresh)
+register_delta_hook(_apply_delta)
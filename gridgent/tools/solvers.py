@@ -0,0 +1,309 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, Optional, Protocol, Sequence, Tuple
+import os
+import threading
+import time
+import warnings
+
+from gridgent.tools.grid_stub import (
+    PowerFlowResult,
+    build_power_flow_result,
+    evaluate_feeder_metrics,
+    get_config_setting,
+    get_feeder_summary,
+)
+
+try:  # optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# (peak_loading_pct, min_voltage_pu, max_voltage_pu)
+Metrics = Tuple[float, float, float]
+# (feeder metadata, added_pv_mw, added_load_mw)
+Scenario = Tuple[Mapping[str, Any], float, float]
+
+
+class SolverBackend(Protocol):
+    """What the planning layer needs from a power-flow engine."""
+
+    name: str
+    capabilities: FrozenSet[str]
+
+    def warm_up(self) -> None: ...
+
+    def evaluate(self, feeder_meta: Mapping[str, Any], added_pv_mw: float, added_load_mw: float) -> Metrics: ...
+
+    def evaluate_batch(self, scenarios: Sequence[Scenario]) -> List[Metrics]: ...
+
+
+class StubBackend:
+    """Pure-Python evaluation of the simplified demo model."""
+
+    name = "stub"
+    capabilities = frozenset({"single", "batch"})
+
+    def warm_up(self) -> None:
+        evaluate_feeder_metrics(10.0, 1.0)
+
+    def evaluate(self, feeder_meta: Mapping[str, Any], added_pv_mw: float, added_load_mw: float) -> Metrics:
+        return evaluate_feeder_metrics(
+            float(feeder_meta.get("peak_mw", 10.0)),
+            float(feeder_meta.get("pv_mw", 1.0)),
+            added_pv_mw,
+            added_load_mw,
+        )
+
+    def evaluate_batch(self, scenarios: Sequence[Scenario]) -> List[Metrics]:
+        return [self.evaluate(meta, pv, load) for meta, pv, load in scenarios]
+
+
+class NumpyBackend(StubBackend):
+    """Vectorized version of the demo model; the batch path must mirror ``evaluate_feeder_metrics``."""
+
+    name = "numpy"
+    capabilities = frozenset({"single", "batch", "vectorized"})
+
+    def __init__(self) -> None:
+        if np is None:
+            raise ImportError("numpy is not installed")
+
+    def warm_up(self) -> None:
+        self.evaluate_batch([({"peak_mw": 10.0, "pv_mw": 1.0}, 0.0, 0.0)])
+
+    def evaluate_batch(self, scenarios: Sequence[Scenario]) -> List[Metrics]:
+        n = len(scenarios)
+        if n == 0:
+            return []
+        peak = np.fromiter((float(m.get("peak_mw", 10.0)) for m, _, _ in scenarios), dtype=float, count=n)
+        base_pv = np.fromiter((float(m.get("pv_mw", 1.0)) for m, _, _ in scenarios), dtype=float, count=n)
+        pv = np.fromiter((float(p) for _, p, _ in scenarios), dtype=float, count=n)
+        load = np.fromiter((float(q) for _, _, q in scenarios), dtype=float, count=n)
+
+        new_peak = np.maximum(peak + load - 0.5 * pv, 0.0)
+        rating = np.where(peak > 0, peak * 1.2, 12.0)
+        loading = 100.0 * new_peak / rating
+        vmin = np.maximum(0.97 - 0.01 * (load / np.maximum(peak, 1.0)), 0.9)
+        vmax = np.minimum(1.03 + 0.01 * (pv / np.maximum(base_pv, 0.5)), 1.10)
+        return list(zip(loading.tolist(), vmin.tolist(), vmax.tolist()))
+
+
+class PandapowerBackend:
+    """Adapter running a balanced AC power flow on a small equivalent network per feeder.
+
+    Each feeder is modelled as substation transformer -> lumped line -> aggregate load and
+    PV, sized from the feeder metadata. It is far slower than the stub; use it where AC
+    voltage behaviour matters more than latency.
+    """
+
+    name = "pandapower"
+    capabilities = frozenset({"single", "batch", "ac_power_flow"})
+
+    def __init__(self) -> None:
+        # An ImportError here marks the backend unavailable.
+        import pandapower
+
+        self._pp = pandapower
+
+    def warm_up(self) -> None:
+        self.evaluate({"peak_mw": 10.0, "pv_mw": 1.0, "base_kv": 13.8}, 0.0, 0.0)
+
+    def evaluate(self, feeder_meta: Mapping[str, Any], added_pv_mw: float, added_load_mw: float) -> Metrics:
+        pp = self._pp
+        peak = float(feeder_meta.get("peak_mw", 10.0))
+        base_pv = float(feeder_meta.get("pv_mw", 1.0))
+        base_kv = float(feeder_meta.get("base_kv", 13.8))
+        rating_mva = peak * 1.2 if peak > 0 else 12.0
+
+        net = pp.create_empty_network()
+        hv = pp.create_bus(net, vn_kv=69.0)
+        lv = pp.create_bus(net, vn_kv=base_kv)
+        end = pp.create_bus(net, vn_kv=base_kv)
+        pp.create_ext_grid(net, hv, vm_pu=1.03)
+        pp.create_transformer_from_parameters(
+            net, hv, lv, sn_mva=rating_mva, vn_hv_kv=69.0, vn_lv_kv=base_kv,
+            vkr_percent=0.5, vk_percent=6.0, pfe_kw=0.0, i0_percent=0.0,
+        )
+        pp.create_line_from_parameters(
+            net, lv, end, length_km=3.0, r_ohm_per_km=0.1, x_ohm_per_km=0.2,
+            c_nf_per_km=0.0, max_i_ka=rating_mva / (base_kv * 3 ** 0.5),
+        )
+        demand = max(peak + added_load_mw, 0.0)
+        pp.create_load(net, end, p_mw=demand, q_mvar=0.2 * demand)
+        pp.create_sgen(net, end, p_mw=0.5 * (base_pv + added_pv_mw))
+        pp.runpp(net)
+
+        loading = float(net.res_trafo.loading_percent.iloc[0])
+        vm = net.res_bus.vm_pu
+        return loading, float(vm.min()), float(vm.max())
+
+    def evaluate_batch(self, scenarios: Sequence[Scenario]) -> List[Metrics]:
+        return [self.evaluate(meta, pv, load) for meta, pv, load in scenarios]
+
+
+_BACKEND_FACTORIES: Dict[str, Callable[[], SolverBackend]] = {}
+_BACKENDS: Dict[str, SolverBackend] = {}
+_UNAVAILABLE: Dict[str, str] = {}
+_LOCK = threading.Lock()
+_STATS: Dict[str, Dict[str, float]] = {}
+_STATS_LOCK = threading.Lock()
+# Configured names already warned about, so a bad setting warns once, not per request.
+_WARNED: Dict[str, str] = {}
+
+
+def register_backend(name: str, factory: Callable[[], SolverBackend]) -> None:
+    with _LOCK:
+        _BACKEND_FACTORIES[name] = factory
+        _BACKENDS.pop(name, None)
+        _UNAVAILABLE.pop(name, None)
+        _WARNED.pop(name, None)
+
+
+def unregister_backend(name: str) -> None:
+    """Forget a backend registered with :func:`register_backend`, including its instance."""
+    with _LOCK:
+        _BACKEND_FACTORIES.pop(name, None)
+        _BACKENDS.pop(name, None)
+        _UNAVAILABLE.pop(name, None)
+        _WARNED.pop(name, None)
+
+
+def available_backends() -> List[str]:
+    """Names of registered backends whose dependencies import cleanly."""
+    out = []
+    for name in list(_BACKEND_FACTORIES):
+        try:
+            _instance(name)
+            out.append(name)
+        except ImportError:
+            pass
+    return out
+
+
+def _instance(name: str) -> SolverBackend:
+    backend = _BACKENDS.get(name)
+    if backend is not None:
+        return backend
+    with _LOCK:
+        if name in _BACKENDS:
+            return _BACKENDS[name]
+        if name in _UNAVAILABLE:
+            raise ImportError(_UNAVAILABLE[name])
+        if name not in _BACKEND_FACTORIES:
+            raise ValueError(f"Unknown solver backend '{name}'.")
+        try:
+            backend = _BACKEND_FACTORIES[name]()
+        except ImportError as exc:
+            _UNAVAILABLE[name] = str(exc)
+            raise
+        backend.warm_up()
+        _BACKENDS[name] = backend
+        return backend
+
+
+def _configured_name(query_type: Optional[str]) -> str:
+    setting = os.environ.get("GRID_GENT_SOLVER") or get_config_setting("solver")
+    if isinstance(setting, dict):
+        setting = setting.get(query_type or "default") or setting.get("default")
+    if setting:
+        return str(setting)
+    return "numpy" if np is not None else "stub"
+
+
+def _fall_back(chosen: str, reason: str) -> SolverBackend:
+    with _LOCK:
+        first = chosen not in _WARNED
+        _WARNED[chosen] = reason
+    if first:
+        warnings.warn(f"Solver backend '{chosen}' is not usable ({reason}); using 'stub'.", RuntimeWarning, stacklevel=3)
+    return _instance("stub")
+
+
+def get_backend(name: Optional[str] = None, query_type: Optional[str] = None) -> SolverBackend:
+    """Resolve a backend: explicit ``name`` > ``GRID_GENT_SOLVER`` > config ``solver`` > default.
+
+    The config ``solver`` setting may be a name or a mapping from query type (intent) to
+    name with a ``default`` entry. Unavailable backends, and configured names that are not
+    registered, fall back to the stub with a one-time RuntimeWarning; an unknown explicit
+    ``name`` raises ValueError.
+    """
+    chosen = name or _configured_name(query_type)
+    try:
+        return _instance(chosen)
+    except ImportError as exc:
+        return _fall_back(chosen, str(exc))
+    except ValueError as exc:
+        if name:
+            raise
+        return _fall_back(chosen, str(exc))
+
+
+def check_solver_config() -> List[str]:
+    """Resolve every configured backend name, so typos warn at startup rather than on the
+    first request for that query type; returns the names that fell back to the stub."""
+    setting = os.environ.get("GRID_GENT_SOLVER") or get_config_setting("solver")
+    types = [key for key in setting if key != "default"] if isinstance(setting, dict) else []
+    bad = []
+    for query_type in [None, *types]:
+        chosen = _configured_name(query_type)
+        if get_backend(query_type=query_type).name != chosen:
+            bad.append(chosen)
+    return bad
+
+
+def _record(backend: SolverBackend, method: str, scenarios: int, elapsed: float) -> None:
+    with _STATS_LOCK:
+        entry = _STATS.setdefault(f"{backend.name}.{method}", {"calls": 0, "scenarios": 0, "total_ms": 0.0})
+        entry["calls"] += 1
+        entry["scenarios"] += scenarios
+        entry["total_ms"] += elapsed * 1000.0
+
+
+def solver_stats() -> Dict[str, Dict[str, float]]:
+    """Per-backend, per-method call counts and timings (mean ms per scenario included)."""
+    with _STATS_LOCK:
+        out = {}
+        for key, entry in _STATS.items():
+            row = dict(entry)
+            row["total_ms"] = round(row["total_ms"], 3)
+            row["ms_per_scenario"] = round(entry["total_ms"] / max(entry["scenarios"], 1), 4)
+            out[key] = row
+        return out
+
+
+def evaluate(
+    feeder_meta: Mapping[str, Any],
+    added_pv_mw: float = 0.0,
+    added_load_mw: float = 0.0,
+    backend: Optional[SolverBackend] = None,
+) -> Metrics:
+    backend = backend or get_backend()
+    t0 = time.perf_counter()
+    metrics = backend.evaluate(feeder_meta, added_pv_mw, added_load_mw)
+    _record(backend, "evaluate", 1, time.perf_counter() - t0)
+    return metrics
+
+
+def evaluate_batch(scenarios: Sequence[Scenario], backend: Optional[SolverBackend] = None) -> List[Metrics]:
+    backend = backend or get_backend()
+    t0 = time.perf_counter()
+    metrics = backend.evaluate_batch(scenarios)
+    _record(backend, "evaluate_batch", len(scenarios), time.perf_counter() - t0)
+    return metrics
+
+
+def solve_scenario(
+    feeder: str,
+    added_pv_mw: float = 0.0,
+    added_load_mw: float = 0.0,
+    backend: Optional[SolverBackend] = None,
+) -> PowerFlowResult:
+    """Backend-aware replacement for ``run_power_flow_scenario``."""
+    meta = get_feeder_summary(feeder)
+    loading, vmin, vmax = evaluate(meta, added_pv_mw, added_load_mw, backend=backend)
+    return build_power_flow_result(feeder, loading, vmin, vmax)
+
+
+register_backend("stub", StubBackend)
+register_backend("numpy", NumpyBackend)
+register_backend("pandapower", PandapowerBackend)
@@ -0,0 +1,291 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import math
+
+from gridgent.core.deadline import expired, mark_partial
+from gridgent.tools.grid_stub import (
+    get_feeder_summary,
+    evaluate_feeder_metrics,
+    LOADING_LIMIT_PCT,
+    VOLTAGE_MIN_PU,
+    VOLTAGE_MAX_PU,
+)
+
+try:  # optional dependency
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+# Control options searched for every feeder (demo values).
+TAP_STEP_PU = 0.00625  # 5/8 % per regulator step
+TAP_POSITIONS: Tuple[int, ...] = tuple(range(-8, 1))  # buck only; boosting never relieves over-voltage
+POWER_FACTORS: Tuple[float, ...] = (1.0, 0.98, 0.95, 0.92, 0.90)  # fixed PF, absorbing
+VOLT_VAR_CURVES: Tuple[Tuple[float, float], ...] = (  # (start absorbing at pu, reactive ratio per pu)
+    (1.00, 10.0),
+    (1.01, 10.0),
+    (1.01, 20.0),
+    (1.02, 20.0),
+    (1.02, 40.0),
+)
+VOLT_VAR_QMAX = 0.44  # reactive ratio at full absorption (~0.92 PF)
+XR_RATIO = 1.0  # feeder X/R seen by inverter reactive power
+
+# PV increments used to locate each setting's hosting capacity.
+PV_SEARCH_STEP_MW = 0.25
+PV_SEARCH_MAX_MW = 40.0
+
+
+@dataclass(frozen=True)
+class ControlSetting:
+    tap: int = 0
+    power_factor: Optional[float] = None
+    volt_var: Optional[Tuple[float, float]] = None
+
+    def label(self) -> str:
+        parts = [f"regulator tap {self.tap:+d}" if self.tap else "regulator at neutral"]
+        if self.volt_var is not None:
+            parts.append(f"volt-var from {self.volt_var[0]:.2f} pu (slope {self.volt_var[1]:g})")
+        elif self.power_factor is not None and self.power_factor < 1.0:
+            parts.append(f"inverters at {self.power_factor:.2f} PF absorbing")
+        else:
+            parts.append("inverters at unity PF")
+        return ", ".join(parts)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ControlSetting":
+        start, slope = data.get("volt_var_start_pu"), data.get("volt_var_slope")
+        return cls(
+            tap=int(data.get("tap", 0)),
+            power_factor=data.get("power_factor"),
+            volt_var=(float(start), float(slope)) if start is not None else None,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "tap": self.tap,
+            "power_factor": self.power_factor,
+            "volt_var_start_pu": self.volt_var[0] if self.volt_var else None,
+            "volt_var_slope": self.volt_var[1] if self.volt_var else None,
+            "label": self.label(),
+        }
+
+
+def candidate_settings() -> List[ControlSetting]:
+    out: List[ControlSetting] = []
+    for tap in TAP_POSITIONS:
+        out.extend(ControlSetting(tap=tap, power_factor=pf) for pf in POWER_FACTORS)
+        out.extend(ControlSetting(tap=tap, volt_var=curve) for curve in VOLT_VAR_CURVES)
+    return out
+
+
+def _fixed_q(setting: ControlSetting) -> float:
+    pf = setting.power_factor if setting.power_factor is not None else 1.0
+    return math.tan(math.acos(pf))
+
+
+def evaluate_controlled(
+    base_peak_mw: float,
+    base_pv_mw: float,
+    setting: ControlSetting,
+    added_pv_mw: float = 0.0,
+    added_load_mw: float = 0.0,
+) -> Tuple[float, float, float]:
+    """(peak_loading_pct, min_voltage_pu, max_voltage_pu) of the demo model under ``setting``.
+
+    Reactive absorption scales the PV voltage rise by ``1 - X/R * q`` but adds to the
+    apparent power the transformer carries; the tap shifts every voltage.
+    """
+    shift = setting.tap * TAP_STEP_PU
+    rise = 0.01 * added_pv_mw / max(base_pv_mw, 0.5)
+    v_open = 1.03 + shift + rise
+
+    if setting.volt_var is not None:
+        v_start, slope = setting.volt_var
+        if v_open <= v_start:
+            q = 0.0
+        else:
+            # Solve v = v_open - rise * XR * slope * (v - v_start) on the sloped segment.
+            v = (v_open + rise * XR_RATIO * slope * v_start) / (1.0 + rise * XR_RATIO * slope)
+            q = min(slope * (v - v_start), VOLT_VAR_QMAX)
+    else:
+        q = _fixed_q(setting)
+    vmax = min(v_open - rise * XR_RATIO * q, 1.10)
+
+    _, vmin, _ = evaluate_feeder_metrics(base_peak_mw, base_pv_mw, added_load_mw=added_load_mw)
+    vmin = max(vmin + shift, 0.9)
+
+    net_mw = max(base_peak_mw + added_load_mw - 0.5 * added_pv_mw, 0.0)
+    reactive = q * 0.5 * added_pv_mw
+    rating = base_peak_mw * 1.2 if base_peak_mw > 0 else 12.0
+    loading = 100.0 * math.hypot(net_mw, reactive) / rating
+    return loading, vmin, vmax
+
+
+def _voltage_bound(base_pv_mw: float, setting: ControlSetting) -> float:
+    """Upper bound on PV before over-voltage, ignoring loading; used to prune settings."""
+    headroom = VOLTAGE_MAX_PU - 1.03 - setting.tap * TAP_STEP_PU
+    if headroom < 0:
+        return 0.0
+    # Volt-var can at most reach its full absorption; fixed PF absorbs at q throughout.
+    q = VOLT_VAR_QMAX if setting.volt_var is not None else _fixed_q(setting)
+    per_mw = 0.01 / max(base_pv_mw, 0.5) * (1.0 - XR_RATIO * q)
+    if per_mw <= 0:
+        return PV_SEARCH_MAX_MW
+    return min(headroom / per_mw, PV_SEARCH_MAX_MW)
+
+
+def _pv_steps() -> List[float]:
+    n = int(PV_SEARCH_MAX_MW / PV_SEARCH_STEP_MW)
+    return [i * PV_SEARCH_STEP_MW for i in range(n + 1)]
+
+
+def _capacity_scalar(peak: float, base_pv: float, setting: ControlSetting, load: float, steps: Sequence[float]) -> float:
+    capacity = -1.0
+    for pv in steps:
+        loading, vmin, vmax = evaluate_controlled(peak, base_pv, setting, pv, load)
+        if loading > LOADING_LIMIT_PCT or vmin < VOLTAGE_MIN_PU or vmax > VOLTAGE_MAX_PU:
+            break
+        capacity = pv
+    return capacity
+
+
+def _capacities_vectorized(
+    peak: float, base_pv: float, settings: Sequence[ControlSetting], load: float, steps: Sequence[float]
+) -> List[float]:
+    """Evaluate every (setting, PV step) pair as one array expression (mirrors ``evaluate_controlled``)."""
+    pv = np.asarray(steps, dtype=float)[None, :]
+    shift = np.array([s.tap * TAP_STEP_PU for s in settings])[:, None]
+    is_vv = np.array([s.volt_var is not None for s in settings])[:, None]
+    v_start = np.array([s.volt_var[0] if s.volt_var else 0.0 for s in settings])[:, None]
+    slope = np.array([s.volt_var[1] if s.volt_var else 0.0 for s in settings])[:, None]
+    q_fixed = np.array([0.0 if s.volt_var else _fixed_q(s) for s in settings])[:, None]
+
+    rise = 0.01 * pv / max(base_pv, 0.5)
+    v_open = 1.03 + shift + rise
+    v_slope = (v_open + rise * XR_RATIO * slope * v_start) / (1.0 + rise * XR_RATIO * slope)
+    q_vv = np.where(v_open <= v_start, 0.0, np.minimum(slope * (v_slope - v_start), VOLT_VAR_QMAX))
+    q = np.where(is_vv, q_vv, q_fixed)
+    vmax = np.minimum(v_open - rise * XR_RATIO * q, 1.10)
+
+    _, vmin0, _ = evaluate_feeder_metrics(peak, base_pv, added_load_mw=load)
+    vmin = np.maximum(vmin0 + shift, 0.9)
+    net = np.maximum(peak + load - 0.5 * pv, 0.0)
+    rating = peak * 1.2 if peak > 0 else 12.0
+    loading = 100.0 * np.hypot(net, q * 0.5 * pv) / rating
+
+    ok = (loading <= LOADING_LIMIT_PCT) & (vmin >= VOLTAGE_MIN_PU) & (vmax <= VOLTAGE_MAX_PU)
+    # Capacity is the last step before the first violation.
+    first_bad = np.where(ok.all(axis=1), ok.shape[1], np.argmin(ok, axis=1))
+    caps = np.where(first_bad > 0, np.asarray(steps)[np.maximum(first_bad - 1, 0)], -1.0)
+    return caps.tolist()
+
+
+def _scenario(peak: float, base_pv: float, setting: ControlSetting, added_pv_mw: float, added_load_mw: float) -> Dict[str, Any]:
+    loading, vmin, vmax = evaluate_controlled(peak, base_pv, setting, added_pv_mw, added_load_mw)
+    _, _, vmax_before = evaluate_controlled(peak, base_pv, ControlSetting(), added_pv_mw, added_load_mw)
+    return {
+        "added_pv_mw": added_pv_mw,
+        "added_load_mw": added_load_mw,
+        "max_voltage_pu_before": round(vmax_before, 3),
+        "max_voltage_pu_after": round(vmax, 3),
+        "min_voltage_pu_after": round(vmin, 3),
+        "peak_loading_pct_after": round(loading, 1),
+        "resolved": vmax <= VOLTAGE_MAX_PU and vmin >= VOLTAGE_MIN_PU and loading <= LOADING_LIMIT_PCT,
+    }
+
+
+def optimize_voltage_controls(
+    feeder: str, added_pv_mw: float = 0.0, added_load_mw: float = 0.0, top_n: int = 3
+) -> Dict[str, Any]:
+    """Search regulator taps and inverter PF / volt-var settings for the most PV hosting capacity.
+
+    Settings that violate limits before any PV is added, or whose voltage bound cannot
+    beat the uncontrolled capacity, are pruned before the PV search. The scalar search
+    stops early (``partial``) when the request's deadline expires.
+    """
+    feeder = (feeder or "").upper().strip() or "F1"
+    meta = get_feeder_summary(feeder)
+    peak = float(meta.get("peak_mw", 10.0))
+    base_pv = float(meta.get("pv_mw", 1.0))
+    steps = _pv_steps()
+
+    baseline_setting = ControlSetting()
+    baseline = _capacity_scalar(peak, base_pv, baseline_setting, added_load_mw, steps)
+
+    candidates = []
+    pruned = 0
+    for setting in candidate_settings():
+        bound = _voltage_bound(base_pv, setting)
+        loading, vmin, vmax = evaluate_controlled(peak, base_pv, setting, 0.0, added_load_mw)
+        if bound <= baseline or vmin < VOLTAGE_MIN_PU or vmax > VOLTAGE_MAX_PU or loading > LOADING_LIMIT_PCT:
+            pruned += 1
+            continue
+        candidates.append((bound, setting))
+    candidates.sort(key=lambda item: -item[0])
+
+    results: List[Tuple[float, ControlSetting]] = []
+    evaluated = 0
+    partial = False
+    if np is not None and candidates:
+        caps = _capacities_vectorized(peak, base_pv, [s for _, s in candidates], added_load_mw, steps)
+        evaluated = len(candidates)
+        results = list(zip(caps, (s for _, s in candidates)))
+    else:
+        kept: List[float] = []  # best top_n + 1 capacities so far, descending
+        for bound, setting in candidates:
+            threshold = kept[-1] if len(kept) > top_n else baseline
+            if bound <= threshold:
+                # Sorted by bound: nothing after this can enter the reported results.
+                pruned += len(candidates) - evaluated
+                break
+            if evaluated and expired():
+                # Best of the highest-bound settings searched so far.
+                partial = True
+                mark_partial("voltage_control")
+                break
+            cap = _capacity_scalar(peak, base_pv, setting, added_load_mw, steps)
+            evaluated += 1
+            results.append((cap, setting))
+            kept = sorted(kept + [cap], reverse=True)[:top_n + 1]
+
+    # Prefer the least intrusive setting among equals: fewer taps, then closer to unity PF.
+    results.sort(key=lambda item: (-item[0], -item[1].tap, item[1].volt_var is not None, -(item[1].power_factor or 0)))
+    best_cap, best_setting = results[0] if results and results[0][0] > baseline else (baseline, baseline_setting)
+
+    return {
+        "feeder": feeder,
+        "baseline_pv_capacity_mw": round(max(baseline, 0.0), 2),
+        "optimized_pv_capacity_mw": round(max(best_cap, 0.0), 2),
+        "gain_mw": round(max(best_cap - baseline, 0.0), 2),
+        "best_setting": best_setting.to_dict(),
+        "alternatives": [
+            {"pv_capacity_mw": round(cap, 2), **setting.to_dict()}
+            for cap, setting in results[1:top_n + 1]
+            if cap > baseline
+        ],
+        "scenario": _scenario(peak, base_pv, best_setting, added_pv_mw, added_load_mw),
+        "candidates": len(candidate_settings()),
+        "evaluated": evaluated,
+        "pruned": pruned,
+        "vectorized": np is not None,
+        "partial": partial,
+    }
+
+
+def rescore_voltage_controls(control: Dict[str, Any], added_pv_mw: float) -> Dict[str, Any]:
+    """Reuse an earlier search for the same feeder and added load at a different PV level.
+
+    Hosting capacities (and so the ranking of settings) depend only on the feeder and the
+    added load, so only the scenario check under the best setting is recomputed.
+    """
+    meta = get_feeder_summary(control["feeder"])
+    setting = ControlSetting.from_dict(control["best_setting"])
+    scenario = _scenario(
+        float(meta.get("peak_mw", 10.0)),
+        float(meta.get("pv_mw", 1.0)),
+        setting,
+        added_pv_mw,
+        control["scenario"]["added_load_mw"],
+    )
+    return {**control, "scenario": scenario}
@@ -1,11 +1,18 @@
 from __future__ import annotations
+import time
+
+_STARTED_AT = time.perf_counter()
+
 import os
-from app.server import run_server
 
 if __name__ == "__main__":
-    port_str = os.environ.get("GRID_GENT_PORT", "8000")
-    try:
-        port = int(port_str)
-    except ValueError:
-        port = 8000
-    run_server(port=port)
+    # Imported here so the startup report can attribute import time separately.
+    from app.server import run_server, _env_int
+
+    run_server(
+        port=_env_int("GRID_GENT_PORT", 8000),
+        warm=os.environ.get("GRID_GENT_LAZY_START", "0") != "1",
+        started_at=_STARTED_AT,
+        workers=_env_int("GRID_GENT_WORKERS", 1),
+        max_requests=_env_int("GRID_GENT_MAX_REQUESTS", 0),
+    )
@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+from app.admission import AdmissionConfig, AdmissionController, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2.0, capacity=3, now=0.0)
+        self.assertEqual([bucket.take(0.0) for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.take(0.0), 0.5)
+        self.assertEqual(bucket.take(0.5), 0.0)
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_rate_limit_is_per_client(self):
+        ctl = AdmissionController(AdmissionConfig(rate_per_s=1.0, burst=2))
+        with mock.patch("app.admission.time.monotonic", return_value=100.0):
+            statuses = [ctl.admit("POST", "/api/ask", "10.0.0.1").status for _ in range(3)]
+            other = ctl.admit("POST", "/api/ask", "10.0.0.2")
+        self.assertEqual(statuses, [0, 0, 429])
+        self.assertTrue(other.admitted)
+
+    def test_configured_api_keys_get_their_own_rate(self):
+        ctl = AdmissionController(AdmissionConfig(rate_per_s=1.0, burst=1, api_keys={"ops": 5.0}))
+        with mock.patch("app.admission.time.monotonic", return_value=100.0):
+            keyed = [ctl.admit("GET", "/api/feeders", "10.0.0.1", api_key="ops").status for _ in range(5)]
+            # Unknown keys cannot buy a fresh bucket; they share the address bucket.
+            unknown = [ctl.admit("GET", "/api/feeders", "10.0.0.1", api_key=f"k{i}").status for i in range(2)]
+        self.assertEqual(keyed, [0] * 5)
+        self.assertEqual(unknown, [0, 429])
+
+    def test_body_size_limits(self):
+        ctl = AdmissionController(AdmissionConfig(rate_per_s=0, max_body_bytes=100, max_upload_bytes=1000))
+        self.assertEqual(ctl.admit("POST", "/api/ask", "a", content_length=101).status, 413)
+        self.assertTrue(ctl.admit("POST", "/api/upload-grid", "a", content_length=500).admitted)
+        self.assertEqual(ctl.admit("POST", "/api/upload-grid", "a", content_length=1001).status, 413)
+
+    def test_bulk_lane_yields_to_interactive(self):
+        ctl = AdmissionController(AdmissionConfig(rate_per_s=0, max_interactive=4, max_bulk=1, bulk_yield_at=2, job_yield_at=2))
+        upload = ctl.admit("POST", "/api/upload-grid", "a")
+        self.assertTrue(upload.admitted)
+        self.assertEqual(ctl.admit("POST", "/api/jobs", "a").status, 503)
+        upload.release()
+
+        asks = [ctl.admit("POST", "/api/ask", "a")]
+        self.assertFalse(ctl.interactive_busy())  # jobs only yield from job_yield_at requests up
+        asks.append(ctl.admit("POST", "/api/ask", "a"))
+        self.assertTrue(ctl.interactive_busy())
+        busy = ctl.admit("PATCH", "/api/feeders", "a")
+        self.assertEqual((busy.status, busy.retry_after), (503, 1))
+        asks += [ctl.admit("GET", "/api/stats", "a") for _ in range(2)]
+        self.assertTrue(all(d.admitted for d in asks))
+        self.assertEqual(ctl.admit("GET", "/api/stats", "a").status, 503)
+        for d in asks:
+            d.release()
+            d.release()  # a second release is a no-op
+        self.assertEqual(ctl.stats()["in_flight"], {"interactive": 0, "bulk": 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+
+from gridgent.batch import COLUMNS, JsonlWriter, main, read_records, run_batch
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _jsonl_input(self, n):
+        path = self.tmp / "in.jsonl"
+        with path.open("w", encoding="utf-8") as fh:
+            for i in range(n):
+                fh.write(json.dumps({"request_id": f"r{i}", "query": f"What if we add {i + 1} MW of load on F1?"}) + "\n")
+        return path
+
+    def _rows(self, path):
+        return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+    def test_csv_scenarios_are_turned_into_questions(self):
+        path = self.tmp / "in.csv"
+        with path.open("w", encoding="utf-8", newline="") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["feeder", "added_pv_mw", "added_load_mw"])
+            writer.writerow(["F2", "3", "0"])
+            writer.writerow(["F1", "0", "2.5"])
+        out = self.tmp / "out.jsonl"
+        report = run_batch(path, out, workers=1)
+        self.assertEqual(report["rows"], 2)
+        self.assertEqual(report["errors"], 0)
+
+        first, second = self._rows(out)
+        self.assertEqual((first["feeder"], first["added_pv_mw"]), ("F2", 3.0))
+        self.assertEqual((second["feeder"], second["added_load_mw"]), ("F1", 2.5))
+        self.assertIsNotNone(second["peak_loading_pct"])
+        self.assertEqual(second["status"], "ok")
+
+    def test_resume_skips_completed_rows_and_drops_torn_line(self):
+        src = self._jsonl_input(6)
+        out = self.tmp / "out.jsonl"
+        run_batch(src, out, workers=1)
+        lines = out.read_text(encoding="utf-8").splitlines(keepends=True)
+        # Simulate an interruption part-way through writing the fourth row.
+        out.write_text("".join(lines[:3]) + lines[3][:10], encoding="utf-8")
+        self.assertEqual(JsonlWriter(out).completed(), 3)
+
+        report = run_batch(src, out, workers=1, resume=True)
+        self.assertEqual((report["skipped"], report["rows"]), (3, 3))
+        self.assertEqual([row["id"] for row in self._rows(out)], [f"r{i}" for i in range(6)])
+
+    def test_worker_pool_keeps_input_order(self):
+        src = self._jsonl_input(10)
+        out = self.tmp / "out.jsonl"
+        report = run_batch(src, out, workers=2, chunk_size=3)
+        self.assertEqual(report["rows"], 10)
+        self.assertEqual([row["index"] for row in self._rows(out)], list(range(10)))
+
+    def test_bad_records_become_error_rows(self):
+        src = self.tmp / "in.jsonl"
+        src.write_text('{"query": "Add 1 MW of PV on F3"}\n{"note": "nothing to ask"}\n', encoding="utf-8")
+        out = self.tmp / "out.jsonl"
+        report = run_batch(src, out, workers=1)
+        self.assertEqual(report["errors"], 1)
+        self.assertIn("no 'query'", self._rows(out)[1]["error"])
+
+    def test_columnar_parts_and_resume(self):
+        src = self._jsonl_input(5)
+        out = self.tmp / "cols"
+        run_batch(src, out, fmt="columnar", workers=1, rows_per_part=2)
+        parts = sorted(out.glob("part-*"))
+        self.assertEqual(len(parts), 3)
+        if parts[0].suffix == ".csv":
+            with parts[0].open(encoding="utf-8", newline="") as fh:
+                self.assertEqual(tuple(next(csv.reader(fh))), COLUMNS)
+
+        parts[-1].unlink()
+        report = run_batch(src, out, fmt="columnar", workers=1, rows_per_part=2, resume=True)
+        self.assertEqual((report["skipped"], report["rows"]), (4, 1))
+
+    def test_invalid_json_line_is_reported(self):
+        src = self.tmp / "in.jsonl"
+        src.write_text('{"query": "hi"}\nnot json\n', encoding="utf-8")
+        with self.assertRaises(ValueError):
+            list(read_records(src))
+
+    def test_cli_prints_throughput_report(self):
+        src = self._jsonl_input(2)
+        out = self.tmp / "out.jsonl"
+        buf = io.StringIO()
+        with mock.patch("sys.stdout", buf):
+            code = main([str(src), "-o", str(out), "--workers", "1", "--quiet"])
+        self.assertEqual(code, 0)
+        report = json.loads(buf.getvalue())
+        self.assertEqual(report["rows"], 2)
+        self.assertIn("rows_per_s", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,217 @@
+import os
+import socketserver
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from gridgent.core import cache as cache_mod
+from gridgent.core.cache import (
+    Cache,
+    LocalBackend,
+    MmapBackend,
+    RespBackend,
+    cache_from_url,
+    decode,
+    decode_json,
+    encode,
+    encode_json,
+)
+from gridgent.core.orchestrator import GridGentOrchestrator
+from gridgent.tools import grid_stub
+
+
+class _FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Enough of RESP2 for the client: PING, AUTH, SELECT, GET, SET [PX ms], DEL."""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            n = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(n + 2)[:-2])
+        return args
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            cmd = args[0].upper()
+            if cmd == b"GET" and args[1] == b"malformed":
+                self.wfile.write(b"$many\r\n")
+            elif cmd == b"GET":
+                value, expires = store.get(args[1], (None, 0))
+                if value is None or (expires and expires < time.time()):
+                    self.wfile.write(b"$-1\r\n")
+                else:
+                    self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+            elif cmd == b"SET":
+                expires = time.time() + int(args[4]) / 1000.0 if len(args) > 4 else 0
+                store[args[1]] = (args[2], expires)
+                self.wfile.write(b"+OK\r\n")
+            elif cmd == b"DEL":
+                self.wfile.write(b":%d\r\n" % int(store.pop(args[1], None) is not None))
+            elif cmd in (b"PING", b"AUTH", b"SELECT"):
+                self.wfile.write(b"+PONG\r\n" if cmd == b"PING" else b"+OK\r\n")
+            else:
+                self.wfile.write(b"-ERR unknown command\r\n")
+
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _FakeRedisHandler)
+        self.store = {}
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class TestEncoding(unittest.TestCase):
+    def test_round_trip_and_rejects(self):
+        value = {"a": [1, 2.5, None, True], "b": ("x", {"c": -1})}
+        self.assertEqual(decode(encode(value)), value)
+        with self.assertRaises(ValueError):
+            encode(object())
+        with self.assertRaises(ValueError):
+            decode(b"XX" + encode(value)[2:])
+
+    def test_json_round_trip_and_rejects(self):
+        value = {"a": [1, 2.5, None, True], "b": ["x", {"c": -1}]}
+        self.assertEqual(decode_json(encode_json(value)), value)
+        self.assertEqual(decode_json(encode_json(("x", 1))), ["x", 1])
+        with self.assertRaises(ValueError):
+            encode_json(object())
+        with self.assertRaises(ValueError):
+            decode_json(encode(value))
+
+
+class TestBackends(unittest.TestCase):
+    def test_local_lru_and_ttl(self):
+        backend = LocalBackend(max_items=2)
+        backend.set("a", b"1", 60)
+        backend.set("b", b"2", 60)
+        backend.get("a")
+        backend.set("c", b"3", 60)
+        self.assertEqual((backend.get("a"), backend.get("b"), backend.get("c")), (b"1", None, b"3"))
+        backend.set("d", b"4", -1)
+        self.assertIsNone(backend.get("d"))
+
+    def test_mmap_is_shared_with_forked_workers(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = MmapBackend(str(Path(tmp) / "cache.mmap"), slots=64, slot_size=256)
+            pid = os.fork()
+            if pid == 0:  # worker: write through its own mapping of the file
+                other = MmapBackend(str(Path(tmp) / "cache.mmap"), slots=64, slot_size=256)
+                other.set("k", b"from-child", 60)
+                os._exit(0)
+            os.waitpid(pid, 0)
+            self.assertEqual(backend.get("k"), b"from-child")
+            self.assertFalse(backend.set("big", b"x" * 512, 60))
+            backend.delete("k")
+            self.assertIsNone(backend.get("k"))
+            backend.close()
+
+    def test_mmap_torn_slot_is_a_miss(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            backend = MmapBackend(str(Path(tmp) / "cache.mmap"), slots=4, slot_size=128)
+            backend.set("k", b"value", 60)
+            _, offset = backend._locate("k")
+            backend._mm[offset + cache_mod._SLOT.size] ^= 0xFF  # corrupt the payload behind the header
+            self.assertIsNone(backend.get("k"))
+            backend.close()
+
+    def test_resp_client_against_fake_server(self):
+        server = FakeRedis()
+        try:
+            port = server.server_address[1]
+            c = cache_from_url(f"redis://:secret@127.0.0.1:{port}/1")
+            self.assertTrue(c.set("plan", "v1", ("k", "full"), {"x": 1}))
+            self.assertEqual(c.get("plan", "v1", ("k", "full")), {"x": 1})
+            self.assertIsNone(c.get("plan", "v2", ("k", "full")))
+            self.assertEqual(c.stats()["hits"], 1)
+            c.backend.delete(Cache.key("plan", "v1", ("k", "full")))
+            self.assertIsNone(c.get("plan", "v1", ("k", "full")))
+            c.backend.close()
+        finally:
+            server.stop()
+
+    def test_shared_backends_never_unmarshal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            c = Cache(MmapBackend(str(Path(tmp) / "cache.mmap"), slots=64, slot_size=256))
+            self.assertTrue(c.set("plan", "v1", "k", ("ok", {"x": 1})))
+            self.assertEqual(c.get("plan", "v1", "k"), ["ok", {"x": 1}])
+            # A marshal blob planted by another writer is a miss, not something to load.
+            c.backend.set(Cache.key("plan", "v1", "evil"), encode({"x": 1}), 60)
+            with mock.patch.object(cache_mod.marshal, "loads") as loads:
+                self.assertIsNone(c.get("plan", "v1", "evil"))
+            loads.assert_not_called()
+            c.backend.close()
+
+    def test_resp_malformed_reply_is_a_miss(self):
+        server = FakeRedis()
+        try:
+            backend = RespBackend(port=server.server_address[1], retry_after_s=60)
+            self.assertIsNone(backend.get("malformed"))
+            self.assertEqual(backend.stats()["errors"], 1)
+            self.assertEqual(backend._idle, [])  # the desynchronized connection was dropped
+            backend.close()
+        finally:
+            server.stop()
+
+    def test_resp_outage_is_a_miss_and_backs_off(self):
+        server = FakeRedis()
+        port = server.server_address[1]
+        server.stop()
+        backend = RespBackend(port=port, retry_after_s=60)
+        self.assertIsNone(backend.get("k"))
+        self.assertFalse(backend.set("k", b"v", 10))
+        self.assertEqual(backend.stats()["errors"], 1)  # the second call was skipped
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            cache_from_url("memcached://localhost")
+        self.assertIsNone(cache_from_url("none"))
+
+
+class TestOrchestratorCache(unittest.TestCase):
+    def test_plan_results_come_from_cache(self):
+        orch = GridGentOrchestrator(cache=Cache(LocalBackend()))
+        first = orch.run("Simulate adding 3 MW of load on feeder F1")
+        with mock.patch.object(orch.planning_agent, "plan_and_analyze") as plan:
+            second = orch.run("simulate adding 3 mw of load on feeder f1")
+        plan.assert_not_called()
+        self.assertIsNotNone(second.steps[-1].meta["reused_from"])
+        self.assertEqual(first.answer.splitlines()[1:], second.answer.splitlines()[1:])
+        self.assertEqual([s.to_dict() for s in first.steps[1:-1]], [s.to_dict() for s in second.steps[1:-1]])
+
+
+class TestSharedConfig(unittest.TestCase):
+    def test_workers_share_parsed_config_and_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = Cache(MmapBackend(str(Path(tmp) / "cache.mmap"), slots=64, slot_size=64 << 10))
+            with mock.patch.object(cache_mod, "shared_cache", return_value=shared):
+                grid_stub.reload_feeder_config()
+                version = grid_stub.get_config_version()
+                self.assertGreaterEqual(shared.stats()["sets"], 1)
+
+                grid_stub.reload_feeder_config()
+                with mock.patch.object(grid_stub, "_parse_feeder_config") as parse:
+                    self.assertEqual(grid_stub.get_config_version(), version)
+                parse.assert_not_called()
+            shared.backend.close()
+        grid_stub.reload_feeder_config()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import threading
+import time
+
+from gridgent.core.coalesce import SingleFlight, scenario_key
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+        gate = threading.Event()
+
+        def slow():
+            calls.append(1)
+            gate.wait(2.0)
+            return {"value": 42}
+
+        results = []
+
+        def worker():
+            results.append(flight.do("k", slow))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        gate.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r[0] == {"value": 42} for r in results))
+        self.assertEqual(sum(1 for _, shared in results if shared), 7)
+        stats = flight.stats()
+        self.assertEqual(stats["executions"], 1)
+        self.assertEqual(stats["coalesced"], 7)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_errors_propagate_and_are_not_cached(self):
+        flight = SingleFlight()
+
+        def boom():
+            raise RuntimeError("solver failed")
+
+        with self.assertRaises(RuntimeError):
+            flight.do("k", boom)
+        self.assertEqual(flight.do("k", lambda: 1), (1, False))
+
+    def test_scenario_key_normalizes(self):
+        a = {"intent": "simulation", "feeder": "F1", "added_pv_mw": 0.0, "added_load_mw": 3.0, "has_mw": True}
+        b = dict(a, added_load_mw=3)
+        self.assertEqual(scenario_key("Add 3 MW on F1", a, "v1"), scenario_key("add 3 mw to f1 please", b, "v1"))
+        self.assertNotEqual(scenario_key("x", a, "v1"), scenario_key("x", a, "v2"))
+
+
+if __name__ == "__main__":
+    unittest.main()
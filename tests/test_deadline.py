@@ -0,0 +1,116 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from gridgent.core.cache import Cache, LocalBackend
+from gridgent.core.deadline import Deadline, DeadlineExceeded, deadline_scope, mark_partial
+from gridgent.core.history import HistoryStore
+from gridgent.core.orchestrator import GridGentOrchestrator
+from gridgent.tools import forecast as forecast_mod
+from gridgent.tools.forecast import GrowthAssumptions, project_feeders
+from gridgent.tools.screening import screen_feeders
+
+
+def _spent():
+    deadline = Deadline(1000)
+    deadline.expires_at = time.monotonic() - 1.0
+    return deadline
+
+
+FLEET = {f"D{i}": {"name": f"D{i}", "peak_mw": 5.0 + i % 7, "pv_mw": 1.0} for i in range(3000)}
+
+
+class TestDeadline(unittest.TestCase):
+    def test_budget(self):
+        self.assertFalse(Deadline().expired)
+        self.assertEqual(Deadline(None).to_dict()["remaining_ms"], None)
+        with self.assertRaises(DeadlineExceeded):
+            _spent().check("planning")
+
+    def test_screening_returns_best_so_far(self):
+        with deadline_scope(_spent()) as deadline:
+            result = screen_feeders(added_pv_mw=1.0, feeders=FLEET)
+        self.assertTrue(result.partial)
+        self.assertEqual((result.num_screened, result.num_feeders), (1024, 3000))
+        self.assertEqual(len(result.worst_loading), 5)
+        self.assertEqual(deadline.partial, ["fleet_screening"])
+        self.assertFalse(screen_feeders(feeders=FLEET).partial)
+
+    def test_forecast_skips_remaining_chunks(self):
+        with mock.patch.object(forecast_mod, "_CHUNK_FEEDERS", 100), deadline_scope(_spent()) as deadline:
+            rows = project_feeders(GrowthAssumptions(load_growth_pct=2.0, horizon_years=5), FLEET)
+        self.assertEqual(len(rows), 100)
+        self.assertEqual(deadline.partial, ["load_forecast"])
+
+
+class TestOrchestratorDeadline(unittest.TestCase):
+    def setUp(self):
+        self.orch = GridGentOrchestrator(cache=Cache(LocalBackend()))
+
+    def test_nothing_to_return_raises(self):
+        classify = self.orch.intent_agent.classify
+
+        def slow(query):
+            time.sleep(0.05)
+            return classify(query)
+
+        with mock.patch.object(self.orch.intent_agent, "classify", side_effect=slow):
+            with self.assertRaises(DeadlineExceeded):
+                self.orch.run("Simulate adding 3 MW of load on feeder F1", deadline_ms=10)
+
+    def test_partial_answer_is_flagged_and_not_cached(self):
+        query = "Which regulator tap fixes over-voltage on F2 with 12 MW of PV?"
+        with mock.patch("gridgent.agents.planning.expired", return_value=True):
+            result = self.orch.run(query, deadline_ms=60000)
+        self.assertEqual(result.partial, ["voltage_control"])
+        self.assertEqual(result.to_dict()["partial"], ["voltage_control"])
+        self.assertIn("partial", result.answer)
+        self.assertEqual(result.steps[-1].meta["status"], "partial")
+        self.assertEqual(self.orch.cache.stats()["sets"], 0)
+
+        full = self.orch.run(query, deadline_ms=60000)
+        self.assertEqual(full.partial, [])
+        self.assertNotIn("partial", full.to_dict())
+
+    def test_followers_do_not_inherit_a_partial_answer(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = HistoryStore(Path(tmp) / "history.sqlite3")
+            orch = GridGentOrchestrator(history=store)
+            query = "Which regulator tap fixes over-voltage on F2 with 12 MW of PV?"
+            plan = orch.planning_agent.plan_and_analyze
+            started, release = threading.Event(), threading.Event()
+            calls = []
+
+            def leader_runs_out(*args, **kwargs):
+                calls.append(1)
+                if len(calls) == 1:
+                    started.set()
+                    release.wait(5)
+                    mark_partial("voltage_control")
+                return plan(*args, **kwargs)
+
+            results = {}
+            with mock.patch.object(orch.planning_agent, "plan_and_analyze", side_effect=leader_runs_out):
+                leader = threading.Thread(target=lambda: results.setdefault("leader", orch.run(query, deadline_ms=60000)))
+                leader.start()
+                started.wait(5)
+                follower = threading.Thread(target=lambda: results.setdefault("follower", orch.run(query, deadline_ms=60000)))
+                follower.start()
+                while orch.coalescer.stats()["coalesced"] < 1:
+                    time.sleep(0.001)
+                release.set()
+                leader.join()
+                follower.join()
+
+            self.assertEqual(results["leader"].partial, ["voltage_control"])
+            self.assertEqual(results["follower"].partial, [])
+            self.assertEqual(len(calls), 2)
+            store.flush()
+            self.assertEqual([row["status"] for row in store.history()], ["ok"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import csv
+import io
+import unittest
+
+from gridgent.tools import export
+from gridgent.tools.export import EXPORT_COLUMNS, fleet_rows, scenario_rows, sweep_scenarios, write_rows
+from gridgent.tools.grid_stub import evaluate_feeder_metrics
+
+
+class TestExport(unittest.TestCase):
+    def test_fleet_rows_are_batched_and_cover_every_feeder(self):
+        feeders = {f"X{i}": {"peak_mw": 5.0 + i, "pv_mw": 1.0} for i in range(10)}
+        batches = list(fleet_rows(added_load_mw=2.0, feeders=feeders, batch_rows=4))
+        self.assertEqual([len(b) for b in batches], [4, 4, 2])
+        row = batches[0][1]
+        loading, vmin, vmax = evaluate_feeder_metrics(6.0, 1.0, 0.0, 2.0)
+        self.assertEqual(row["feeder"], "X1")
+        self.assertEqual(row["peak_loading_pct"], round(loading, 1))
+        self.assertEqual(row["min_voltage_pu"], round(vmin, 3))
+
+    def test_csv_stream(self):
+        out = io.BytesIO()
+        specs = sweep_scenarios(["F1", "F2"], [0.0, 5.0], [1.0])
+        count = write_rows(scenario_rows(specs, batch_rows=3), out, "csv")
+        self.assertEqual(count, 4)
+        rows = list(csv.DictReader(io.StringIO(out.getvalue().decode("utf-8"))))
+        self.assertEqual(tuple(rows[0]), EXPORT_COLUMNS)
+        self.assertEqual([(r["feeder"], r["added_pv_mw"]) for r in rows], [("F1", "0.0"), ("F1", "5.0"), ("F2", "0.0"), ("F2", "5.0")])
+        self.assertFalse(out.closed)
+
+    def test_sweep_is_bounded(self):
+        with self.assertRaises(ValueError):
+            sweep_scenarios(["F1"], [], [1.0])
+        with self.assertRaises(ValueError):
+            sweep_scenarios(["F1"], range(10_000), range(10_000))
+
+    def test_columnar_formats_need_pyarrow(self):
+        if export.pa is not None:
+            self.skipTest("pyarrow installed")
+        self.assertEqual(export.available_formats(), ["csv"])
+        with self.assertRaises(ValueError):
+            write_rows(iter(()), io.BytesIO(), "parquet")
+
+    @unittest.skipUnless(export.pa is not None, "pyarrow not installed")
+    def test_arrow_stream_round_trip(self):
+        out = io.BytesIO()
+        write_rows(fleet_rows(added_pv_mw=1.0, batch_rows=2), out, "arrow")
+        table = export.pa.ipc.open_stream(out.getvalue()).read_all()
+        self.assertEqual(tuple(table.column_names), EXPORT_COLUMNS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from gridgent.tools import grid_stub
+from gridgent.tools.feeder_index import FeederIndex, get_feeder_index
+from gridgent.tools.hosting_map import HostingCapacityTable
+
+
+class TestFeederDelta(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = Path(self.tmp.name)
+        (base / "config").mkdir()
+        (base / "config" / "feeders.json").write_text(json.dumps(grid_stub._default_feeder_config()))
+        self.patch = mock.patch.object(grid_stub, "_BASE_DIR", base)
+        self.patch.start()
+        grid_stub.reload_feeder_config()
+        self.log = base / "config" / "uploaded_feedermodel.log.jsonl"
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+        grid_stub.reload_feeder_config()
+
+    def test_partial_update_is_logged_and_replayed(self):
+        old_version = grid_stub.get_config_version()
+        delta = grid_stub.apply_feeder_delta({"f2": {"pv_mw": 6.5}, "F9": {"peak_mw": 4.0}}, remove=["F3"])
+        self.assertEqual(delta["changed"], ["F2", "F9"])
+        self.assertEqual(delta["removed"], ["F3"])
+        self.assertNotEqual(delta["config_version"], old_version)
+        self.assertEqual(grid_stub.get_config_version(), delta["config_version"])
+
+        feeders = grid_stub.get_all_feeders()
+        self.assertEqual(feeders["F2"]["pv_mw"], 6.5)
+        self.assertEqual(feeders["F2"]["num_customers"], 5100)
+        self.assertNotIn("F3", feeders)
+        self.assertEqual(len(self.log.read_text().splitlines()), 1)
+
+        grid_stub.reload_feeder_config()
+        self.assertEqual(grid_stub.get_all_feeders(), feeders)
+
+    def test_feeder_index_is_patched_not_rebuilt(self):
+        index = get_feeder_index()
+        delta = grid_stub.apply_feeder_delta({"F1": {"peak_mw": 30.0}, "F7": {"peak_mw": 14.3}}, remove=["F3"])
+
+        patched = get_feeder_index()
+        self.assertIsNot(patched, index)
+        self.assertEqual(patched.version, delta["config_version"])
+        fresh = FeederIndex(grid_stub.get_all_feeders())
+        self.assertEqual(patched._ids, fresh._ids)
+        self.assertEqual(patched._values, fresh._values)
+
+    def test_hosting_table_update_matches_rebuild(self):
+        table = HostingCapacityTable.build(grid_stub.get_all_feeders(), version="v0")
+        grid_stub.apply_feeder_delta({"F1": {"peak_mw": 30.0}, "F7": {"peak_mw": 14.3}}, remove=["F3"])
+        feeders = grid_stub.get_all_feeders()
+        patched = table.updated({fid: feeders[fid] for fid in ("F1", "F7")}, ["F3"], version="v1")
+
+        self.assertEqual(patched.built_at, table.built_at)
+        self.assertNotIn("F3", patched)
+        self.assertIn("F3", table)
+        fresh = HostingCapacityTable.build(feeders)
+        for fid in ("F1", "F2", "F7"):
+            expected = fresh.lookup(fid, 2.0, 1.0)
+            got = patched.lookup(fid, 2.0, 1.0)
+            for key in ("pv_hosting_capacity_mw", "peak_loading_pct", "min_voltage_pu", "max_voltage_pu"):
+                self.assertEqual(got[key], expected[key])
+
+    def test_compaction_folds_log_into_model(self):
+        with mock.patch.object(grid_stub, "LOG_COMPACT_EVERY", 2):
+            grid_stub.apply_feeder_delta({"F1": {"pv_mw": 2.0}})
+            self.assertTrue(self.log.exists())
+            grid_stub.apply_feeder_delta({"F2": {"pv_mw": 3.0}})
+        self.assertFalse(self.log.exists())
+        saved = json.loads((self.log.parent / "uploaded_feedermodel.json").read_text())
+        self.assertEqual(saved["feeders"]["F1"]["pv_mw"], 2.0)
+        self.assertEqual(saved["feeders"]["F2"]["pv_mw"], 3.0)
+
+    def test_failed_upload_keeps_model_and_log(self):
+        grid_stub.apply_feeder_delta({"F1": {"pv_mw": 2.0}})
+        with mock.patch.object(grid_stub.os, "replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                grid_stub.save_uploaded_grid({"feeders": {"U1": {"peak_mw": 1.0}}})
+        self.assertTrue(self.log.exists())
+        grid_stub.reload_feeder_config()
+        self.assertEqual(grid_stub.get_all_feeders()["F1"]["pv_mw"], 2.0)
+
+        grid_stub.save_uploaded_grid({"feeders": {"U1": {"peak_mw": 1.0}}})
+        self.assertFalse(self.log.exists())
+        self.assertEqual(list(grid_stub.get_all_feeders()), ["U1"])
+
+    def test_invalid_delta_changes_nothing(self):
+        version = grid_stub.get_config_version()
+        with self.assertRaises(ValueError):
+            grid_stub.apply_feeder_delta({"F1": {"peak_mw": "lots"}})
+        with self.assertRaises(ValueError):
+            grid_stub.apply_feeder_delta({"F1": {"peak_mw": 1.0}}, remove=["F1"])
+        for remove in ("F1", 5, [5], {"F1": True}):
+            with self.assertRaises(ValueError):
+                grid_stub.apply_feeder_delta(remove=remove)
+        self.assertEqual(grid_stub.get_config_version(), version)
+        self.assertFalse(self.log.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
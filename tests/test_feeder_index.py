@@ -0,0 +1,55 @@
+import unittest
+import random
+
+from gridgent.tools.feeder_index import FeederIndex, parse_predicates
+
+
+def _synthetic_feeders(n, seed=11):
+    rng = random.Random(seed)
+    return {
+        f"I{i}": {
+            "name": f"Indexed I{i}",
+            "base_kv": 13.8,
+            "num_customers": rng.randint(100, 6000),
+            "peak_mw": round(rng.uniform(2.0, 30.0), 2),
+            "pv_mw": round(rng.uniform(0.0, 8.0), 2),
+        }
+        for i in range(n)
+    }
+
+
+class TestFeederIndex(unittest.TestCase):
+    def setUp(self):
+        self.feeders = _synthetic_feeders(3000)
+        self.index = FeederIndex(self.feeders, version="test")
+
+    def test_compound_query_matches_scan(self):
+        predicates = {"pv_mw": (3.0, None), "peak_mw": (10.0, 20.0), "num_customers": (None, 4000)}
+        got = set(self.index.query(predicates))
+        expected = {
+            fid
+            for fid, m in self.feeders.items()
+            if m["pv_mw"] >= 3.0 and 10.0 <= m["peak_mw"] <= 20.0 and m["num_customers"] <= 4000
+        }
+        self.assertEqual(got, expected)
+
+    def test_range_and_limit(self):
+        ids = self.index.range("peak_mw", 29.0)
+        self.assertTrue(all(self.feeders[fid]["peak_mw"] >= 29.0 for fid in ids))
+        self.assertEqual(len(self.index.query({"pv_mw": (0.0, None)}, limit=7)), 7)
+        self.assertEqual(len(self.index.query({}, limit=1)), 1)
+        for limit in (0, -1):
+            with self.assertRaises(ValueError):
+                self.index.query({}, limit=limit)
+            with self.assertRaises(ValueError):
+                self.index.query({"pv_mw": (0.0, None)}, limit=limit)
+
+    def test_parse_predicates(self):
+        preds = parse_predicates({"pv_mw_min": "3", "loading_pct_max": "90", "limit": "5"})
+        self.assertEqual(preds, {"pv_mw": (3.0, None), "loading_pct": (None, 90.0)})
+        with self.assertRaises(ValueError):
+            parse_predicates({"voltage_min": "1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from gridgent.tools.forecast import GrowthAssumptions, project_feeders
+from gridgent.tools.grid_stub import evaluate_feeder_metrics
+
+
+class TestForecast(unittest.TestCase):
+    def test_first_crossing_years_match_compound_growth(self):
+        feeders = {"A": {"peak_mw": 10.0, "pv_mw": 1.0}, "B": {"peak_mw": 10.0, "pv_mw": 1.0}}
+        growth = GrowthAssumptions(load_growth_pct=5.0, horizon_years=10)
+        a, _ = project_feeders(growth, feeders, trajectory=True, start_year=2000)
+        # Loading is 100 * 10 * 1.05^t / 12: above 95% from t=3 and above 100% from t=4.
+        self.assertEqual(a["first_year"]["thermal_warning"], 2003)
+        self.assertEqual(a["first_year"]["overload"], 2004)
+        self.assertIsNone(a["first_year"]["over_voltage"])
+
+        year5 = a["trajectory"][5]
+        loading, _, _ = evaluate_feeder_metrics(10.0, 1.0, added_load_mw=10.0 * (1.05 ** 5 - 1))
+        self.assertEqual(year5["year"], 2005)
+        self.assertAlmostEqual(year5["peak_loading_pct"], round(loading, 1))
+
+    def test_pv_growth_and_ev_load(self):
+        growth = GrowthAssumptions(pv_growth_pct=20.0, ev_mw_per_year=0.5, horizon_years=20)
+        (entry,) = project_feeders(growth, {"C": {"peak_mw": 12.0, "pv_mw": 2.0}}, start_year=2000)
+        self.assertIsNotNone(entry["first_year"]["over_voltage"])
+        self.assertEqual(entry["final"]["year"], 2020)
+
+    def test_horizon_is_bounded(self):
+        with self.assertRaises(ValueError):
+            GrowthAssumptions(horizon_years=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from gridgent.core.history import HistoryStore
+from gridgent.core.orchestrator import GridGentOrchestrator
+from gridgent.tools import grid_stub
+
+
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = HistoryStore(Path(self.tmp.name) / "history.sqlite3")
+        self.orch = GridGentOrchestrator(history=self.store)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_answers_are_recorded_with_timings(self):
+        started = time.time()
+        self.orch.run("What happens on feeder F2 if we add 5 MW of rooftop PV?")
+        self.orch.run("Simulate adding 3 MW of load on feeder F1")
+        self.store.flush()
+
+        rows = self.store.history(feeder="f2", since=started)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["intent"], "hosting_capacity")
+        self.assertEqual(rows[0]["summary"]["power_flow"]["feeder"], "F2")
+        self.assertIn("planning_ms", rows[0]["timings_ms"])
+        self.assertEqual(len(self.store.history()), 2)
+        self.assertEqual(self.store.stats()["written"], 2)
+
+    def test_identical_scenario_reuses_stored_result(self):
+        first = self.orch.run("Simulate adding 3 MW of load on feeder F1")
+        self.store.flush()
+        second = self.orch.run("simulate adding 3 mw of load on feeder f1")
+
+        self.assertIsNone(first.steps[-1].meta["reused_from"])
+        self.assertIsNotNone(second.steps[-1].meta["reused_from"])
+        self.assertEqual(first.answer.splitlines()[1:], second.answer.splitlines()[1:])
+        self.assertEqual([s.content for s in first.steps[1:]], [s.content for s in second.steps[1:]])
+
+    def test_writer_prunes_old_and_excess_rows(self):
+        store = HistoryStore(Path(self.tmp.name) / "pruned.sqlite3", max_age_s=3600, max_rows=3)
+        store.PRUNE_EVERY_S = 0.0
+        now = time.time()
+        for i in range(6):
+            created = now - 7200 if i == 0 else now + i
+            store.record({"task_id": f"t{i}", "created_at": created, "query": f"q{i}", "feeders": ["F1"]})
+            store.flush()
+        self.assertEqual([r["task_id"] for r in store.history(limit=10)], ["t5", "t4", "t3"])
+        feeders = store._reader().execute("SELECT COUNT(*) FROM result_feeders").fetchone()[0]
+        self.assertEqual(feeders, 3)
+        self.assertEqual(store.stats()["pruned"], 3)
+
+    def test_reuse_requires_same_config_version(self):
+        self.orch.run("Simulate adding 3 MW of load on feeder F1")
+        self.store.flush()
+        key_hash = self.store._reader().execute("SELECT scenario_hash FROM results").fetchone()[0]
+        self.assertIsNone(self.store.find_reusable(key_hash, "other-version"))
+
+
+class TestPerFeederReuse(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = Path(self.tmp.name)
+        (base / "config").mkdir()
+        (base / "config" / "feeders.json").write_text(json.dumps(grid_stub._default_feeder_config()))
+        self.patch = mock.patch.object(grid_stub, "_BASE_DIR", base)
+        self.patch.start()
+        grid_stub.reload_feeder_config()
+        self.store = HistoryStore(base / "history.sqlite3")
+        self.orch = GridGentOrchestrator(history=self.store)
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+        grid_stub.reload_feeder_config()
+
+    def reused(self, query):
+        self.store.flush()
+        return self.orch.run(query).steps[-1].meta["reused_from"] is not None
+
+    def test_delta_only_invalidates_answers_about_changed_feeders(self):
+        query = "Simulate adding 3 MW of load on feeder F1"
+        self.assertFalse(self.reused(query))
+        self.assertFalse(self.reused("Screen all feeders"))
+        grid_stub.apply_feeder_delta({"F2": {"pv_mw": 9.0}})
+        self.assertTrue(self.reused(query))
+        # Fleet-wide answers read every feeder, so any delta invalidates them.
+        self.assertFalse(self.reused("Screen all feeders"))
+        grid_stub.apply_feeder_delta({"F1": {"peak_mw": 19.0}})
+        self.assertFalse(self.reused(query))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from gridgent.tools.hosting_map import HostingCapacityTable, refresh_hosting_table, get_hosting_table
+from gridgent.tools.grid_stub import evaluate_feeder_metrics, get_config_version
+
+
+FEEDERS = {
+    "H1": {"name": "Hosting H1", "base_kv": 13.8, "num_customers": 1000, "peak_mw": 12.0, "pv_mw": 2.0},
+    "H2": {"name": "Hosting H2", "base_kv": 13.8, "num_customers": 500, "peak_mw": 6.0, "pv_mw": 0.2},
+}
+
+
+class TestHostingMap(unittest.TestCase):
+    def setUp(self):
+        self.table = HostingCapacityTable.build(FEEDERS, version="test")
+
+    def test_voltage_limited_capacity(self):
+        # max_voltage = 1.03 + 0.01 * pv / pv_base reaches 1.05 at pv = 2 * pv_base.
+        row = self.table.lookup("H1")
+        self.assertAlmostEqual(row["pv_hosting_capacity_mw"], 4.0, places=2)
+        self.assertEqual(row["pv_limiting_factor"], "voltage")
+        row = self.table.lookup("H2")
+        self.assertAlmostEqual(row["pv_hosting_capacity_mw"], 1.0, places=2)
+
+    def test_interpolated_lookup_matches_model(self):
+        row = self.table.lookup("H1", added_pv_mw=2.25, added_load_mw=3.5)
+        loading, vmin, vmax = evaluate_feeder_metrics(12.0, 2.0, 2.25, 3.5)
+        self.assertAlmostEqual(row["peak_loading_pct"], round(loading, 1), places=1)
+        self.assertAlmostEqual(row["min_voltage_pu"], round(vmin, 3), places=3)
+        self.assertAlmostEqual(row["max_voltage_pu"], round(vmax, 3), places=3)
+        self.assertEqual(row["table_version"], "test")
+
+    def test_refresh_publishes_current_version(self):
+        table = refresh_hosting_table()
+        self.assertEqual(table.version, get_config_version())
+        self.assertIs(get_hosting_table(), table)
+
+
+if __name__ == "__main__":
+    unittest.main()
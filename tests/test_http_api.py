@@ -2,7 +2,9 @@ import unittest
 import threading
 import time
 import json
+import urllib.error
 import urllib.request
+from unittest import mock
 
 from app.server import run_server
 
@@ -33,6 +35,136 @@ class TestHTTPAPI(unittest.TestCase):
             self.assertIn("steps", data)
             self.assertIsInstance(data["steps"], list)
 
+    def test_api_ask_session_follow_up(self):
+        def ask(payload):
+            req = urllib.request.Request(
+                "http://127.0.0.1:8765/api/ask",
+                data=json.dumps(payload).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(req, timeout=5) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+
+        first = ask({"query": "Simulate adding 3 MW of load on feeder F3", "session": True})
+        follow = ask({"query": "What about 6 MW?", "session_id": first["session_id"]})
+        self.assertEqual(follow["session_id"], first["session_id"])
+        intent = [s for s in follow["steps"] if s["role"] == "intent_agent"][-1]["meta"]
+        self.assertEqual((intent["feeder"], intent["added_load_mw"]), ("F3", 6.0))
+
+    def test_api_ask_deadline(self):
+        def ask(payload):
+            req = urllib.request.Request(
+                "http://127.0.0.1:8765/api/ask",
+                data=json.dumps(payload).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(req, timeout=5)
+            return ctx.exception.code
+
+        slow = mock.Mock()
+        slow.run.side_effect = lambda *args, **kwargs: time.sleep(1.0)
+        with mock.patch("app.server.get_orchestrator", return_value=slow):
+            started = time.monotonic()
+            self.assertEqual(ask({"query": "Screen all feeders", "timeout_ms": 50}), 504)
+            self.assertLess(time.monotonic() - started, 0.9)
+        self.assertEqual(ask({"query": "Screen all feeders", "timeout_ms": "soon"}), 400)
+
+    def test_api_admin_profile_returns_collapsed_stacks(self):
+        with urllib.request.urlopen("http://127.0.0.1:8765/api/admin/profile", timeout=5) as resp:
+            self.assertEqual(resp.status, 200)
+            self.assertTrue(resp.headers["Content-Type"].startswith("text/plain"))
+
+    def test_api_rejects_oversized_body(self):
+        req = urllib.request.Request(
+            "http://127.0.0.1:8765/api/ask",
+            data=json.dumps({"query": "x" * (1 << 20)}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(req, timeout=5)
+        self.assertEqual(ctx.exception.code, 413)
+
+    def test_api_rejects_negative_content_length(self):
+        import http.client
+
+        conn = http.client.HTTPConnection("127.0.0.1", 8765, timeout=5)
+        try:
+            conn.putrequest("POST", "/api/ask")
+            conn.putheader("Content-Type", "application/json")
+            conn.putheader("Content-Length", "-1")
+            conn.endheaders()
+            conn.send(json.dumps({"query": "Screen all feeders"}).encode("utf-8"))
+            resp = conn.getresponse()
+            self.assertEqual(resp.status, 400)
+            self.assertIn("Content-Length", json.loads(resp.read().decode("utf-8"))["error"])
+        finally:
+            conn.close()
+
+    def test_api_export_fleet_csv(self):
+        url = "http://127.0.0.1:8765/api/export/fleet?added_load_mw=1&format=csv"
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            self.assertEqual(resp.status, 200)
+            self.assertTrue(resp.headers["Content-Type"].startswith("text/csv"))
+            lines = resp.read().decode("utf-8").splitlines()
+        self.assertTrue(lines[0].startswith("feeder,name,"))
+        self.assertGreater(len(lines), 1)
+
+    def test_api_feeders_query(self):
+        url = "http://127.0.0.1:8765/api/feeders/query?peak_mw_min=0&limit=2"
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            self.assertEqual(resp.status, 200)
+            data = json.loads(resp.read().decode("utf-8"))
+            self.assertLessEqual(data["count"], 2)
+            self.assertIsInstance(data["feeders"], list)
+        for limit in ("0", "-3", "many"):
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(f"http://127.0.0.1:8765/api/feeders/query?limit={limit}", timeout=5)
+            self.assertEqual(ctx.exception.code, 400)
+            ctx.exception.close()
+
+    def test_api_rollups(self):
+        with urllib.request.urlopen("http://127.0.0.1:8765/api/rollups?level=region", timeout=5) as resp:
+            data = json.loads(resp.read().decode("utf-8"))
+        self.assertEqual(data["level"], "region")
+        self.assertIsInstance(data["groups"], list)
+        for path, status in (("level=zone", 400), ("level=substation&id=NOPE", 404)):
+            with self.assertRaises(urllib.error.HTTPError) as ctx:
+                urllib.request.urlopen(f"http://127.0.0.1:8765/api/rollups?{path}", timeout=5)
+            self.assertEqual(ctx.exception.code, status)
+            ctx.exception.close()
+
+    def test_api_jobs(self):
+        body = json.dumps({"kind": "sweep", "feeder": "F1", "added_pv_mw": [1, 2]}).encode("utf-8")
+        req = urllib.request.Request(
+            "http://127.0.0.1:8765/api/jobs",
+            data=body,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(req, timeout=5) as resp:
+            self.assertEqual(resp.status, 202)
+            job_id = json.loads(resp.read().decode("utf-8"))["job_id"]
+
+        for _ in range(100):
+            with urllib.request.urlopen(f"http://127.0.0.1:8765/api/jobs/{job_id}", timeout=5) as resp:
+                data = json.loads(resp.read().decode("utf-8"))
+            if data["status"] in ("done", "failed"):
+                break
+            time.sleep(0.05)
+        self.assertEqual(data["status"], "done")
+        self.assertEqual(len(data["result"]["scenarios"]), 2)
+
+    def test_api_stats_reports_startup(self):
+        with urllib.request.urlopen("http://127.0.0.1:8765/api/stats", timeout=5) as resp:
+            data = json.loads(resp.read().decode("utf-8"))
+        self.assertIn("coalescing", data)
+        self.assertIn("time_to_ready_ms", data["startup"])
+        self.assertIn("import_pipeline_ms", data["startup"])
+
     def test_api_upload_grid(self):
         payload = {
             "raw": "feeder_id,name,base_kv,num_customers,peak_mw,pv_mw\n"
@@ -52,6 +184,30 @@ class TestHTTPAPI(unittest.TestCase):
             self.assertEqual(data["status"], "ok")
             self.assertIn("U1", data["feeders_loaded"])
 
+    def test_api_patch_feeders_rejects_bad_delta(self):
+        req = urllib.request.Request(
+            "http://127.0.0.1:8765/api/feeders",
+            data=json.dumps({"upsert": {"F1": {"peak_mw": "lots"}}}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="PATCH",
+        )
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(req, timeout=5)
+        self.assertEqual(ctx.exception.code, 400)
+        self.assertIn("F1", json.loads(ctx.exception.read().decode("utf-8"))["error"])
+
+    def test_api_patch_feeders_rejects_non_list_remove(self):
+        req = urllib.request.Request(
+            "http://127.0.0.1:8765/api/feeders",
+            data=json.dumps({"remove": 5}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="PATCH",
+        )
+        with self.assertRaises(urllib.error.HTTPError) as ctx:
+            urllib.request.urlopen(req, timeout=5)
+        self.assertEqual(ctx.exception.code, 400)
+        self.assertIn("'remove'", json.loads(ctx.exception.read().decode("utf-8"))["error"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -17,6 +17,64 @@ class TestIntentAgent(unittest.TestCase):
         self.assertEqual(info["intent"], "simulation")
         self.assertAlmostEqual(info["added_load_mw"], 3.0, places=3)
 
+    def test_multiple_values_become_scenarios(self):
+        info = self.agent.classify("Compare 2, 4 and 6 MW of PV on F2 with 3 MW of new load")
+        self.assertEqual(info["feeders"], ["F2"])
+        self.assertEqual(
+            [(s["added_pv_mw"], s["added_load_mw"]) for s in info["scenarios"]],
+            [(2.0, 3.0), (4.0, 3.0), (6.0, 3.0)],
+        )
+
+    def test_range_with_step_across_feeders(self):
+        info = self.agent.classify("Add 1 to 10 MW of PV in 1 MW steps on F1 and F3")
+        self.assertEqual(info["feeders"], ["F1", "F3"])
+        self.assertEqual(len(info["scenarios"]), 20)
+        self.assertEqual(info["scenarios"][-1], {"feeder": "F3", "added_pv_mw": 10.0, "added_load_mw": 0.0})
+
+    def test_voltage_control_intent(self):
+        info = self.agent.classify("Which volt-var settings would let feeder F2 host 8 MW of PV?")
+        self.assertEqual(info["intent"], "voltage_control")
+        self.assertAlmostEqual(info["added_pv_mw"], 8.0, places=3)
+
+    def test_load_forecast_intent(self):
+        info = self.agent.classify("When will F1 overload given 3% annual growth and EV adoption over 15 years?")
+        self.assertEqual(info["intent"], "load_forecast")
+        self.assertEqual(info["forecast"]["load_growth_pct"], 3.0)
+        self.assertEqual(info["forecast"]["horizon_years"], 15)
+        self.assertGreater(info["forecast"]["ev_pct_per_year"], 0)
+
+    def test_fleet_screening_intent(self):
+        info = self.agent.classify("Which feeders are closest to their limits? Show the top 3.")
+        self.assertEqual(info["intent"], "fleet_screening")
+        self.assertEqual(info["top_k"], 3)
+
+    def test_fleet_screening_needs_whole_words(self):
+        info = self.agent.classify("Add 5 MW of PV on F1, frankly")
+        self.assertEqual(info["intent"], "simulation")
+        self.assertEqual((info["feeder"], info["added_pv_mw"]), ("F1", 5.0))
+        info = self.agent.classify("Add 4 MW of load to F2 and explain the ranking")
+        self.assertNotEqual(info["intent"], "fleet_screening")
+        self.assertEqual((info["feeder"], info["added_load_mw"]), ("F2", 4.0))
+        # A single feeder with an MW amount is a scenario even when "rank" is a whole word.
+        self.assertNotEqual(self.agent.classify("Rank the risk of adding 3 MW of load on F3")["intent"], "fleet_screening")
+        self.assertEqual(self.agent.classify("Rank feeders by loading")["intent"], "fleet_screening")
+
+    def test_feeder_query_filters(self):
+        info = self.agent.classify("Show all feeders above 80% loading with more than 3 MW of PV")
+        self.assertEqual(info["intent"], "feeder_query")
+        self.assertEqual(info["filters"], {"loading_pct": [80.0, None], "pv_mw": [3.0, None]})
+
+    def test_rollup_intent(self):
+        info = self.agent.classify("What is the total PV headroom at substation S4?")
+        self.assertEqual((info["intent"], info["rollup"]), ("rollup", {"level": "substation", "id": "S4"}))
+        info = self.agent.classify("How much load can the north region take?")
+        self.assertEqual(info["rollup"], {"level": "region", "id": "NORTH"})
+        info = self.agent.classify("Show totals per substation")
+        self.assertEqual(info["rollup"], {"level": "substation", "id": None})
+        # A named feeder, or "substation" as plain equipment, keeps the scenario intents.
+        self.assertEqual(self.agent.classify("Add 3 MW of load on feeder F1 at substation S4")["intent"], "simulation")
+        self.assertNotEqual(self.agent.classify("Is the transformer at the substation overloaded?")["intent"], "rollup")
+
     def test_unknown_for_smalltalk(self):
         info = self.agent.classify("hi")
         self.assertEqual(info["intent"], "unknown")
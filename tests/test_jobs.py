@@ -0,0 +1,83 @@
+import unittest
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+from app.admission import AdmissionConfig, AdmissionController
+
+from gridgent.core.jobs import MAX_PARTIAL_ROWS, Job, JobManager, JobStore, JobQueueFull
+from gridgent.core.orchestrator import GridGentOrchestrator
+
+
+class TestJobs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = JobStore(Path(self.tmp.name), max_bytes=1024 * 1024)
+        self.jobs = JobManager(GridGentOrchestrator(), workers=1, store=self.store)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ask_job_reuses_task_id_and_persists(self):
+        job = self.jobs.submit("ask", {"query": "Simulate adding 3 MW of load on feeder F1"})
+        data = self.jobs.wait(job.job_id)
+        self.assertEqual(data["status"], "done")
+        self.assertEqual(data["result"]["task_id"], job.job_id)
+        self.assertEqual(self.store.load(job.job_id)["status"], "done")
+
+    def test_sweep_reports_progress(self):
+        job = self.jobs.submit("sweep", {"feeder": "F1", "added_pv_mw": [0, 1, 2], "added_load_mw": [0, 5]})
+        data = self.jobs.wait(job.job_id)
+        self.assertEqual(data["progress"], 1.0)
+        self.assertEqual(len(data["result"]["scenarios"]), 6)
+
+    def test_jobs_progress_under_continuous_interactive_load(self):
+        admission = AdmissionController(AdmissionConfig(rate_per_s=0, job_yield_at=1))
+        ask = admission.admit("POST", "/api/ask", "a")  # stays in flight for the whole job
+        jobs = JobManager(GridGentOrchestrator(), workers=1, store=self.store, yield_to=admission.interactive_busy)
+        with mock.patch.object(JobManager, "MAX_YIELD_S", 0.05):
+            t0 = time.monotonic()
+            job = jobs.submit("sweep", {"feeder": "F1", "added_pv_mw": list(range(12))})
+            data = jobs.wait(job.job_id, timeout=5.0)
+            elapsed = time.monotonic() - t0
+        ask.release()
+        self.assertEqual(data["status"], "done")
+        self.assertEqual(len(data["result"]["scenarios"]), 12)
+        # 13 yield points (start + 12 steps); every fourth one runs without waiting.
+        self.assertGreaterEqual(elapsed, 9 * 0.05)
+        self.assertLess(elapsed, 2.0)
+
+    def test_unknown_kind_and_full_queue(self):
+        with self.assertRaises(ValueError):
+            self.jobs.submit("nope", {})
+        tiny = JobManager(GridGentOrchestrator(), workers=1, max_queue=1, store=self.store)
+        tiny._ensure_workers = lambda: None  # keep the queue from draining
+        tiny.submit("fleet_screening", {})
+        with self.assertRaises(JobQueueFull):
+            tiny.submit("fleet_screening", {})
+
+    def test_oversized_sweep_is_rejected_and_partial_rows_are_capped(self):
+        with self.assertRaises(ValueError):
+            self.jobs.submit("sweep", {"added_pv_mw": list(range(1000)), "added_load_mw": list(range(1000))})
+        with self.assertRaises(ValueError):
+            self.jobs.submit("sweep", {"added_pv_mw": []})
+        job = Job(job_id="0000000a-aaaa", kind="sweep", params={})
+        job.partial = [{"n": i} for i in range(MAX_PARTIAL_ROWS + 50)]
+        data = job.to_dict()
+        self.assertEqual(len(data["partial"]), MAX_PARTIAL_ROWS)
+        self.assertEqual((data["partial"][-1], data["partial_count"]), ({"n": MAX_PARTIAL_ROWS + 49}, MAX_PARTIAL_ROWS + 50))
+
+    def test_store_evicts_oldest_over_budget(self):
+        store = JobStore(Path(self.tmp.name) / "small", max_bytes=600)
+        ids = []
+        for i in range(5):
+            job = Job(job_id=f"0000000{i}-aaaa", kind="ask", params={"query": "x" * 100})
+            store.save(job)
+            ids.append(job.job_id)
+        self.assertIsNotNone(store.load(ids[-1]))
+        self.assertIsNone(store.load(ids[0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
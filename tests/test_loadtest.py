@@ -0,0 +1,154 @@
+import io
+import json
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from gridgent.loadtest import compare_reports, main, percentile, replay_requests, run_load, schedule
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """/fast answers at once, /slow after 20 ms, /fail with 500; bodies are echoed back."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _answer(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b"{}"
+        self.server.seen.append((self.command, self.path, body))
+        path = self.path.split("?", 1)[0]
+        if path == "/slow":
+            time.sleep(0.02)
+        status = 500 if path == "/fail" else 200
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLoadTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        cls.server.daemon_threads = True
+        cls.server.seen = []
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.server.seen.clear()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _log(self, records):
+        path = self.tmp / "log.jsonl"
+        path.write_text("".join(json.dumps(r) + "\n" for r in records), encoding="utf-8")
+        return path
+
+    def test_records_become_requests(self):
+        log = self._log(
+            [
+                {"request_id": "r1", "title": "t", "body": "What if we add 2 MW of load on F1?", "ts": 100.0},
+                {"path": "/api/feeders", "ts": 100.5},
+                {"path": "/api/jobs", "body": {"kind": "ask"}, "ts": 101.0},
+                {"method": "get", "path": "/api/jobs/0123456789abcdef?x=1", "ts": 102.0},
+            ]
+        )
+        reqs = list(replay_requests(log))
+        self.assertEqual(
+            [r.endpoint for r in reqs], ["POST /api/ask", "GET /api/feeders", "POST /api/jobs", "GET /api/jobs/{id}"]
+        )
+        self.assertEqual(json.loads(reqs[0].body), {"query": "What if we add 2 MW of load on F1?"})
+        self.assertEqual([r.offset_s for r in reqs], [0.0, 0.5, 1.0, 2.0])
+        looped = list(zip(range(6), replay_requests(log, loop=True)))
+        self.assertEqual([r.offset_s for _, r in looped][4:], [2.0, 2.5])
+
+    def test_schedules(self):
+        reqs = list(replay_requests(self._log([{"path": "/fast", "offset_s": s} for s in (0, 1, 3)])))
+        self.assertEqual([at for _, at in schedule(iter(reqs), "recorded", speed=2.0)], [0.0, 0.5, 1.5])
+        self.assertEqual([at for _, at in schedule(iter(reqs), "4")], [0.0, 0.25, 0.5])
+        poisson = [at for _, at in schedule(iter(reqs), "poisson:10", seed=1)]
+        self.assertEqual(poisson, sorted(poisson))
+        with self.assertRaises(ValueError):
+            list(schedule(iter(reqs), "fast"))
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 50), 2.0)
+        self.assertEqual(percentile([1.0, 2.0, 3.0, 4.0], 99), 4.0)
+
+    def test_closed_loop_per_endpoint_stats(self):
+        log = self._log([{"path": "/fast"}, {"path": "/slow"}, {"path": "/fail", "body": {"x": 1}}])
+        report = run_load(log, self.url, concurrency=3, requests=31, warmup=1)
+        self.assertEqual(report["mode"], "closed")
+        self.assertEqual(report["overall"]["requests"], 30)
+        self.assertEqual(len(self.server.seen), 31)
+        eps = report["endpoints"]
+        self.assertEqual(set(eps), {"GET /fast", "GET /slow", "POST /fail"})
+        self.assertEqual(eps["POST /fail"]["statuses"], {"500": 10})
+        self.assertEqual(eps["POST /fail"]["error_rate"], 1.0)
+        self.assertEqual(eps["GET /fast"]["errors"], 0)
+        self.assertGreaterEqual(eps["GET /slow"]["latency_ms"]["p50"], 20.0)
+        self.assertAlmostEqual(report["overall"]["error_rate"], 10 / 30, places=3)
+
+    def test_open_loop_keeps_schedule_and_counts_queueing(self):
+        log = self._log([{"path": "/slow"}])
+        t0 = time.perf_counter()
+        report = run_load(log, self.url, rate="100", concurrency=1, requests=10)
+        self.assertEqual(report["overall"]["requests"], 10)
+        # One client and 20 ms service time at a 10 ms arrival gap: later requests queue.
+        self.assertGreater(report["overall"]["latency_ms"]["max"], 60.0)
+        self.assertGreaterEqual(time.perf_counter() - t0, 0.09)
+
+    def test_unreachable_server_is_an_error_not_a_crash(self):
+        log = self._log([{"path": "/fast"}])
+        report = run_load(log, "http://127.0.0.1:9", requests=2, timeout_s=1.0)
+        self.assertEqual(report["overall"]["statuses"], {"error": 2})
+        with self.assertRaises(ValueError):
+            run_load(self._log([]), self.url)
+
+    def test_compare_flags_regressions(self):
+        log = self._log([{"path": "/fast"}, {"path": "/slow"}])
+        base = run_load(log, self.url, concurrency=2, requests=20, label="base")
+        cand = json.loads(json.dumps(base))
+        cand["label"] = "cand"
+        slow = cand["endpoints"]["GET /slow"]
+        slow["latency_ms"] = {k: v * 3 for k, v in slow["latency_ms"].items()}
+        slow["error_rate"] = 0.5
+
+        same = compare_reports(base, base)
+        self.assertTrue(same["ok"])
+        result = compare_reports(base, cand)
+        self.assertFalse(result["ok"])
+        self.assertEqual(len([r for r in result["regressions"] if r.startswith("GET /slow")]), 3)
+        self.assertEqual(result["endpoints"]["GET /slow"]["p95_ms"]["change_pct"], 200.0)
+
+        paths = []
+        for name, report in (("base", base), ("cand", cand)):
+            paths.append(str(self.tmp / f"{name}.json"))
+            Path(paths[-1]).write_text(json.dumps(report), encoding="utf-8")
+        out = io.StringIO()
+        with redirect_stdout(out):
+            self.assertEqual(main(["compare", *paths]), 1)
+        self.assertIn("REGRESSIONS:", out.getvalue())
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(main(["compare", paths[0], paths[0]]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
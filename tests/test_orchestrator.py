@@ -15,6 +15,30 @@ class TestOrchestrator(unittest.TestCase):
         self.assertIn("planning_agent", roles)
         self.assertIn("narrator_agent", roles)
 
+    def test_run_fleet_screening_query(self):
+        result = self.orch.run("Which feeders are closest to their limits with 2 MW of new load?")
+        self.assertIn("screened", result.answer)
+        tool_steps = [s for s in result.steps if s.role == "tool"]
+        self.assertIn("worst_loading", tool_steps[0].meta)
+
+    def test_run_scenario_comparison(self):
+        result = self.orch.run("Compare 2, 4 and 6 MW of PV on F2 with 3 MW of new load")
+        self.assertIn("compared 3 scenarios", result.answer)
+        rows = [s for s in result.steps if s.role == "tool"][0].meta["scenarios"]
+        self.assertEqual([(r["added_pv_mw"], r["added_load_mw"]) for r in rows], [(2.0, 3.0), (4.0, 3.0), (6.0, 3.0)])
+
+    def test_run_load_forecast(self):
+        result = self.orch.run("When will feeder F1 overload given 3% annual growth?")
+        self.assertIn("projected", result.answer)
+        forecast = [s for s in result.steps if s.role == "tool"][0].meta
+        self.assertEqual(forecast["feeders"][0]["feeder"], "F1")
+
+    def test_run_without_trace(self):
+        result = self.orch.run("Simulate adding 3 MW of load on feeder F1", trace="none")
+        self.assertEqual(result.steps, [])
+        self.assertIn("You asked:", result.answer)
+        self.assertNotIn("steps", result.to_dict())
+
     def test_run_unknown_query(self):
         result = self.orch.run("hi")
         self.assertIn("didn't see enough detail", result.answer.lower())
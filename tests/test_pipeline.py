@@ -0,0 +1,37 @@
+import unittest
+
+import gridgent.orchestrator as legacy
+from gridgent.core.orchestrator import GridGentOrchestrator
+from gridgent.core.pipeline import create_stage, register_stage, registered_stages
+from gridgent.agents.narrator import NarratorAgent
+
+
+class ShortNarrator:
+    def narrate(self, query, technical):
+        return f"[{technical.get('intent')}]"
+
+
+class TestPipeline(unittest.TestCase):
+    def test_legacy_entry_point_uses_core_pipeline(self):
+        self.assertIs(legacy.GridGentOrchestrator, GridGentOrchestrator)
+        result = legacy.GridGentOrchestrator().run("Simulate adding 3 MW of load on feeder F1")
+        self.assertIn("planning_agent", [s.role for s in result.steps])
+
+    def test_stage_override(self):
+        orch = GridGentOrchestrator(stages={"narrator": ShortNarrator()})
+        self.assertEqual(orch.run("Simulate adding 3 MW of load on feeder F1").answer, "[simulation]")
+
+    def test_register_stage_replaces_default(self):
+        original = registered_stages()["narrator"]
+        try:
+            register_stage("narrator", ShortNarrator)
+            self.assertIsInstance(create_stage("narrator"), ShortNarrator)
+        finally:
+            register_stage("narrator", original)
+        self.assertIsInstance(create_stage("narrator"), NarratorAgent)
+        with self.assertRaises(ValueError):
+            create_stage("validator")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from unittest import mock
+
+from app import prefork
+
+ROOT = Path(__file__).resolve().parents[1]
+PORT = 8766
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "pre-fork mode needs os.fork")
+class TestPreforkServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        code = (
+            "from app.server import run_server; "
+            f"run_server(host='127.0.0.1', port={PORT}, workers=2, max_requests=3)"
+        )
+        cls.proc = subprocess.Popen(
+            [sys.executable, "-c", code], cwd=str(ROOT), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        for _ in range(50):
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{PORT}/api/feeders", timeout=1).read()
+                break
+            except OSError:
+                time.sleep(0.1)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.proc.send_signal(signal.SIGTERM)
+        cls.proc.wait(timeout=10)
+
+    def test_workers_are_recycled_without_dropping_requests(self):
+        pids = set()
+        for _ in range(12):
+            with urllib.request.urlopen(f"http://127.0.0.1:{PORT}/api/stats", timeout=5) as resp:
+                self.assertEqual(resp.status, 200)
+                pids.add(json.loads(resp.read().decode("utf-8"))["pid"])
+        # Two workers retiring every three requests means more than two pids served traffic.
+        self.assertGreater(len(pids), 2)
+        self.assertNotIn(self.proc.pid, pids)
+
+
+class TestServerBinding(unittest.TestCase):
+    def test_single_process_server_does_not_share_its_port(self):
+        first = prefork.GridGentHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+        self.addCleanup(first.server_close)
+        with self.assertRaises(OSError):
+            prefork.GridGentHTTPServer(first.server_address, BaseHTTPRequestHandler).server_close()
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "pre-fork mode needs os.fork")
+class TestPreforkCrashLoop(unittest.TestCase):
+    def test_crashing_workers_back_off_then_give_up(self):
+        handlers = {sig: signal.getsignal(sig) for sig in (signal.SIGUSR1, signal.SIGTERM)}
+        for sig, handler in handlers.items():
+            self.addCleanup(signal.signal, sig, handler)
+        httpd = prefork.GridGentHTTPServer(("127.0.0.1", 0), BaseHTTPRequestHandler)
+        self.addCleanup(httpd.server_close)
+
+        with mock.patch.object(prefork, "_worker_main", side_effect=RuntimeError("boom")), \
+                mock.patch.object(prefork, "MAX_CRASHES", 4), \
+                mock.patch.object(prefork.time, "sleep") as sleep, \
+                mock.patch("sys.stderr"):
+            with self.assertRaises(SystemExit):
+                prefork.serve_prefork(httpd, workers=1)
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(delays, [prefork.RESTART_BACKOFF_S * 2 ** n for n in range(3)])
+
+
+if __name__ == "__main__":
+    unittest.main()
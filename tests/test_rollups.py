@@ -0,0 +1,122 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from gridgent.core.orchestrator import GridGentOrchestrator
+from gridgent.tools import grid_stub
+from gridgent.tools.hosting_map import hosting_capacities
+from gridgent.tools.rollups import FeederRollups, get_rollups, lookup_rollup
+
+
+def _config():
+    feeders = {
+        "F1": {"name": "F1", "num_customers": 4200, "peak_mw": 18.5, "pv_mw": 3.2, "substation": "S1", "region": "North"},
+        "F2": {"name": "F2", "num_customers": 5100, "peak_mw": 14.3, "pv_mw": 4.7, "substation": "S1", "region": "North"},
+        "F3": {"name": "F3", "num_customers": 830, "peak_mw": 22.1, "pv_mw": 0.8, "substation": "s2", "region": "north"},
+        "F4": {"name": "F4", "num_customers": 100, "peak_mw": 2.0, "pv_mw": 0.1},
+    }
+    return {"feeders": feeders}
+
+
+class TestUploadSchema(unittest.TestCase):
+    def test_optional_hierarchy_fields(self):
+        raw = json.dumps([{"id": "f1", "substation": " S4 ", "region": ""}, {"id": "f2"}])
+        feeders = grid_stub.parse_uploaded_grid(raw, "json")["feeders"]
+        self.assertEqual(feeders["F1"]["substation"], "S4")
+        self.assertNotIn("region", feeders["F1"])
+        self.assertNotIn("substation", feeders["F2"])
+
+        csv_raw = (
+            "feeder_id,name,base_kv,num_customers,peak_mw,pv_mw,substation,region\n"
+            "F1,A,13.8,100,5,1,S4,West\n"
+            "F2,B,13.8,100,5,1,,\n"
+        )
+        feeders = grid_stub.parse_uploaded_grid(csv_raw, "csv")["feeders"]
+        self.assertEqual((feeders["F1"]["substation"], feeders["F1"]["region"]), ("S4", "West"))
+        self.assertNotIn("substation", feeders["F2"])
+
+
+class TestFeederRollups(unittest.TestCase):
+    def test_totals_per_level(self):
+        feeders = _config()["feeders"]
+        rollups = FeederRollups(feeders, version="v0")
+        s1 = rollups.get("substation", "s1", members=True)
+        self.assertEqual((s1["feeders"], s1["num_customers"]), (2, 9300))
+        self.assertAlmostEqual(s1["peak_mw"], 32.8)
+        self.assertAlmostEqual(s1["pv_mw"], 7.9)
+        expected = sum(hosting_capacities(feeders[f])[0] for f in ("F1", "F2"))
+        self.assertAlmostEqual(s1["pv_headroom_mw"], round(expected, 3))
+        self.assertEqual(s1["feeder_ids"], ["F1", "F2"])
+        # Group ids are case-insensitive.
+        self.assertEqual(rollups.get("region", "NORTH")["feeders"], 3)
+        self.assertEqual((rollups.unassigned("substation"), rollups.unassigned("region")), (1, 1))
+        self.assertIsNone(rollups.get("substation", "S9"))
+        with self.assertRaises(ValueError):
+            rollups.groups("zone")
+
+    def test_update_matches_rebuild_and_keeps_old_copy(self):
+        feeders = _config()["feeders"]
+        rollups = FeederRollups(feeders, version="v0")
+        before = rollups.groups("substation")
+        changed = {
+            "F3": dict(feeders["F3"], substation="S1", peak_mw=30.0),  # moves; S2 empties
+            "F4": dict(feeders["F4"], substation="S5", region="South"),  # joins a new group
+            "F9": {"name": "F9", "num_customers": 10, "peak_mw": 1.0, "pv_mw": 0.0, "region": "South"},
+        }
+        patched = rollups.updated(changed, removed=["F2"], version="v1")
+        current = {**{k: v for k, v in feeders.items() if k != "F2"}, **changed}
+        fresh = FeederRollups(current, version="v1")
+        for level in ("substation", "region"):
+            self.assertEqual(patched.groups(level, members=True), fresh.groups(level, members=True))
+            self.assertEqual(patched.unassigned(level), fresh.unassigned(level))
+        self.assertIsNone(patched.get("substation", "S2"))
+        self.assertEqual(rollups.groups("substation"), before)
+
+
+class TestRollupsOnActiveConfig(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        base = Path(self.tmp.name)
+        (base / "config").mkdir()
+        (base / "config" / "feeders.json").write_text(json.dumps(_config()))
+        self.patch = mock.patch.object(grid_stub, "_BASE_DIR", base)
+        self.patch.start()
+        grid_stub.reload_feeder_config()
+
+    def tearDown(self):
+        self.patch.stop()
+        self.tmp.cleanup()
+        grid_stub.reload_feeder_config()
+
+    def test_delta_patches_rollups(self):
+        rollups = get_rollups()
+        delta = grid_stub.apply_feeder_delta({"F4": {"substation": "S1"}, "F1": {"substation": None}})
+        patched = get_rollups()
+        self.assertIsNot(patched, rollups)
+        self.assertEqual(patched.version, delta["config_version"])
+        self.assertEqual(lookup_rollup("substation", "S1", members=True)["rollup"]["feeder_ids"], ["F2", "F4"])
+        fresh = FeederRollups(grid_stub.get_all_feeders())
+        self.assertEqual(patched.groups("substation"), fresh.groups("substation"))
+
+    def test_planning_answers_from_rollups(self):
+        orch = GridGentOrchestrator()
+        result = orch.run("What is the total PV headroom at substation S1?")
+        technical = result.steps[-1].meta
+        self.assertEqual(result.steps[0].meta["rollup"], {"level": "substation", "id": "S1"})
+        self.assertIn("Substation S1 (2 feeder(s), 9,300 customers)", result.answer)
+        self.assertIn("PV hosting headroom", result.answer)
+        self.assertEqual(technical["status"], "ok")
+
+        listing = orch.run("Show PV headroom per region")
+        self.assertIn("Totals for 1 region(s)", listing.answer)
+        self.assertIn("1 feeder(s) have no region", listing.answer)
+
+        missing = orch.run("Total load headroom at substation S9")
+        self.assertIn("no substation with that id", missing.answer)
+        self.assertIn("S1, S2", missing.answer)
+
+
+if __name__ == "__main__":
+    unittest.main()
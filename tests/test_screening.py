@@ -0,0 +1,50 @@
+import unittest
+import random
+
+from gridgent.tools.screening import screen_feeders
+from gridgent.tools.grid_stub import evaluate_feeder_metrics
+
+
+def _synthetic_feeders(n, seed=7):
+    rng = random.Random(seed)
+    return {
+        f"S{i}": {
+            "name": f"Synthetic S{i}",
+            "base_kv": 13.8,
+            "num_customers": rng.randint(100, 6000),
+            "peak_mw": rng.uniform(2.0, 30.0),
+            "pv_mw": rng.uniform(0.0, 8.0),
+        }
+        for i in range(n)
+    }
+
+
+class TestScreening(unittest.TestCase):
+    def test_top_k_matches_full_sort(self):
+        feeders = _synthetic_feeders(2000)
+        result = screen_feeders(added_pv_mw=2.0, added_load_mw=3.0, top_k=10, feeders=feeders)
+
+        def loading(fid):
+            meta = feeders[fid]
+            return evaluate_feeder_metrics(meta["peak_mw"], meta["pv_mw"], 2.0, 3.0)[0]
+
+        expected = sorted(feeders, key=lambda fid: (-loading(fid), fid))[:10]
+        self.assertEqual([e.feeder for e in result.worst_loading], expected)
+        self.assertEqual(result.num_feeders, 2000)
+
+    def test_voltage_ranking_is_ascending_margin(self):
+        feeders = _synthetic_feeders(500)
+        result = screen_feeders(added_pv_mw=6.0, top_k=5, feeders=feeders)
+        margins = [e.voltage_margin_pu for e in result.worst_voltage]
+        self.assertEqual(len(margins), 5)
+        self.assertEqual(margins, sorted(margins))
+
+    def test_top_k_larger_than_fleet(self):
+        feeders = _synthetic_feeders(3)
+        result = screen_feeders(top_k=10, feeders=feeders)
+        self.assertEqual(len(result.worst_loading), 3)
+        self.assertIn("worst_voltage", result.to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
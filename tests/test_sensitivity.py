@@ -0,0 +1,97 @@
+import os
+import unittest
+from unittest import mock
+
+from gridgent.tools import sensitivity
+from gridgent.tools.grid_stub import evaluate_feeder_metrics, get_all_feeders, get_config_version
+from gridgent.tools.sensitivity import SensitivityTable, refresh_sensitivity_table, solve_scenario_fast
+from gridgent.tools.solvers import get_backend, solve_scenario
+
+
+FEEDERS = {
+    "S1": {"name": "Sens S1", "base_kv": 13.8, "num_customers": 1000, "peak_mw": 12.0, "pv_mw": 2.0},
+    # vmin hits its 0.9 pu floor at 7 * peak = 2.1 MW of added load.
+    "S2": {"name": "Sens S2", "base_kv": 13.8, "num_customers": 50, "peak_mw": 0.3, "pv_mw": 0.5},
+}
+
+
+class TestSensitivityTable(unittest.TestCase):
+    def setUp(self):
+        self.table = SensitivityTable.build(FEEDERS, get_backend("stub"), version="test")
+
+    def test_derivatives_match_linear_model(self):
+        row = self.table.rows["S1"]
+        self.assertAlmostEqual(row.d_load[0], 100.0 / (1.2 * 12.0), places=6)
+        self.assertAlmostEqual(row.d_pv[0], -50.0 / (1.2 * 12.0), places=6)
+        self.assertAlmostEqual(row.d_load[1], -0.01 / 12.0, places=8)
+        self.assertAlmostEqual(row.d_pv[2], 0.01 / 2.0, places=8)
+        self.assertEqual(row.radius_mw, sensitivity.RADII_MW[0])
+        self.assertTrue(all(r < 1e-9 for r in row.residual))
+
+    def test_clamp_shrinks_box_and_bound_holds(self):
+        row = self.table.rows["S2"]
+        self.assertLess(row.radius_mw, sensitivity.RADII_MW[0])
+        steps = [row.radius_mw * i / 8 for i in range(9)]
+        for pv in steps:
+            for load in steps:
+                metrics, bound = row.predict(pv, load)
+                exact = evaluate_feeder_metrics(0.3, 0.5, pv, load)
+                for m, e, b in zip(metrics, exact, bound):
+                    self.assertLessEqual(abs(m - e), b)
+        self.assertIsNone(row.predict(row.radius_mw + 0.1, 0.0))
+        self.assertIsNone(row.predict(-0.1, 0.0))
+
+    def test_fast_path_modes(self):
+        fallback = solve_scenario("S1", 0.0, 0.0, backend=get_backend("stub"))
+        with mock.patch.object(sensitivity, "get_sensitivity_table", return_value=self.table), mock.patch.object(
+            sensitivity, "solve_scenario", return_value=fallback
+        ) as solver:
+            result, info = solve_scenario_fast("s1", 0.5, 0.5)
+            self.assertEqual(info["method"], "sensitivity")
+            self.assertEqual(result.feeder, "S1")
+            loading, _, _ = evaluate_feeder_metrics(12.0, 2.0, 0.5, 0.5)
+            self.assertAlmostEqual(result.peak_loading_pct, loading, places=6)
+            solver.assert_not_called()
+
+            # 1.7 MW of load puts S1 at ~95% loading, the warning threshold.
+            _, info = solve_scenario_fast("S1", 0.0, 1.7)
+            self.assertEqual(info, {"method": "solver", "reason": "near_limit"})
+            _, info = solve_scenario_fast("S1", 10.0, 0.0)
+            self.assertEqual(info["reason"], "out_of_range")
+            _, info = solve_scenario_fast("S9", 0.0, 0.0)
+            self.assertEqual(info["reason"], "not_ready")
+            self.assertEqual(solver.call_count, 3)
+
+    def test_delta_update_reprobes_changed_feeders(self):
+        changed = {"S2": dict(FEEDERS["S2"], peak_mw=20.0)}
+        table = self.table.updated(changed, removed=["S1"], version="v2")
+        self.assertEqual((len(table), table.version), (1, "v2"))
+        self.assertAlmostEqual(table.rows["S2"].d_load[0], 100.0 / (1.2 * 20.0), places=6)
+        self.assertIn("S1", self.table)
+
+
+class TestFastPathAgainstSolver(unittest.TestCase):
+    def test_estimates_stay_within_bound_on_active_config(self):
+        backend = get_backend("stub")
+        table = refresh_sensitivity_table(backend)
+        self.assertEqual(table.version, get_config_version())
+        for fid in list(get_all_feeders())[:20]:
+            for pv, load in ((0.0, 0.0), (0.25, 0.1), (0.5, 1.0)):
+                result, info = solve_scenario_fast(fid, pv, load, backend=backend)
+                exact = solve_scenario(fid, pv, load, backend=backend)
+                if info["method"] == "sensitivity":
+                    bound = info["error_bound"]
+                    self.assertLessEqual(
+                        abs(result.peak_loading_pct - exact.peak_loading_pct), bound["peak_loading_pct"]
+                    )
+                self.assertEqual(result.overload_elements, exact.overload_elements)
+
+    def test_enabled_flag(self):
+        with mock.patch.dict(os.environ, {"GRID_GENT_FAST_PATH": "1"}):
+            self.assertTrue(sensitivity.fast_path_enabled())
+        with mock.patch.dict(os.environ, {"GRID_GENT_FAST_PATH": "0"}):
+            self.assertFalse(sensitivity.fast_path_enabled())
+
+
+if __name__ == "__main__":
+    unittest.main()
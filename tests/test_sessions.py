@@ -0,0 +1,83 @@
+import unittest
+from unittest import mock
+
+from gridgent.core.orchestrator import GridGentOrchestrator
+from gridgent.core.sessions import SessionStore
+
+
+def _intent(result):
+    # The resolved intent is the last intent_agent step.
+    return [s for s in result.steps if s.role == "intent_agent"][-1].meta
+
+
+class TestSessionStore(unittest.TestCase):
+    def test_lru_eviction(self):
+        store = SessionStore(max_sessions=2)
+        a = store.get("a")
+        store.get("b")
+        self.assertIs(store.get("a"), a)
+        store.get("c")
+        self.assertEqual(store.stats()["evicted"], 1)
+        # "b" was least recently used, so it went and comes back empty.
+        self.assertIs(store.get("a"), a)
+        self.assertEqual(store.get("b").turns, 0)
+        self.assertEqual(store.stats()["created"], 4)
+
+    def test_idle_sessions_expire(self):
+        store = SessionStore(ttl_s=60)
+        with mock.patch("gridgent.core.sessions.time.monotonic", return_value=1000.0):
+            first = store.get("s")
+        with mock.patch("gridgent.core.sessions.time.monotonic", return_value=1100.0):
+            second = store.get("s")
+        self.assertIsNot(first, second)
+        self.assertEqual(store.stats()["expired"], 1)
+
+
+class TestFollowUps(unittest.TestCase):
+    def setUp(self):
+        self.orch = GridGentOrchestrator()
+
+    def test_bare_mw_follow_up_keeps_feeder_and_quantity(self):
+        self.orch.run("What happens on feeder F2 if we add 5 MW of rooftop PV?", session_id="s1")
+        follow = self.orch.run("What about 8 MW?", session_id="s1")
+        info = _intent(follow)
+        self.assertEqual((info["feeder"], info["added_pv_mw"], info["added_load_mw"]), ("F2", 8.0, 0.0))
+        self.assertEqual(info["intent"], "hosting_capacity")
+        self.assertIn("feeder", info["follow_up"]["carried"])
+
+        # Without a session the same question falls back to the default feeder.
+        stateless = _intent(self.orch.run("What about 8 MW?"))
+        self.assertIsNone(stateless["feeder"])
+
+    def test_feeder_follow_up_carries_scenario(self):
+        self.orch.run("Simulate adding 3 MW of load on feeder F1", session_id="s2")
+        info = _intent(self.orch.run("And on F3?", session_id="s2"))
+        self.assertEqual((info["feeder"], info["added_load_mw"]), ("F3", 3.0))
+
+    def test_labelled_follow_up_replaces_only_that_quantity(self):
+        self.orch.run("Simulate adding 2 MW of load and 1 MW of PV on feeder F1", session_id="s3")
+        info = _intent(self.orch.run("What about 4 MW of PV?", session_id="s3"))
+        self.assertEqual((info["feeder"], info["added_pv_mw"], info["added_load_mw"]), ("F1", 4.0, 2.0))
+
+    def test_repeated_scenario_reuses_session_result(self):
+        self.orch.run("Simulate adding 3 MW of load on feeder F1", session_id="s4")
+        self.orch.run("What about 5 MW?", session_id="s4")
+        with mock.patch.object(self.orch.planning_agent, "plan_and_analyze") as plan:
+            result = self.orch.run("What about 3 MW?", session_id="s4")
+        plan.assert_not_called()
+        self.assertIsNotNone(result.steps[-1].meta["reused_from"])
+
+    def test_voltage_search_is_reused_for_new_pv_level(self):
+        self.orch.run("Which regulator tap fixes over-voltage on F2 with 12 MW of PV?", session_id="s5")
+        with mock.patch("gridgent.agents.planning.optimize_voltage_controls") as search:
+            result = self.orch.run("What about 14 MW?", session_id="s5")
+        search.assert_not_called()
+        control = [s for s in result.steps if s.role == "tool" and "best_setting" in s.meta][0].meta
+        fresh = self.orch.run("Which regulator tap fixes over-voltage on F2 with 14 MW of PV?")
+        expected = [s for s in fresh.steps if s.role == "tool" and "best_setting" in s.meta][0].meta
+        self.assertEqual(control["scenario"], expected["scenario"])
+        self.assertEqual(control["best_setting"], expected["best_setting"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import importlib.util
+import os
+from unittest import mock
+
+from gridgent.tools import solvers
+from gridgent.tools.grid_stub import evaluate_feeder_metrics
+
+META = {"peak_mw": 12.0, "pv_mw": 2.0}
+
+
+class FixedBackend:
+    name = "fixed"
+    capabilities = frozenset({"single"})
+
+    def warm_up(self):
+        self.warmed = True
+
+    def evaluate(self, feeder_meta, added_pv_mw, added_load_mw):
+        return 50.0, 0.99, 1.01
+
+    def evaluate_batch(self, scenarios):
+        return [self.evaluate(*s) for s in scenarios]
+
+
+class TestSolvers(unittest.TestCase):
+    def test_stub_matches_model(self):
+        backend = solvers.get_backend("stub")
+        self.assertEqual(backend.evaluate(META, 3.0, 1.0), evaluate_feeder_metrics(12.0, 2.0, 3.0, 1.0))
+        batch = backend.evaluate_batch([(META, 0.0, 0.0), (META, 5.0, 2.0)])
+        self.assertEqual(batch[1], evaluate_feeder_metrics(12.0, 2.0, 5.0, 2.0))
+
+    @unittest.skipUnless(solvers.np is not None, "numpy not installed")
+    def test_numpy_batch_matches_stub(self):
+        scenarios = [({"peak_mw": p, "pv_mw": v}, pv, load) for p in (0.0, 5.0, 20.0) for v in (0.1, 3.0)
+                     for pv in (0.0, 4.0, 30.0) for load in (0.0, 2.0, 50.0)]
+        expected = solvers.get_backend("stub").evaluate_batch(scenarios)
+        got = solvers.get_backend("numpy").evaluate_batch(scenarios)
+        for e, g in zip(expected, got):
+            for a, b in zip(e, g):
+                self.assertAlmostEqual(a, b, places=9)
+
+    def register(self, name, factory):
+        solvers.register_backend(name, factory)
+        self.addCleanup(solvers.unregister_backend, name)
+
+    def test_registration_selection_and_timing(self):
+        self.register("fixed", FixedBackend)
+        backend = solvers.get_backend("fixed")
+        self.assertTrue(backend.warmed)
+        with mock.patch.dict(os.environ, {"GRID_GENT_SOLVER": "fixed"}):
+            result = solvers.solve_scenario("F1", added_pv_mw=1.0)
+        self.assertEqual(result.peak_loading_pct, 50.0)
+        self.assertGreaterEqual(solvers.solver_stats()["fixed.evaluate"]["calls"], 1)
+        with self.assertRaises(ValueError):
+            solvers.get_backend("does-not-exist")
+
+    def test_missing_dependency_falls_back_to_stub(self):
+        def broken():
+            raise ImportError("solver library missing")
+
+        self.register("broken", broken)
+        with self.assertWarns(RuntimeWarning):
+            self.assertEqual(solvers.get_backend("broken").name, "stub")
+        self.assertNotIn("broken", solvers.available_backends())
+
+    def test_misconfigured_name_falls_back_to_stub(self):
+        self.addCleanup(solvers._WARNED.clear)
+        setting = {"default": "stub", "load_forecast": "pandapwer"}
+        with mock.patch.object(solvers, "get_config_setting", return_value=setting):
+            with self.assertWarns(RuntimeWarning):
+                self.assertEqual(solvers.get_backend(query_type="load_forecast").name, "stub")
+            self.assertEqual(solvers.check_solver_config(), ["pandapwer"])
+        with mock.patch.dict(os.environ, {"GRID_GENT_SOLVER": "bogus"}):
+            with self.assertWarns(RuntimeWarning):
+                result = solvers.solve_scenario("F1", added_pv_mw=1.0)
+        self.assertEqual(result.feeder, "F1")
+        with self.assertRaises(ValueError):
+            solvers.get_backend("bogus")
+
+    def test_unregister_removes_backend(self):
+        self.register("fixed", FixedBackend)
+        solvers.get_backend("fixed")
+        solvers.unregister_backend("fixed")
+        self.assertNotIn("fixed", solvers.available_backends())
+        with self.assertRaises(ValueError):
+            solvers.get_backend("fixed")
+
+    @unittest.skipUnless(importlib.util.find_spec("pandapower"), "pandapower not installed")
+    def test_pandapower_backend_runs_ac_power_flow(self):
+        backend = solvers.get_backend("pandapower")
+        self.assertEqual(backend.name, "pandapower")
+        self.assertIn("pandapower", solvers.available_backends())
+        base = backend.evaluate(META, 0.0, 0.0)
+        loaded = backend.evaluate(META, 0.0, 6.0)
+        sunny = backend.evaluate(META, 20.0, 0.0)
+        for loading, vmin, vmax in (base, loaded, sunny):
+            self.assertGreater(loading, 0.0)
+            self.assertLessEqual(vmin, vmax)
+        self.assertGreater(loaded[0], base[0])
+        self.assertLess(loaded[1], base[1])
+        self.assertGreater(sunny[2], base[2])
+        self.assertEqual(backend.evaluate_batch([(META, 0.0, 6.0)]), [loaded])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+
+from gridgent.core.types import Step, Trace, OrchestratorResult
+
+
+class TestTrace(unittest.TestCase):
+    def test_step_is_slotted(self):
+        step = Step(role="tool", content="x", meta={})
+        self.assertFalse(hasattr(step, "__dict__"))
+
+    def test_levels_control_what_is_built(self):
+        built = []
+
+        def meta():
+            built.append(1)
+            return {"big": list(range(10))}
+
+        none, summary, full = Trace("none"), Trace("summary"), Trace("full")
+        for trace in (none, summary, full):
+            trace.add("tool", "ran tool", meta)
+
+        self.assertEqual(none.steps, [])
+        self.assertEqual(summary.steps[0].meta, {})
+        self.assertEqual(full.steps[0].meta["big"][-1], 9)
+        self.assertEqual(len(built), 1)
+        with self.assertRaises(ValueError):
+            Trace("verbose")
+
+    def test_result_serialization_levels(self):
+        payload = {"peak_loading_pct": 80.0}
+        result = OrchestratorResult(task_id="t", answer="a", steps=[Step("tool", "ran", payload)])
+        self.assertIs(result.to_dict()["steps"][0]["meta"], payload)
+        self.assertEqual(result.to_dict("summary")["steps"], [{"role": "tool", "content": "ran"}])
+        self.assertNotIn("steps", result.to_dict("none"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+from gridgent.tools import voltage_control as vc
+from gridgent.tools.grid_stub import VOLTAGE_MAX_PU, evaluate_feeder_metrics, get_feeder_summary
+
+
+class TestVoltageControl(unittest.TestCase):
+    def test_neutral_setting_matches_base_model(self):
+        for pv, load in ((0.0, 0.0), (3.0, 1.0), (12.0, 4.0)):
+            self.assertEqual(
+                tuple(round(x, 9) for x in vc.evaluate_controlled(14.3, 4.7, vc.ControlSetting(), pv, load)),
+                tuple(round(x, 9) for x in evaluate_feeder_metrics(14.3, 4.7, pv, load)),
+            )
+
+    def test_optimizer_finds_feasible_gain(self):
+        result = vc.optimize_voltage_controls("F2", added_pv_mw=8.0)
+        self.assertGreater(result["gain_mw"], 0)
+        self.assertEqual(result["evaluated"] + result["pruned"], result["candidates"])
+
+        best = result["best_setting"]
+        setting = vc.ControlSetting(
+            tap=best["tap"],
+            power_factor=best["power_factor"],
+            volt_var=(best["volt_var_start_pu"], best["volt_var_slope"]) if best["volt_var_start_pu"] else None,
+        )
+        meta = get_feeder_summary("F2")
+        _, _, vmax = vc.evaluate_controlled(
+            meta["peak_mw"], meta["pv_mw"], setting, result["optimized_pv_capacity_mw"]
+        )
+        self.assertLessEqual(vmax, VOLTAGE_MAX_PU)
+
+    @unittest.skipUnless(vc.np is not None, "numpy not installed")
+    def test_vectorized_matches_scalar(self):
+        settings = vc.candidate_settings()
+        steps = vc._pv_steps()
+        vectorized = vc._capacities_vectorized(14.3, 4.7, settings, 1.0, steps)
+        scalar = [vc._capacity_scalar(14.3, 4.7, s, 1.0, steps) for s in settings]
+        self.assertEqual(vectorized, scalar)
+
+
+if __name__ == "__main__":
+    unittest.main()